@@ -0,0 +1,123 @@
+# benchmarks/bench_cli.py
+
+import itertools
+import tempfile
+from pathlib import Path
+
+from harness import Options, benchmark, run_cli, timed
+from stub_openai import StubOpenAI
+
+# Deliberately messy so isort, black and ruff all have work to do on a cold run.
+MESSY_MODULE = '''import sys
+import os, json
+from typing import List,Dict
+
+
+def load_{index}( path,limit = 10 ):
+    values=[ ]
+    for i in range( limit ):
+        values.append( {{"id":i,"path":path,"name":os.path.basename( path )}} )
+    return json.dumps( values )
+
+
+class Model{index}( object ):
+    def __init__( self,weights:List[ float ],options:Dict[str,int]={{}} ):
+        self.weights=weights
+        self.options=options
+    def predict( self,x ):
+        return sum( [ w*v for w,v in zip( self.weights,x ) ] )+len( sys.argv )
+'''
+
+
+def write_tree(root: Path, files: int, per_package: int = 50) -> Path:
+    """
+    A synthetic project of `files` messy modules spread over packages of `per_package`.
+    """
+    for index in range(files):
+        package = root / "src" / f"pkg{index // per_package}"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"module{index}.py").write_text(MESSY_MODULE.format(index=index))
+    return root
+
+
+def tree_size(options: Options) -> int:
+    return 200 if options.quick else 1000
+
+
+@benchmark("cli.cold_start_help")
+def cold_start_help(options: Options):
+    return timed(lambda _: run_cli(["--help"]), options.repeat)
+
+
+@benchmark("cli.init_project")
+def init_project(options: Options):
+    names = (f"project{i}" for i in itertools.count())
+    with tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        return timed(lambda _: run_cli(["init", "project", "--name", next(names), "--ml"], cwd=Path(tmp)),
+                     options.repeat)
+
+
+@benchmark("cli.generate_template")
+def generate_template(options: Options):
+    with tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        return timed(lambda _: run_cli(["generate", "model", "--task", "classification", "--framework", "sklearn",
+                                        "--dataset", "iris", "--output", "model.py"], cwd=Path(tmp)),
+                     options.repeat)
+
+
+@benchmark("cli.format_cold")
+def format_cold(options: Options):
+    with tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        runs = itertools.count()
+
+        def setup():
+            # A fresh messy tree and an empty format cache for every run.
+            run = Path(tmp) / f"run{next(runs)}"
+            return write_tree(run, tree_size(options)), {"RAIKURAN_FORMAT_CACHE_DIR": str(run / "cache")}
+
+        return timed(lambda state: run_cli(["format", "run", "--path", "src"], cwd=state[0], env=state[1]),
+                     options.repeat, setup)
+
+
+@benchmark("cli.format_warm")
+def format_warm(options: Options):
+    with tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        root = write_tree(Path(tmp), tree_size(options))
+        env = {"RAIKURAN_FORMAT_CACHE_DIR": str(root / "cache")}
+        run_cli(["format", "run", "--path", "src"], cwd=root, env=env)
+        return timed(lambda _: run_cli(["format", "run", "--path", "src"], cwd=root, env=env), options.repeat)
+
+
+def stub_env(stub: StubOpenAI, tmp: str):
+    return {**stub.env, "RAIKURAN_CACHE_DIR": str(Path(tmp) / "responses"), "RAIKURAN_MODEL": ""}
+
+
+@benchmark("llm.assist_explain")
+def assist_explain(options: Options):
+    with StubOpenAI() as stub, tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        source = Path(tmp) / "module.py"
+        source.write_text(MESSY_MODULE.format(index=0) * 10)
+        env = stub_env(stub, tmp)
+        return timed(lambda _: run_cli(["assist", "explain", "--file", str(source), "--no-cache", "--no-stream"],
+                                       env=env), options.repeat)
+
+
+@benchmark("llm.assist_batch")
+def assist_batch(options: Options):
+    with StubOpenAI() as stub, tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        root = write_tree(Path(tmp), 20 if options.quick else 100)
+        env = stub_env(stub, tmp)
+        outputs = (str(root / f"out{i}") for i in itertools.count())
+        # A fresh output directory each run, so the resume journal doesn't skip everything.
+        return timed(lambda _: run_cli(["assist", "refactor", "--path", "src", "--output-dir", next(outputs),
+                                        "--no-cache", "--concurrency", "8", "--rpm", "100000", "--tpm", "100000000"],
+                                       cwd=root, env=env), options.repeat)
+
+
+@benchmark("llm.generate_model")
+def generate_model(options: Options):
+    with StubOpenAI() as stub, tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        env = stub_env(stub, tmp)
+        return timed(lambda _: run_cli(["generate", "model", "--task", "classification", "--framework", "sklearn",
+                                        "--dataset", "iris", "--output", "model.py", "--llm", "--no-cache"],
+                                       cwd=Path(tmp), env=env), options.repeat)
@@ -0,0 +1,110 @@
+# benchmarks/bench_serving.py
+
+import asyncio
+import contextlib
+import io
+import importlib.util
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from harness import Options, Skip, benchmark, chdir, cli_env
+
+FEATURES = 32
+CONCURRENCY = 16
+
+
+def build_model(framework: str, directory: Path) -> Path:
+    """
+    A small regression model saved the way `raikuran deploy fastapi` expects it.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, FEATURES)).astype("float32")
+    y = X @ rng.normal(size=FEATURES).astype("float32")
+    if framework == "sklearn":
+        import joblib
+        from sklearn.linear_model import LinearRegression
+
+        path = directory / "model.pkl"
+        joblib.dump(LinearRegression().fit(X, y), path)
+        return path
+
+    import torch
+
+    model = torch.nn.Sequential(torch.nn.Linear(FEATURES, 64), torch.nn.ReLU(), torch.nn.Linear(64, 1)).eval()
+    path = directory / "model.pt"
+    torch.save(model, path)
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url: str, payload: dict, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}:\n{server.stderr.read()[-2000:]}")
+        try:
+            if httpx.post(url, json=payload, timeout=5).is_success:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout:.0f}s")
+
+
+def serve_and_load(framework: str, batching: bool, options: Options):
+    from raikuran.commands.deploy import generate_fastapi_wrapper
+    from raikuran.utils.loadgen import run_bench
+
+    if importlib.util.find_spec(framework) is None:
+        raise Skip(f"{framework} is not installed")
+
+    with tempfile.TemporaryDirectory(prefix="raikuran-bench-") as tmp:
+        directory = Path(tmp)
+        model_path = build_model(framework, directory)
+        with chdir(directory), contextlib.redirect_stdout(io.StringIO()):
+            wrapper = generate_fastapi_wrapper(model_path, batching=batching)
+
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/predict"
+        payload = {"input": [0.5] * FEATURES}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", f"{wrapper.stem}:app", "--port", str(port), "--log-level", "warning"],
+            cwd=directory, env=cli_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            wait_ready(url, payload, server)
+            report = asyncio.run(run_bench(url, [payload], duration=3.0 if options.quick else 10.0,
+                                           concurrency=CONCURRENCY))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    return {
+        "rps": report["throughput_rps"],
+        "p50_ms": report["latency_ms"]["p50"],
+        "p99_ms": report["latency_ms"]["p99"],
+        "error_rate": report["error_rate"],
+    }
+
+
+def _register(framework: str, batching: bool) -> None:
+    name = f"serving.{framework}{'_batching' if batching else ''}"
+    benchmark(name)(lambda options: serve_and_load(framework, batching, options))
+
+
+for _framework in ("sklearn", "torch"):
+    for _batching in (False, True):
+        _register(_framework, _batching)
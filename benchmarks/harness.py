@@ -0,0 +1,146 @@
+# benchmarks/harness.py
+
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+HERE = Path(__file__).resolve().parent
+REPO_ROOT = HERE.parent
+# Environment fields that must match for timings to be comparable with a baseline.
+HARDWARE_KEYS = ("machine", "cpu_count")
+
+Metrics = Dict[str, float]
+
+
+class Options(NamedTuple):
+    quick: bool
+    repeat: int
+
+
+class Benchmark(NamedTuple):
+    name: str
+    func: Callable[[Options], Metrics]
+
+
+class Skip(Exception):
+    """
+    Raised by a benchmark that can't run here (e.g. an optional framework is missing).
+    """
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str) -> Callable[[Callable[[Options], Metrics]], Callable[[Options], Metrics]]:
+    def register(func: Callable[[Options], Metrics]) -> Callable[[Options], Metrics]:
+        BENCHMARKS.append(Benchmark(name, func))
+        return func
+
+    return register
+
+
+def timed(func: Callable[[Any], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Metrics:
+    """
+    Wall time of `func` over `repeat` runs, each after an untimed `setup` whose result it receives.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        times.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(times), "min_s": min(times)}
+
+
+def cli_env(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    env = {**os.environ, **(extra or {})}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))
+    return env
+
+
+def run_cli(args: List[str], cwd: Optional[Path] = None, env: Optional[Dict[str, str]] = None) -> str:
+    """
+    Run `raikuran <args>` in a fresh interpreter from this checkout and return its output.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", "from raikuran.main import app; app()", *args],
+        cwd=cwd, env=cli_env(env), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"raikuran {' '.join(args)} failed:\n{result.stdout[-1000:]}{result.stderr[-1000:]}")
+    return result.stdout
+
+
+@contextmanager
+def chdir(path: Path) -> Iterator[None]:
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def hardware_differences(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    The environment fields (architecture, CPU count) that make timings from two machines incomparable.
+    """
+    return [f"{key} {baseline.get(key)} vs {current.get(key)}" for key in HARDWARE_KEYS
+            if baseline.get(key) != current.get(key)]
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("rps")
+
+
+def compare(results: Dict[str, Metrics], baseline: Dict[str, Metrics], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Per-metric changes against the baseline; a change worse than `tolerance` (relative) is a regression.
+
+    Only benchmarks and metrics present in both runs are compared.
+    """
+    rows = []
+    for name, metrics in sorted(results.items()):
+        before = baseline.get(name) or {}
+        for metric, value in sorted(metrics.items()):
+            old = before.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            if old == 0:
+                change = 0.0 if value == 0 else float("inf")
+            else:
+                change = (value - old) / old
+            worse = -change if higher_is_better(metric) else change
+            rows.append({"benchmark": name, "metric": metric, "baseline": old, "value": value,
+                         "change": change, "regression": worse > tolerance})
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"  {'benchmark':<32} {'metric':<10} {'baseline':>10} {'now':>10} {'change':>8}"]
+    for row in rows:
+        flag = "  ❌ regression" if row["regression"] else ""
+        lines.append(f"  {row['benchmark']:<32} {row['metric']:<10} {row['baseline']:>10.4g} {row['value']:>10.4g} "
+                     f"{row['change']:>+7.0%}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,106 @@
+# benchmarks/run.py
+"""
+Offline performance benchmarks for raikuran.
+
+    python benchmarks/run.py                     # full run, compared against baseline.json
+    python benchmarks/run.py --quick --only cli  # smaller inputs, CLI benchmarks only
+    python benchmarks/run.py --update-baseline   # record this machine's numbers as the baseline
+
+Timings only gate against a baseline recorded on the same architecture and CPU count.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+import typer
+
+sys.path[:0] = [str(Path(__file__).resolve().parent), str(Path(__file__).resolve().parents[1])]
+
+import bench_cli  # noqa: E402,F401  (registers benchmarks)
+import bench_serving  # noqa: E402,F401
+from harness import (  # noqa: E402
+    BENCHMARKS,
+    HERE,
+    Options,
+    Skip,
+    compare,
+    environment,
+    format_comparison,
+    hardware_differences,
+)
+
+
+def main(
+    only: List[str] = typer.Option([], "--only", help="Run benchmarks whose name starts with this (repeatable)"),
+    quick: bool = typer.Option(False, help="Smaller trees and shorter load tests"),
+    repeat: int = typer.Option(None, help="Runs per timed benchmark (default: 5, or 3 with --quick)"),
+    output: Path = typer.Option(HERE / "results.json", help="Where the results JSON is written"),
+    baseline: Path = typer.Option(HERE / "baseline.json", help="Results JSON to compare against"),
+    tolerance: float = typer.Option(0.25, help="Relative slowdown allowed before a metric counts as a regression"),
+    update_baseline: bool = typer.Option(False, "--update-baseline", help="Write the results to --baseline too"),
+):
+    """
+    Runs the benchmarks, writes JSON results and exits with 1 on a regression against the baseline.
+    """
+    options = Options(quick=quick, repeat=repeat or (3 if quick else 5))
+    selected = [b for b in BENCHMARKS if not only or any(b.name.startswith(prefix) for prefix in only)]
+    if not selected:
+        typer.echo(f"❌ No benchmarks match {', '.join(only)}.")
+        raise typer.Exit(1)
+
+    results, failed, skipped = {}, [], []
+    for bench in selected:
+        typer.echo(f"⏱️  {bench.name} ...", nl=False)
+        try:
+            results[bench.name] = bench.func(options)
+        except Skip as exc:
+            typer.echo(f" skipped ({exc})")
+            skipped.append(bench.name)
+            continue
+        except Exception as exc:  # one broken benchmark shouldn't hide the others
+            typer.echo(f" ❌ failed: {exc}")
+            failed.append(bench.name)
+            continue
+        typer.echo(" " + ", ".join(f"{metric}={value:.4g}" for metric, value in results[bench.name].items()))
+
+    current = environment()
+    report = {"environment": current, "options": options._asdict(), "results": results}
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    typer.echo(f"📄 Results written to {output}")
+
+    if update_baseline:
+        if failed:
+            # A baseline missing failed benchmarks would silently stop gating them.
+            typer.echo(f"❌ Not updating the baseline: {', '.join(failed)} failed.")
+            raise typer.Exit(1)
+        baseline.write_text(json.dumps(report, indent=2) + "\n")
+        typer.echo(f"📌 Baseline updated: {baseline}")
+        if skipped:
+            typer.echo(f"⚠️  Skipped here, so not gated by this baseline: {', '.join(skipped)}")
+    elif baseline.exists():
+        stored = json.loads(baseline.read_text())
+        if stored.get("options", {}).get("quick") != quick:
+            typer.echo("⚠️  Baseline was recorded with a different --quick setting; numbers may not be comparable.")
+        differences = hardware_differences(stored.get("environment", {}), current)
+        rows = compare(results, stored.get("results", {}), tolerance)
+        typer.echo(format_comparison(rows))
+        regressions = [row for row in rows if row["regression"]]
+        if differences:
+            # Timings from another machine would gate on hardware, not on code.
+            typer.echo(f"⚠️  Baseline was recorded on different hardware ({', '.join(differences)}); "
+                       "not gating. Record one here first with --update-baseline.")
+        elif regressions:
+            typer.echo(f"❌ {len(regressions)} metric(s) regressed by more than {tolerance:.0%}.")
+            raise typer.Exit(1)
+        typer.echo("✅ No regressions against the baseline.")
+    else:
+        typer.echo(f"⚠️  No baseline at {baseline}; run with --update-baseline to record one.")
+
+    if failed:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
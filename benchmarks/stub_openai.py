@@ -0,0 +1,99 @@
+# benchmarks/stub_openai.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+# A completion long enough to look like real output (a few hundred tokens).
+DEFAULT_CONTENT = "```python\n" + "".join(
+    f"def step_{i}(values):\n    return [value * {i} for value in values]\n\n" for i in range(20)
+) + "```"
+
+
+class StubOpenAI:
+    """
+    In-process OpenAI-compatible server answering /v1/chat/completions with a canned reply.
+
+    Each response waits `latency` seconds first (streamed replies then send one
+    chunk per line), so benchmarks measure raikuran's own overhead against a
+    fixed, offline model. Use it as a context manager; `env` holds the
+    variables that point the OpenAI client at it.
+    """
+
+    def __init__(self, latency: float = 0.05, content: str = DEFAULT_CONTENT):
+        self.latency = latency
+        self.content = content
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    @property
+    def env(self) -> Dict[str, str]:
+        return {"OPENAI_BASE_URL": self.url, "OPENAI_API_KEY": "sk-stub"}
+
+    def __enter__(self) -> "StubOpenAI":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency)
+                if body.get("stream"):
+                    self._stream(body.get("model", "stub"))
+                else:
+                    self._send_json(body.get("model", "stub"))
+
+            def _completion(self, model: str, **choice) -> Dict:
+                return {"id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                        "model": model, "choices": [{"index": 0, "finish_reason": "stop", **choice}]}
+
+            def _send_json(self, model: str) -> None:
+                payload = self._completion(model, message={"role": "assistant", "content": stub.content})
+                payload["usage"] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for piece in stub.content.splitlines(keepends=True):
+                    chunk = self._completion(model, delta={"content": piece})
+                    chunk["object"] = "chat.completion.chunk"
+                    chunk["choices"][0]["finish_reason"] = None
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
@@ -1,146 +1,459 @@
 # raikuran/commands/assist.py
 
 import typer
-import os
+import hashlib
+from fnmatch import fnmatch
 from pathlib import Path
-from openai import OpenAI
+from typing import Callable, Dict, List, Optional
+from raikuran.utils.batch import BatchJob, ProgressJournal, run_batch
+from raikuran.utils.chunking import map_ordered, split_code, strip_code_fences
+from raikuran.utils.files import atomic_write
+from raikuran.utils.openai_helpers import (
+    PreparedRequest, compact_code, complete_chat, echo_token, format_estimate, get_client, is_cached,
+    prepare_request,
+)
 
 app = typer.Typer(help="Use OpenAI to explain, refactor, or comment your Python code.")
 
-# Load and validate OpenAI API key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    typer.echo("\u274c OPENAI_API_KEY not set. Please export it in your shell or .env file.")
-    raise typer.Exit(1)
+# Prompt and request settings for each assist task. `{code}` is replaced with the file contents.
+# Requests go to the cheapest model of `tier` that fits; the completion budget is `output_ratio`
+# times the prompt size, capped at `max_tokens`. `compact` is what may be stripped from the code
+# before sending: "whitespace", "comments" (also docstrings) or None. Tasks whose output is code
+# that stands in for the user's file must not drop comments, or the result loses them too.
+TASKS = {
+    "explain": {
+        "system": "You are a helpful code explainer.",
+        "prompt": """
+Explain the following Python code in clear, beginner-friendly English.
+Add line-level explanations only where needed.
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+```python
+{code}
+```
+""",
+        "tier": "smart",
+        "output_ratio": 0.6,
+        "max_tokens": 1500,
+        "compact": "whitespace",
+        "chunk_tokens": 3000,
+        "title": "📄 Explanation:",
+        "saved": "Explanation",
+        "suffix": ".md",
+    },
+    "comment": {
+        "system": "You are a senior code reviewer who adds great comments.",
+        "prompt": """
+Add helpful comments to this Python code for readability and understanding.
+Preserve all original code and structure.
 
-@app.command("explain")
-def explain_code(
-    file: str = typer.Option(..., "--file", "-f", help="Path to the Python file to explain")
+```python
+{code}
+```
+""",
+        "tier": "smart",
+        "output_ratio": 1.5,
+        "max_tokens": 1800,
+        "compact": None,
+        "chunk_tokens": 1000,
+        "title": "📃 Commented Code:",
+        "saved": "Commented code",
+        "suffix": "",
+    },
+    "refactor": {
+        "system": "You are an expert Python software architect.",
+        "prompt": """
+Refactor the following Python code for better readability, performance, and modern Python practices.
+Retain all logic and behavior, but improve structure, naming, and modularity.
+
+```python
+{code}
+```
+""",
+        "tier": "fast",
+        "output_ratio": 1.3,
+        "max_tokens": 1800,
+        "compact": "whitespace",
+        "chunk_tokens": 1000,
+        "title": "📂 Refactored Code:",
+        "saved": "Refactored code",
+        "suffix": "",
+    },
+}
+
+# Prefix for prompts over one chunk of a file that was too large for a single request.
+PART_NOTE = (
+    "This is part {index} of {total} of a larger file, split at function/class boundaries. "
+    "Handle only this part and keep its indentation exactly as given.\n"
+)
+
+# Reduce step for `explain`: merge per-chunk explanations into one.
+SUMMARY_PROMPT = """
+Below are explanations of consecutive parts of one Python file.
+Combine them into a single clear, beginner-friendly explanation of the whole file, removing repetition.
+
+{parts}
+"""
+
+# Shared options for directory-wide batch mode.
+PATH_OPTION = typer.Option(None, "--path", "-p", help="Directory to process in batch mode (instead of --file)")
+INCLUDE_OPTION = typer.Option(["*.py"], "--include", help="Glob of files to include in batch mode (repeatable)")
+EXCLUDE_OPTION = typer.Option([".*", "*/.*"], "--exclude", help="Glob of files to skip in batch mode (repeatable)")
+OUTPUT_DIR_OPTION = typer.Option(None, "--output-dir", help="Where batch results are written (default: assist_<task>)")
+CONCURRENCY_OPTION = typer.Option(4, help="Number of concurrent requests in batch mode")
+RPM_OPTION = typer.Option(60, "--rpm", help="Requests-per-minute budget in batch mode")
+TPM_OPTION = typer.Option(90000, "--tpm", help="Tokens-per-minute budget in batch mode")
+NO_CACHE_OPTION = typer.Option(False, "--no-cache", help="Bypass the local response cache")
+REFRESH_OPTION = typer.Option(False, "--refresh", help="Ignore cached responses and store a fresh one")
+STREAM_OPTION = typer.Option(True, "--stream/--no-stream", help="Print tokens as they arrive")
+DRY_RUN_OPTION = typer.Option(False, "--dry-run", help="Show estimated tokens and cost without sending anything")
+
+
+def prepare_code(task: str, code: str) -> str:
+    """
+    Compact source as far as is safe for the task's output (see TASKS).
+    """
+    compact = TASKS[task]["compact"]
+    if compact is None:
+        return code
+    return compact_code(code, strip_comments=compact == "comments")
+
+
+def task_request(task: str, messages: List[Dict[str, str]]) -> PreparedRequest:
+    spec = TASKS[task]
+    return prepare_request(messages, tier=spec["tier"], output_ratio=spec["output_ratio"], max_output=spec["max_tokens"])
+
+
+def build_messages(task: str, code: str, index: int = 0, total: int = 1) -> List[Dict[str, str]]:
+    """
+    Build the chat messages for an assist task over the given source code.
+
+    When the file was split into chunks, `index`/`total` mark which part this is.
+    """
+    spec = TASKS[task]
+    prompt = spec["prompt"].format(code=code)
+    if total > 1:
+        prompt = PART_NOTE.format(index=index + 1, total=total) + prompt
+    return [
+        {"role": "system", "content": spec["system"]},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def complete_task(
+    task: str,
+    chunks: List[str],
+    use_cache: bool = True,
+    refresh: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    max_workers: Optional[int] = None,
+    retry_rate_limits: bool = True,
+) -> str:
+    """
+    Run an assist task over a file given as one or more chunks (see `split_code`).
+
+    Chunks are sent in parallel (up to `max_workers` at once) and reassembled in
+    source order: code outputs are concatenated, while `explain` gets a final
+    summary pass over the parts. `on_token` streams the final output (the whole
+    response, or the summary). `retry_rate_limits` is passed to `complete_chat`.
+    """
+    spec = TASKS[task]
+    options = dict(temperature=0.3, use_cache=use_cache, refresh=refresh, retry_rate_limits=retry_rate_limits)
+
+    def send(messages: List[Dict[str, str]], on_token: Optional[Callable[[str], None]] = None) -> str:
+        prepared = task_request(task, messages)
+        return complete_chat(messages, prepared.model, max_tokens=prepared.max_tokens, on_token=on_token, **options)
+
+    if len(chunks) == 1:
+        return send(build_messages(task, chunks[0]), on_token)
+
+    total = len(chunks)
+    parts = map_ordered(lambda index: send(build_messages(task, chunks[index], index, total)), list(range(total)),
+                         max_workers)
+
+    if task == "explain":
+        summary_messages = [
+            {"role": "system", "content": spec["system"]},
+            {"role": "user", "content": SUMMARY_PROMPT.format(parts="\n\n".join(
+                f"Part {i + 1}:\n{part}" for i, part in enumerate(parts)
+            ))}
+        ]
+        return send(summary_messages, on_token)
+
+    merged = ""
+    for part in parts:
+        part = strip_code_fences(part)
+        merged += part if part.endswith("\n") else part + "\n"
+    if on_token:
+        on_token(merged)
+    return merged
+
+
+def _emit_completion(
+    generate: Callable[[Optional[Callable[[str], None]]], str],
+    title: str,
+    save_as: Optional[str],
+    saved_message: str,
+    stream: bool,
+) -> str:
+    """
+    Run `generate` and send its output to the terminal, or to `save_as` if given.
+
+    `generate` takes an optional token callback. In streaming mode tokens are
+    echoed as they arrive and, when saving, written incrementally to a temp file
+    that is atomically renamed to `save_as` once the response is complete.
+    """
+    if not save_as:
+        typer.echo(f"\n{title}\n")
+        if stream:
+            return generate(echo_token)
+        content = generate(None)
+        print(content)
+        return content
+
+    with atomic_write(save_as) as out:
+        if stream:
+            def on_token(text: str) -> None:
+                out.write(text)
+                echo_token(text)
+
+            content = generate(on_token)
+        else:
+            content = generate(None)
+            out.write(content)
+    typer.echo(saved_message)
+    return content
+
+
+def estimate_task(task: str, chunks: List[str]) -> List[PreparedRequest]:
+    """
+    The requests an assist task would send for a file's chunks (excluding `explain`'s summary pass).
+    """
+    total = len(chunks)
+    return [task_request(task, build_messages(task, chunk, index, total)) for index, chunk in enumerate(chunks)]
+
+
+def _run_single(
+    task: str, file: str, save_as: Optional[str], stream: bool, use_cache: bool, refresh: bool, dry_run: bool = False,
 ):
     """
-    Explains the code in plain English using OpenAI.
+    Run an assist task over one file, splitting it into chunks if it is too large.
     """
     file_path = Path(file)
     if not file_path.exists():
-        typer.echo(f"\u274c File not found: {file}")
+        typer.echo(f"❌ File not found: {file}")
         raise typer.Exit(1)
 
-    code = file_path.read_text()
-    prompt = f"""
-Explain the following Python code in clear, beginner-friendly English.
-Add line-level explanations only where needed.
+    spec = TASKS[task]
+    chunks = split_code(prepare_code(task, file_path.read_text()), spec["chunk_tokens"])
+    if dry_run:
+        typer.echo(format_estimate(estimate_task(task, chunks)))
+        return
+    if len(chunks) > 1:
+        typer.echo(f"🧩 Large file: processing {len(chunks)} chunks in parallel...")
 
-```python
-{code}
-```
-"""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a helpful code explainer."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1500
+        _emit_completion(
+            lambda on_token: complete_task(task, chunks, use_cache, refresh, on_token),
+            title=spec["title"],
+            save_as=save_as,
+            saved_message=f"✅ {spec['saved']} saved to {save_as}",
+            stream=stream,
         )
-        typer.echo("\n\ud83d\udcc4 Explanation:\n")
-        print(response.choices[0].message.content)
-
+    except typer.Exit:
+        raise
     except Exception as e:
-        typer.echo(f"\u274c OpenAI error: {e}")
+        typer.echo(f"❌ OpenAI API call failed: {e}")
         raise typer.Exit(1)
 
 
-@app.command("comment")
-def comment_code(
-    file: str = typer.Option(..., "--file", "-f", help="Python file to auto-comment"),
-    save_as: str = typer.Option(None, help="Optional new file name to save commented version")
+def collect_files(root: Path, include: List[str], exclude: List[str]) -> List[Path]:
+    """
+    List files under `root` whose relative path matches an include glob and no exclude glob.
+    """
+    files = []
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(root).as_posix()
+        if any(fnmatch(rel, pattern) for pattern in include) and not any(fnmatch(rel, pattern) for pattern in exclude):
+            files.append(path)
+    return files
+
+
+def _run_batch(
+    task: str,
+    path: str,
+    include: List[str],
+    exclude: List[str],
+    output_dir: Optional[str],
+    concurrency: int,
+    rpm: int,
+    tpm: int,
+    use_cache: bool,
+    refresh: bool,
+    dry_run: bool = False,
 ):
     """
-    Adds helpful comments to your code using OpenAI.
+    Run an assist task over every matching file in a directory, concurrently.
+
+    Results are written per file under `output_dir` (mirroring the source tree),
+    and progress is journaled there so an interrupted run resumes where it stopped.
     """
-    file_path = Path(file)
-    if not file_path.exists():
-        typer.echo(f"\u274c File not found: {file}")
+    root = Path(path)
+    if not root.is_dir():
+        typer.echo(f"❌ Directory not found: {path}")
         raise typer.Exit(1)
 
-    code = file_path.read_text()
-    prompt = f"""
-Add helpful comments to this Python code for readability and understanding.
-Preserve all original code and structure.
-
-```python
-{code}
-```
-"""
+    spec = TASKS[task]
+    out_root = Path(output_dir or f"assist_{task}")
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a senior code reviewer who adds great comments."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1800
+        # Don't feed our own output back in when it lives inside the source tree.
+        skip = out_root.resolve().relative_to(root.resolve()).as_posix()
+        exclude = exclude + [f"{skip}/*"]
+    except ValueError:
+        pass
+
+    files = collect_files(root, include, exclude)
+    if not files:
+        typer.echo("❌ No files matched the include/exclude filters.")
+        raise typer.Exit(1)
+
+    jobs = []
+    estimates: List[PreparedRequest] = []
+    for file_path in files:
+        code = prepare_code(task, file_path.read_text())
+        chunks = split_code(code, spec["chunk_tokens"])
+        requests = estimate_task(task, chunks)
+        estimates += requests
+        cached = (
+            use_cache and not refresh and len(chunks) == 1
+            and is_cached(build_messages(task, code), requests[0].model, 0.3, requests[0].max_tokens)
         )
+        # Prompt + completion tokens, charged against the TPM budget.
+        cost = 0 if cached else sum(r.prompt_tokens + r.max_tokens for r in requests)
+        fingerprint = hashlib.sha256(f"{task}\0{spec['tier']}\0{code}".encode("utf-8")).hexdigest()
+        # One request per chunk, plus explain's summary pass over several chunks.
+        calls = len(requests) + (1 if task == "explain" and len(chunks) > 1 else 0)
+        rel = file_path.relative_to(root).as_posix()
+        jobs.append(BatchJob(key=rel, fingerprint=fingerprint, cost=cost, payload=chunks, requests=calls))
 
-        commented_code = response.choices[0].message.content
-        if save_as:
-            Path(save_as).write_text(commented_code)
-            typer.echo(f"\u2705 Commented code saved to {save_as}")
-        else:
-            typer.echo("\n\ud83d\udcc3 Commented Code:\n")
-            print(commented_code)
+    if dry_run:
+        typer.echo(f"📦 {len(jobs)} files, {sum(1 for job in jobs if not job.cost)} already cached.")
+        typer.echo(format_estimate(estimates))
+        return
+    if any(job.cost for job in jobs):
+        get_client()  # fail fast on a missing API key before starting workers
 
-    except Exception as e:
-        typer.echo(f"\u274c OpenAI error: {e}")
+    def process(job: BatchJob) -> None:
+        # Chunks run one after another inside the job's worker slot, so the pool size
+        # and the limiter (charged for every chunk request) bound the total load. 429s
+        # go straight to run_batch, whose shared backoff pauses every worker at once.
+        content = complete_task(task, job.payload, use_cache=use_cache, refresh=refresh, max_workers=1,
+                                retry_rate_limits=False)
+        target = out_root / (job.key + spec["suffix"])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(target) as out:
+            out.write(content)
+
+    typer.echo(f"📦 Processing {len(jobs)} files from {root} with concurrency {concurrency}...")
+    journal = ProgressJournal(out_root / ".raikuran-journal.jsonl")
+    summary = run_batch(jobs, process, journal, concurrency=concurrency, rpm=rpm, tpm=tpm)
+
+    typer.echo(
+        f"\n✅ {summary['done']} processed, {summary['skipped']} already done, "
+        f"{summary['failed']} failed. Results in {out_root}"
+    )
+    if summary["failed"]:
         raise typer.Exit(1)
 
 
-@app.command("refactor")
-def refactor_code(
-    file: str = typer.Option(..., "--file", "-f", help="Python file to refactor"),
-    save_as: str = typer.Option(None, help="Optional file name for refactored version")
+def _dispatch(task: str, file: Optional[str], save_as: Optional[str], path: Optional[str], **options):
+    if path:
+        _run_batch(
+            task, path, options["include"], options["exclude"], options["output_dir"],
+            options["concurrency"], options["rpm"], options["tpm"],
+            use_cache=not options["no_cache"], refresh=options["refresh"], dry_run=options["dry_run"],
+        )
+    elif file:
+        _run_single(task, file, save_as, options["stream"], use_cache=not options["no_cache"], refresh=options["refresh"],
+                    dry_run=options["dry_run"])
+    else:
+        typer.echo("❌ Provide --file for a single file or --path for a directory.")
+        raise typer.Exit(1)
+
+
+@app.command("explain")
+def explain_code(
+    file: str = typer.Option(None, "--file", "-f", help="Path to the Python file to explain"),
+    path: str = PATH_OPTION,
+    include: List[str] = INCLUDE_OPTION,
+    exclude: List[str] = EXCLUDE_OPTION,
+    output_dir: str = OUTPUT_DIR_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    rpm: int = RPM_OPTION,
+    tpm: int = TPM_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    stream: bool = STREAM_OPTION,
+    dry_run: bool = DRY_RUN_OPTION,
 ):
     """
-    Refactors your code for clarity, efficiency, and modern practices.
+    Explains the code in plain English using OpenAI.
     """
-    file_path = Path(file)
-    if not file_path.exists():
-        typer.echo(f"\u274c File not found: {file}")
-        raise typer.Exit(1)
+    _dispatch(
+        "explain", file, None, path, include=include, exclude=exclude, output_dir=output_dir,
+        concurrency=concurrency, rpm=rpm, tpm=tpm, no_cache=no_cache, refresh=refresh, stream=stream,
+        dry_run=dry_run,
+    )
 
-    code = file_path.read_text()
-    prompt = f"""
-Refactor the following Python code for better readability, performance, and modern Python practices.
-Retain all logic and behavior, but improve structure, naming, and modularity.
 
-```python
-{code}
-```
-"""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert Python software architect."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1800
-        )
+@app.command("comment")
+def comment_code(
+    file: str = typer.Option(None, "--file", "-f", help="Python file to auto-comment"),
+    save_as: str = typer.Option(None, help="Optional new file name to save commented version"),
+    path: str = PATH_OPTION,
+    include: List[str] = INCLUDE_OPTION,
+    exclude: List[str] = EXCLUDE_OPTION,
+    output_dir: str = OUTPUT_DIR_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    rpm: int = RPM_OPTION,
+    tpm: int = TPM_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    stream: bool = STREAM_OPTION,
+    dry_run: bool = DRY_RUN_OPTION,
+):
+    """
+    Adds helpful comments to your code using OpenAI.
+    """
+    _dispatch(
+        "comment", file, save_as, path, include=include, exclude=exclude, output_dir=output_dir,
+        concurrency=concurrency, rpm=rpm, tpm=tpm, no_cache=no_cache, refresh=refresh, stream=stream,
+        dry_run=dry_run,
+    )
 
-        refactored_code = response.choices[0].message.content
-        if save_as:
-            Path(save_as).write_text(refactored_code)
-            typer.echo(f"\u2705 Refactored code saved to {save_as}")
-        else:
-            typer.echo("\n\ud83d\udcc2 Refactored Code:\n")
-            print(refactored_code)
 
-    except Exception as e:
-        typer.echo(f"\u274c OpenAI error: {e}")
-        raise typer.Exit(1)
+@app.command("refactor")
+def refactor_code(
+    file: str = typer.Option(None, "--file", "-f", help="Python file to refactor"),
+    save_as: str = typer.Option(None, help="Optional file name for refactored version"),
+    path: str = PATH_OPTION,
+    include: List[str] = INCLUDE_OPTION,
+    exclude: List[str] = EXCLUDE_OPTION,
+    output_dir: str = OUTPUT_DIR_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    rpm: int = RPM_OPTION,
+    tpm: int = TPM_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    stream: bool = STREAM_OPTION,
+    dry_run: bool = DRY_RUN_OPTION,
+):
+    """
+    Refactors your code for clarity, efficiency, and modern practices.
+    """
+    _dispatch(
+        "refactor", file, save_as, path, include=include, exclude=exclude, output_dir=output_dir,
+        concurrency=concurrency, rpm=rpm, tpm=tpm, no_cache=no_cache, refresh=refresh, stream=stream,
+        dry_run=dry_run,
+    )
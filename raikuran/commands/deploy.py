@@ -1,8 +1,10 @@
 # raikuran/commands/deploy.py
 
 import typer
+import os
 import subprocess
 from pathlib import Path
+from typing import Optional
 import shutil
 import mimetypes
 
@@ -12,8 +14,17 @@ app = typer.Typer(help="Deploy models using FastAPI or Streamlit.")
 def deploy_fastapi(
     file_name: str = typer.Option(..., "--fileName", "-f", help="Python script or raw model file (.pkl, .pt, .h5)"),
     port: int = typer.Option(8000, help="Port to run FastAPI on"),
+    host: str = typer.Option("127.0.0.1", help="Interface to bind (use 0.0.0.0 to serve externally)"),
     auto_wrap: bool = typer.Option(True, help="Auto-wrap raw model files into a FastAPI serving app"),
-    production: bool = typer.Option(False, help="Run with production server (uvicorn without --reload)")
+    production: bool = typer.Option(False, help="Run with production server (uvicorn without --reload)"),
+    batching: bool = typer.Option(False, help="Group concurrent requests into one vectorized predict call"),
+    max_batch_size: int = typer.Option(32, help="Largest micro-batch when --batching is on"),
+    max_wait_ms: float = typer.Option(5.0, help="Longest wait (ms) for a micro-batch to fill when --batching is on"),
+    workers: int = typer.Option(1, help="Worker processes (with --production); the model is loaded once and shared"),
+    threads_per_worker: int = typer.Option(None, help="Torch/BLAS/OpenMP threads per worker (default: cores / workers)"),
+    mmap: bool = typer.Option(False, help="Memory-map sklearn model arrays (converts the .pkl once if needed)"),
+    backend: str = typer.Option("eager", help="Torch inference backend: eager, torchscript, or onnx"),
+    input_shape: str = typer.Option(None, help="Example input shape for compiling torch models, e.g. 1,784"),
 ):
     """
     Deploy a FastAPI app or serve a raw model as an API.
@@ -24,9 +35,44 @@ def deploy_fastapi(
         typer.echo("❌ File not found.")
         raise typer.Exit(1)
 
+    if workers > 1 and not production:
+        typer.echo("❌ --workers requires --production (auto-reload runs a single process).")
+        raise typer.Exit(1)
+
+    if backend not in ("eager", "torchscript", "onnx"):
+        typer.echo("❌ --backend must be one of: eager, torchscript, onnx.")
+        raise typer.Exit(1)
+    if backend != "eager" and file_path.suffix != ".pt":
+        typer.echo("❌ Compiled backends are only available for torch (.pt) models.")
+        raise typer.Exit(1)
+    if backend != "eager" and not input_shape:
+        typer.echo("❌ --input-shape is required to compile a torch model (e.g. --input-shape 1,784).")
+        raise typer.Exit(1)
+    if backend != "eager":
+        from raikuran.utils.torch_backends import missing_modules
+
+        missing = missing_modules(backend)
+        if missing:
+            typer.echo(f"❌ --backend {backend} needs {', '.join(missing)}: pip install 'raikuran[{backend}]'")
+            raise typer.Exit(1)
+
     # Handle raw model file auto-wrapping
     if auto_wrap and file_path.suffix in [".pkl", ".pt", ".h5"]:
-        wrapper_path = generate_fastapi_wrapper(file_path)
+        if mmap and file_path.suffix == ".pkl":
+            file_path = convert_for_mmap(file_path)
+        compiled_path = None
+        if backend != "eager":
+            from raikuran.utils.torch_backends import compile_model
+
+            try:
+                shape = [int(dim) for dim in input_shape.split(",")]
+                compiled_path = compile_model(file_path, backend, shape)
+            except Exception as e:
+                typer.echo(f"❌ Compiling with {backend} failed: {e}")
+                raise typer.Exit(1)
+        wrapper_path = generate_fastapi_wrapper(
+            file_path, batching, max_batch_size, max_wait_ms, mmap, backend, compiled_path
+        )
         app_module = f"{wrapper_path.stem}:app"
     elif file_path.suffix == ".py":
         app_module = f"{file_path.stem}:app"
@@ -35,13 +81,132 @@ def deploy_fastapi(
         raise typer.Exit(1)
 
     typer.echo(f"🚀 Launching FastAPI server for {file_name} on port {port}...")
-    command = ["uvicorn", app_module, "--port", str(port)]
+    if workers > 1 and hasattr(os, "fork"):
+        from raikuran.utils.serving import serve_preforked
+
+        serve_preforked(app_module, host, port, workers, threads_per_worker)
+        return
+
+    command = ["uvicorn", app_module, "--host", host, "--port", str(port)]
     if not production:
         command.append("--reload")
+    elif workers > 1:
+        # No fork() on this platform: uvicorn spawns workers that each load the model.
+        from raikuran.utils.serving import default_threads_per_worker, limit_threads
+
+        limit_threads(threads_per_worker or default_threads_per_worker(workers))
+        command += ["--workers", str(workers)]
 
     subprocess.run(command)
 
 
+@app.command("batch-score")
+def batch_score(
+    model: str = typer.Option(..., "--model", "-m", help="Model file (.pkl, .pt, .h5)"),
+    input_file: str = typer.Option(..., "--input", "-i", help="CSV (with header) or Parquet file to score"),
+    output_file: str = typer.Option("predictions.csv", "--output", "-o", help="Output .csv or .parquet file"),
+    chunk_size: int = typer.Option(100_000, help="Rows per chunk sent to a worker"),
+    workers: int = typer.Option(None, help="Worker processes (default: number of CPU cores)"),
+    columns: str = typer.Option(None, help="Comma-separated feature columns (default: all except --id-column)"),
+    id_column: str = typer.Option(None, help="Column copied to the output to identify each row"),
+    mmap: bool = typer.Option(False, help="Memory-map sklearn model arrays, shared across workers"),
+):
+    """
+    Score a dataset offline, streaming it through the model in chunks.
+    """
+    from raikuran.utils.scoring import score_file
+
+    model_path = Path(model)
+    input_path = Path(input_file)
+    for path in (model_path, input_path):
+        if not path.exists():
+            typer.echo(f"❌ File not found: {path}")
+            raise typer.Exit(1)
+
+    try:
+        framework = detect_framework(model_path)
+    except ValueError:
+        typer.echo("❌ Unsupported model format. Provide a .pkl, .pt, or .h5 file.")
+        raise typer.Exit(1)
+
+    typer.echo(f"🧮 Scoring {input_path} with {framework} model {model_path.name}...")
+    if mmap and framework == "sklearn":
+        model_path = convert_for_mmap(model_path)
+    loader_source = MODEL_LOADERS[framework].format(
+        model_file=model_path.resolve().as_posix(), mmap_mode="r" if mmap else None
+    )
+    try:
+        score_file(
+            loader_source, input_path, Path(output_file), chunk_size=chunk_size, workers=workers,
+            columns=columns.split(",") if columns else None, id_column=id_column,
+        )
+    except Exception as e:
+        typer.echo(f"❌ Batch scoring failed: {e}")
+        raise typer.Exit(1)
+
+
+@app.command("mmap-convert")
+def mmap_convert(
+    model: str = typer.Option(..., "--model", "-m", help="Pickled sklearn/numpy model (.pkl)"),
+    output: str = typer.Option(None, "--output", "-o", help="Converted file (default: <name>_mmap.pkl)"),
+):
+    """
+    Re-save a .pkl model so its arrays can be memory-mapped at load time.
+    """
+    model_path = Path(model)
+    if not model_path.exists() or model_path.suffix != ".pkl":
+        typer.echo("❌ Provide an existing .pkl model file.")
+        raise typer.Exit(1)
+
+    target = convert_for_mmap(model_path, Path(output) if output else None)
+    typer.echo(f"✅ Memory-mappable model written to {target}")
+
+
+@app.command("bench")
+def bench(
+    url: str = typer.Option("http://127.0.0.1:8000/predict", help="Endpoint to POST payloads to"),
+    payloads: str = typer.Option(..., "--payloads", "-p", help="Sample request bodies (.json list/object or .jsonl)"),
+    duration: float = typer.Option(10.0, help="Seconds to generate load for"),
+    concurrency: int = typer.Option(8, help="Concurrent clients (closed loop) or connection cap (with --rps)"),
+    rps: float = typer.Option(None, help="Fixed request rate for open-loop load (default: closed loop)"),
+    timeout: float = typer.Option(30.0, help="Per-request timeout in seconds"),
+    json_output: str = typer.Option(None, "--json-output", help="Write the report as JSON for comparing runs"),
+):
+    """
+    Load-test a running model endpoint and report throughput and latency percentiles.
+    """
+    import asyncio
+    import json
+
+    from raikuran.utils.files import atomic_write
+    from raikuran.utils.loadgen import load_payloads, run_bench
+
+    payload_path = Path(payloads)
+    if not payload_path.exists():
+        typer.echo(f"❌ File not found: {payload_path}")
+        raise typer.Exit(1)
+    samples = load_payloads(payload_path)
+    if not samples:
+        typer.echo("❌ No payloads found.")
+        raise typer.Exit(1)
+
+    loop_kind = f"{rps:g} req/s open loop" if rps else f"{concurrency} concurrent clients"
+    typer.echo(f"🏋️ Benchmarking {url} for {duration:g}s ({loop_kind})...")
+    report = asyncio.run(run_bench(url, samples, duration, concurrency, rps, timeout))
+
+    latency = report["latency_ms"]
+    typer.echo(f"📊 {report['requests']} requests, {report['throughput_rps']:.1f} req/s, "
+               f"{report['error_rate']:.2%} errors")
+    typer.echo(f"⏱️  p50 {latency['p50']:.2f} ms · p95 {latency['p95']:.2f} ms · "
+               f"p99 {latency['p99']:.2f} ms · max {latency['max']:.2f} ms")
+    if report["errors"]:
+        typer.echo("⚠️  Errors: " + ", ".join(f"{kind} ×{count}" for kind, count in report["errors"].items()))
+    if json_output:
+        with atomic_write(Path(json_output)) as handle:
+            json.dump(report, handle, indent=2)
+        typer.echo(f"💾 Report saved to {json_output}")
+
+
 @app.command("streamlit")
 def deploy_streamlit(
     app_file: str = typer.Option(..., "--fileName", "-f", help="Streamlit app .py file")
@@ -61,78 +226,340 @@ def deploy_streamlit(
     subprocess.run(["streamlit", "run", app_file])
 
 
-def generate_fastapi_wrapper(model_path: Path) -> Path:
-    """
-    Generates a FastAPI wrapper for a .pkl, .pt, or .h5 model file.
-    """
-    suffix = model_path.suffix
-    base_name = model_path.stem
-    wrapper_file = Path(f"{base_name}_api.py")
+# Model loading plus a vectorized `run_model(inputs)` for each framework.
+MODEL_LOADERS = {
+    "sklearn": """
+import joblib
 
-    if suffix == ".pkl":
-        framework = "sklearn"
-    elif suffix == ".pt":
-        framework = "torch"
-    elif suffix == ".h5":
-        framework = "keras"
-    else:
-        raise ValueError("Unsupported model format.")
+model = joblib.load("{model_file}", mmap_mode={mmap_mode!r})
 
-    typer.echo(f"🛠️ Generating FastAPI wrapper for {framework} model...")
 
-    if framework == "sklearn":
-        wrapper_code = f"""
-from fastapi import FastAPI, Request
-import joblib
-import numpy as np
+def run_model(inputs):
+    return np.asarray(model.predict(inputs))
+""",
+    "torch": """
+import warnings
+import torch
 
-model = joblib.load("{model_path.name}")
-app = FastAPI()
+try:
+    model = torch.load("{model_file}", weights_only=False)
+except TypeError:  # torch < 1.13 has no weights_only
+    model = torch.load("{model_file}")
+model.eval()
 
-@app.post("/predict")
-async def predict(request: Request):
-    data = await request.json()
-    input_data = np.array(data["input"]).reshape(1, -1)
-    prediction = model.predict(input_data)
-    return {{ "prediction": prediction.tolist() }}
-"""
-    elif framework == "torch":
-        wrapper_code = f"""
-from fastapi import FastAPI, Request
+
+def run_model(inputs):
+    with warnings.catch_warnings():
+        # Zero-copy binary inputs are read-only views; inference never writes to them.
+        warnings.simplefilter("ignore", UserWarning)
+        tensor = torch.as_tensor(inputs, dtype=torch.float32)
+    with torch.inference_mode():
+        return model(tensor).numpy()
+""",
+    "torchscript": """
+import warnings
 import torch
-import numpy as np
 
-model = torch.load("{model_path.name}")
+model = torch.jit.load("{model_file}")
 model.eval()
+
+
+def run_model(inputs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        tensor = torch.as_tensor(inputs, dtype=torch.float32)
+    with torch.inference_mode():
+        return model(tensor).numpy()
+""",
+    "onnx": """
+import onnxruntime
+
+session = onnxruntime.InferenceSession("{model_file}", providers=["CPUExecutionProvider"])
+input_name = session.get_inputs()[0].name
+
+
+def run_model(inputs):
+    return session.run(None, {{input_name: inputs.astype(np.float32, copy=False)}})[0]
+""",
+    "keras": """
+from tensorflow.keras.models import load_model
+
+model = load_model("{model_file}")
+
+
+def run_model(inputs):
+    return np.asarray(model.predict(inputs))
+""",
+}
+
+# How a single request's decoded input is turned into model input when not batching.
+SINGLE_INPUTS = {
+    "sklearn": "inputs.reshape(1, -1)",
+    "torch": "inputs.astype(np.float32, copy=False)",
+    "torchscript": "inputs.astype(np.float32, copy=False)",
+    "onnx": "inputs.astype(np.float32, copy=False)",
+    "keras": "inputs.reshape(1, -1)",
+}
+
+# Request/response codecs. Besides JSON ({"input": [...]}), /predict accepts
+# raw little-endian bytes (application/octet-stream, with X-Shape and X-Dtype
+# headers), .npy files (application/x-npy) and msgpack (application/msgpack,
+# "input" as raw bytes plus "shape"/"dtype", or a plain list). Binary payloads
+# are decoded with np.frombuffer, without copying, and answered in the same format.
+CODECS = """
+
+RAW_TYPE = "application/octet-stream"
+NPY_TYPE = "application/x-npy"
+MSGPACK_TYPE = "application/msgpack"
+
+
+def _little_endian(dtype):
+    return np.dtype(dtype).newbyteorder("<")
+
+
+def _decode(content_type, body, headers):
+    if content_type == RAW_TYPE:
+        array = np.frombuffer(body, dtype=_little_endian(headers.get("x-dtype", "float32")))
+        shape = headers.get("x-shape")
+        if shape:
+            array = array.reshape([int(dim) for dim in shape.split(",")])
+        return array, "raw"
+
+    if content_type == NPY_TYPE:
+        stream = io.BytesIO(body)
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        count = int(np.prod(shape))
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+        return array.reshape(shape, order="F" if fortran_order else "C"), "npy"
+
+    if content_type == MSGPACK_TYPE:
+        if msgpack is None:
+            raise HTTPException(status_code=415, detail="msgpack is not installed on the server")
+        data = msgpack.unpackb(body)
+        payload = data["input"]
+        if isinstance(payload, bytes):
+            array = np.frombuffer(payload, dtype=_little_endian(data.get("dtype", "float32")))
+            if "shape" in data:
+                array = array.reshape(data["shape"])
+        else:
+            array = np.asarray(payload)
+        return array, "msgpack"
+
+    return np.asarray(json.loads(body)["input"]), "json"
+
+
+def decode_request(headers, body):
+    content_type = headers.get("content-type", "application/json").split(";")[0].strip()
+    try:
+        return _decode(content_type, body, headers)
+    except HTTPException:
+        raise
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid {{content_type}} input: {{exc}}")
+
+
+def encode_response(prediction, fmt, **extra):
+    prediction = np.asarray(prediction)
+    if fmt == "json":
+        return {{"prediction": prediction.tolist(), **extra}}
+
+    prediction = prediction.astype(_little_endian(prediction.dtype), copy=False)
+    if fmt == "msgpack":
+        body = msgpack.packb({{
+            "prediction": prediction.tobytes(),
+            "shape": list(prediction.shape),
+            "dtype": prediction.dtype.str,
+            **extra,
+        }})
+        return Response(body, media_type=MSGPACK_TYPE)
+
+    headers = {{"X-Shape": ",".join(str(dim) for dim in prediction.shape), "X-Dtype": prediction.dtype.str}}
+    headers.update({{"X-" + key.replace("_", "-").title(): str(value) for key, value in extra.items()}})
+    if fmt == "npy":
+        buffer = io.BytesIO()
+        np.save(buffer, prediction, allow_pickle=False)
+        return Response(buffer.getvalue(), media_type=NPY_TYPE, headers=headers)
+    return Response(prediction.tobytes(), media_type=RAW_TYPE, headers=headers)
+"""
+
+SINGLE_ENDPOINT = """
+
 app = FastAPI()
 
+
 @app.post("/predict")
 async def predict(request: Request):
-    data = await request.json()
-    input_data = torch.tensor(data["input"], dtype=torch.float32)
-    with torch.no_grad():
-        output = model(input_data)
-    return {{ "prediction": output.numpy().tolist() }}
+    inputs, fmt = decode_request(request.headers, await request.body())
+    prediction = run_model({single_input})
+    return encode_response(prediction, fmt)
 """
-    elif framework == "keras":
-        wrapper_code = f"""
-from fastapi import FastAPI, Request
-import numpy as np
-from tensorflow.keras.models import load_model
 
-model = load_model("{model_path.name}")
+# Micro-batching: concurrent requests (one sample each) are queued, grouped into
+# a batch of up to MAX_BATCH_SIZE or whatever arrived within MAX_WAIT_MS, and
+# scored with one vectorized run_model call off the event loop.
+BATCHING_ENDPOINT = """
+
+MAX_BATCH_SIZE = {max_batch_size}
+MAX_WAIT_MS = {max_wait_ms}
+
+
+class MicroBatcher:
+    def __init__(self, max_batch_size, max_wait):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.loop = None
+        self.queue = None
+        self.worker = None
+
+    async def submit(self, sample):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # Created lazily (and per event loop) so forked workers each get their own.
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self.run())
+        future = loop.create_future()
+        await self.queue.put((sample, future))
+        return await future
+
+    async def collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.collect()
+            # Samples of different shapes can't be stacked; score each shape separately.
+            groups = {{}}
+            for sample, future in batch:
+                groups.setdefault(sample.shape, []).append((sample, future))
+            for group in groups.values():
+                inputs = np.stack([sample for sample, _ in group])
+                try:
+                    outputs = await loop.run_in_executor(None, run_model, inputs)
+                except Exception as exc:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                for i, (_, future) in enumerate(group):
+                    if not future.done():
+                        future.set_result((outputs[i], len(group)))
+
+
+batcher = MicroBatcher(MAX_BATCH_SIZE, MAX_WAIT_MS / 1000)
 app = FastAPI()
 
+
 @app.post("/predict")
 async def predict(request: Request):
-    data = await request.json()
-    input_data = np.array(data["input"]).reshape(1, -1)
-    prediction = model.predict(input_data)
-    return {{ "prediction": prediction.tolist() }}
+    sample, fmt = decode_request(request.headers, await request.body())
+    prediction, batch_size = await batcher.submit(sample)
+    return encode_response(prediction, fmt, batch_size=batch_size)
 """
+
+
+def convert_for_mmap(model_path: Path, output: Optional[Path] = None) -> Path:
+    """
+    Re-save a pickled model as an uncompressed joblib file and return its path.
+
+    joblib can only memory-map arrays stored uncompressed in its own format, so
+    plain pickles and compressed dumps are converted once; the result is reused
+    while it is newer than the source. With mmap_mode="r", large arrays (forest
+    nodes, embedding matrices) then page in lazily and are shared between
+    processes through the page cache instead of being copied into each heap.
+    """
+    import joblib
+
+    if model_path.stem.endswith("_mmap") and output is None:
+        return model_path
+    target = output or model_path.with_name(f"{model_path.stem}_mmap.pkl")
+    if target.exists() and target.stat().st_mtime >= model_path.stat().st_mtime:
+        return target
+
+    typer.echo(f"🗺️  Converting {model_path.name} to a memory-mappable layout...")
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    joblib.dump(joblib.load(model_path), tmp_path, compress=0)
+    os.replace(tmp_path, target)
+    return target
+
+
+def detect_framework(model_path: Path) -> str:
+    """
+    Map a model file extension to its framework (sklearn, torch, or keras).
+    """
+    suffix = model_path.suffix
+    if suffix == ".pkl":
+        return "sklearn"
+    elif suffix == ".pt":
+        return "torch"
+    elif suffix == ".h5":
+        return "keras"
+    raise ValueError("Unsupported model format.")
+
+
+def generate_fastapi_wrapper(
+    model_path: Path,
+    batching: bool = False,
+    max_batch_size: int = 32,
+    max_wait_ms: float = 5.0,
+    mmap: bool = False,
+    backend: str = "eager",
+    compiled_path: Optional[Path] = None,
+) -> Path:
+    """
+    Generates a FastAPI wrapper for a .pkl, .pt, or .h5 model file.
+
+    With `batching`, each request carries one sample and concurrent requests are
+    scored together in micro-batches; responses include the observed batch_size.
+    With `mmap`, sklearn models are loaded with joblib's mmap_mode="r" (see
+    `convert_for_mmap` for the on-disk layout this needs).
+    With a non-eager `backend`, torch models are served from `compiled_path`
+    (see `raikuran.utils.torch_backends.compile_model`).
+    """
+    base_name = model_path.stem
+    wrapper_file = Path(f"{base_name}_api.py")
+    framework = detect_framework(model_path)
+    if framework == "torch" and backend != "eager":
+        framework, model_path = backend, compiled_path
+
+    typer.echo(f"🛠️ Generating FastAPI wrapper for {framework} model...")
+
+    header = "import asyncio\n" if batching else ""
+    header += (
+        "import io\n"
+        "import json\n"
+        "from fastapi import FastAPI, HTTPException, Request, Response\n"
+        "import numpy as np\n"
+        "\n"
+        "try:\n"
+        "    import msgpack\n"
+        "except ImportError:  # msgpack requests are rejected with 415\n"
+        "    msgpack = None\n"
+    )
+    # Absolute, so the server can start from any working directory.
+    loader = MODEL_LOADERS[framework].format(model_file=model_path.resolve().as_posix(),
+                                             mmap_mode="r" if mmap else None)
+    if batching:
+        endpoint = BATCHING_ENDPOINT.format(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
     else:
-        raise ValueError("Unsupported framework.")
+        endpoint = SINGLE_ENDPOINT.format(single_input=SINGLE_INPUTS[framework])
 
-    wrapper_file.write_text(wrapper_code)
+    wrapper_file.write_text(header + loader + CODECS.format() + endpoint)
     typer.echo(f"✅ Wrapper generated: {wrapper_file.name}")
     return wrapper_file
@@ -3,12 +3,20 @@
 import typer
 import subprocess
 from pathlib import Path
+from typing import Optional
 
 app = typer.Typer(help="Manage project environments and dependencies.")
 
 @app.command("create")
-def create_env(tool: str = typer.Option("venv", help="Tool to use (venv, conda, poetry)")):
-    if tool == "venv":
+def create_env(
+    tool: str = typer.Option("venv", help="Tool to use (venv, conda, poetry)"),
+    shared_store: bool = typer.Option(False, help="Hardlink packages from the per-user store (venv only)"),
+    requirements: str = typer.Option(None, help="Requirements to install into the new venv with --shared-store"),
+    wheelhouse: str = typer.Option(None, help="Resolve wheels offline from this directory with --shared-store"),
+):
+    if tool == "venv" and shared_store:
+        create_store_venv(Path(requirements) if requirements else None, Path(wheelhouse) if wheelhouse else None)
+    elif tool == "venv":
         typer.echo("Creating virtual environment with venv...")
         subprocess.run(["python", "-m", "venv", ".venv"])
         typer.echo("✔️ .venv created.")
@@ -21,6 +29,27 @@ def create_env(tool: str = typer.Option("venv", help="Tool to use (venv, conda,
     else:
         typer.echo("❌ Unknown tool. Choose from: venv, conda, poetry.")
 
+
+def create_store_venv(requirements: Optional[Path], wheelhouse: Optional[Path]):
+    """
+    Create .venv with its packages hardlinked from the shared content-addressed store.
+    """
+    from raikuran.utils.store import create_linked_venv, store_dir
+
+    for path in (requirements, wheelhouse):
+        if path is not None and not path.exists():
+            typer.echo(f"❌ Not found: {path}")
+            raise typer.Exit(1)
+
+    typer.echo(f"Creating virtual environment linked to the package store ({store_dir()})...")
+    try:
+        totals = create_linked_venv(Path(".venv"), requirements, wheelhouse)
+    except subprocess.CalledProcessError as e:
+        typer.echo(f"❌ Creating the environment failed: {e}")
+        raise typer.Exit(1)
+    typer.echo(f"✔️ .venv created with {totals['packages']} package(s) "
+               f"({totals['linked']} files linked, {totals['copied']} copied).")
+
 @app.command("export")
 def export_env(format: str = typer.Option("requirements.txt", help="Format to export (requirements.txt, pyproject.toml, environment.yml)")):
     if format == "requirements.txt":
@@ -36,10 +65,13 @@ def export_env(format: str = typer.Option("requirements.txt", help="Format to ex
         typer.echo("❌ Unknown export format.")
 
 @app.command("sync")
-def sync_env(file: str = typer.Option("requirements.txt", help="Dependency file to sync (requirements.txt, pyproject.toml, environment.yml)")):
-    if file == "requirements.txt":
-        typer.echo("Installing from requirements.txt...")
-        subprocess.run(["pip", "install", "-r", "requirements.txt"])
+def sync_env(
+    file: str = typer.Option("requirements.txt", help="Dependency file to sync (requirements.txt, pyproject.toml, environment.yml)"),
+    wheelhouse: str = typer.Option(None, help="Install offline from this directory of wheels (see `env wheelhouse`)"),
+    force: bool = typer.Option(False, help="Reinstall everything with pip, skipping the installed-package check"),
+):
+    if file.endswith(".txt"):
+        sync_requirements(Path(file), Path(wheelhouse) if wheelhouse else None, force)
     elif file == "environment.yml":
         typer.echo("Creating env from environment.yml...")
         subprocess.run(["conda", "env", "create", "-f", "environment.yml"])
@@ -48,3 +80,69 @@ def sync_env(file: str = typer.Option("requirements.txt", help="Dependency file
         subprocess.run(["poetry", "install"])
     else:
         typer.echo("❌ Unsupported file format.")
+
+
+@app.command("wheelhouse")
+def build_wheelhouse(
+    file: str = typer.Option("requirements.txt", help="Requirements file to build wheels for"),
+    directory: str = typer.Option("wheelhouse", "--dir", help="Directory to collect the wheels in"),
+):
+    """
+    Build or download wheels for every requirement, for offline `env sync --wheelhouse`.
+    """
+    from raikuran.utils.envsync import target_python
+
+    if not Path(file).exists():
+        typer.echo(f"❌ File not found: {file}")
+        raise typer.Exit(1)
+    typer.echo(f"🛞 Building wheels for {file} into {directory}/...")
+    result = subprocess.run([target_python(), "-m", "pip", "wheel", "-r", file, "-w", directory])
+    if result.returncode:
+        typer.echo("❌ Building the wheelhouse failed.")
+        raise typer.Exit(result.returncode)
+    typer.echo(f"✔️ Wheelhouse ready: {directory}/")
+
+
+def sync_requirements(path: Path, wheelhouse: Optional[Path], force: bool):
+    """
+    Install only the requirements this environment is missing or has at the wrong version.
+    """
+    from raikuran.utils.envsync import (
+        DEFAULT_STATE_FILE,
+        parse_requirements,
+        pip_install,
+        plan_sync,
+        save_state,
+        target_python,
+    )
+
+    if not path.exists():
+        typer.echo(f"❌ File not found: {path}")
+        raise typer.Exit(1)
+    if wheelhouse and not wheelhouse.is_dir():
+        typer.echo(f"❌ Wheelhouse directory not found: {wheelhouse}")
+        raise typer.Exit(1)
+
+    python = target_python()
+    if force:
+        requirements = parse_requirements(path)
+        todo = requirements.specs + requirements.opaque
+    else:
+        try:
+            todo, requirements = plan_sync(path, python, DEFAULT_STATE_FILE)
+        except (OSError, subprocess.CalledProcessError, ValueError) as e:
+            typer.echo(f"❌ Could not inspect {python}: {e}")
+            raise typer.Exit(1)
+
+    if not todo:
+        typer.echo(f"✅ Environment of {python} already in sync with {path}.")
+    else:
+        source = f" from {wheelhouse}" if wheelhouse else ""
+        typer.echo(f"📦 Installing {len(todo)} missing or outdated requirement(s){source}: {', '.join(todo)}")
+        typer.echo(f"   into {python}")
+        code = pip_install(path, python, wheelhouse)
+        if code:
+            typer.echo("❌ pip install failed.")
+            raise typer.Exit(code)
+        typer.echo("✔️ Environment synced.")
+    save_state(DEFAULT_STATE_FILE, python, {"digest": requirements.digest})
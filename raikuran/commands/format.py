@@ -10,10 +10,15 @@ app = typer.Typer(help="Format code using black, isort, and ruff.")
 def format_code(
     path: str = typer.Option(".", help="Path to file or directory"),
     fix: bool = typer.Option(True, help="Fix lint issues using ruff"),
+    changed_only: bool = typer.Option(False, help="Only format files that differ from --since"),
+    since: str = typer.Option("HEAD", help="Git ref compared against with --changed-only"),
+    workers: int = typer.Option(None, help="Parallel formatter pipelines (default: number of CPU cores)"),
+    cache: bool = typer.Option(True, help="Skip files whose content is already known to be clean"),
 ):
     """
     Format Python files using standard tools.
     """
+    from raikuran.utils.formatting import format_incremental
 
     path_obj = Path(path)
     if not path_obj.exists():
@@ -23,13 +28,16 @@ def format_code(
     typer.echo(f"🧹 Formatting files in: {path_obj}")
 
     try:
-        subprocess.run(["isort", str(path_obj)])
-        subprocess.run(["black", str(path_obj)])
-        if fix:
-            subprocess.run(["ruff", "--fix", str(path_obj)])
-        else:
-            subprocess.run(["ruff", str(path_obj)])
-        typer.echo("✅ Code formatted successfully.")
+        stats = format_incremental(
+            path_obj, fix=fix, changed_since=since if changed_only else None, workers=workers, use_cache=cache
+        )
+    except subprocess.CalledProcessError:
+        typer.echo(f"❌ --changed-only needs a git repository and a valid ref (got {since}).")
+        raise typer.Exit(1)
     except Exception as e:
         typer.echo(f"❌ Formatting failed: {e}")
         raise typer.Exit(1)
+
+    typer.echo(f"✅ Code formatted successfully ({stats['reformatted']} reformatted, "
+               f"{stats['processed'] - stats['reformatted']} unchanged, {stats['skipped']} skipped via cache, "
+               f"of {stats['checked']} files).")
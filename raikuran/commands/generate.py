@@ -1,32 +1,37 @@
 # raikuran/commands/generate.py
 
 import typer
-import os
 from pathlib import Path
-from openai import OpenAI
-from openai.types.chat import ChatCompletionMessageParam
+from raikuran.utils.openai_helpers import format_estimate, prepare_request, run_chat_completion
 
 app = typer.Typer(help="Generate model code using OpenAI.")
 
-# Initialize OpenAI Client from environment variable
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    typer.echo("❌ Missing OpenAI API key. Please set OPENAI_API_KEY.")
-    raise typer.Exit()
-
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 @app.command("model")
 def generate_model(
     task: str = typer.Option(..., help="ML task (e.g., classification, regression, clustering)"),
     framework: str = typer.Option("pytorch", help="Framework to use (pytorch, tensorflow, sklearn)"),
     dataset: str = typer.Option("custom", help="Dataset name (mnist, iris, boston, or custom)"),
     output: str = typer.Option("generated_model.py", help="Output filename"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the local response cache"),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached responses and store a fresh one"),
+    llm: bool = typer.Option(False, "--llm", help="Always generate with the LLM, even if a local template exists"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show estimated tokens and cost without sending anything"),
 ):
     """
-    Generate AI/ML model code using OpenAI (GPT-4).
+    Generate AI/ML model code from a local template, or with OpenAI when none covers the combination.
     """
-    typer.echo(f"🔮 Generating {task} model with {framework} on {dataset}...")
+    if not llm:
+        from raikuran.utils.model_templates import render_template
+
+        code = render_template(task, framework, dataset)
+        if code is not None and dry_run:
+            typer.echo("🧮 Dry run: a local template covers this combination, so no request would be sent.")
+            return
+        if code is not None:
+            Path(output).write_text(code)
+            typer.echo(f"⚡ Generated {task} model with {framework} on {dataset} from a local template.")
+            typer.echo(f"✅ Model code saved to {output} (pass --llm for an LLM-written version)")
+            return
 
     prompt = f"""
 You are a Python ML engineer. Generate complete {framework} code for a {task} task.
@@ -40,17 +45,33 @@ Structure the code into:
 Ensure it's self-contained and executable as a script. Only return code, comments are acceptable.
 """
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[ {"role": "system", "content": "You are a helpful ML assistant."},
-                       {"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=1500
-        )
-        code = response.choices[0].message.content
-        Path(output).write_text(code)
-        typer.echo(f"✅ Model code saved to {output}")
-    except Exception as e:
-        typer.echo(f"❌ OpenAI Error: {e}")
-        raise typer.Exit(1)
+    messages = [{"role": "system", "content": "You are a helpful ML assistant."},
+                {"role": "user", "content": prompt}]
+    # The prompt is short and fixed; the completion is a whole script.
+    prepared = prepare_request(messages, tier="fast", min_output=1500, max_output=1500)
+    if dry_run:
+        typer.echo(format_estimate([prepared]))
+        return
+
+    typer.echo(f"🔮 Generating {task} model with {framework} on {dataset}...")
+    code = run_chat_completion(
+        messages=messages,
+        model=prepared.model,
+        temperature=0.3,
+        max_tokens=prepared.max_tokens,
+        use_cache=not no_cache,
+        refresh=refresh,
+    )
+    Path(output).write_text(code)
+    typer.echo(f"✅ Model code saved to {output}")
+
+
+@app.command("templates")
+def list_templates():
+    """
+    List the task/framework/dataset combinations covered by local templates.
+    """
+    from raikuran.utils.model_templates import available_templates
+
+    for framework, task, dataset in available_templates():
+        typer.echo(f"{framework:<11} {task:<15} {dataset}")
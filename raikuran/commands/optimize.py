@@ -1,20 +1,47 @@
 # raikuran/commands/optimize.py
 
 import typer
-import os
+import shutil
+import statistics
 from pathlib import Path
-from openai import OpenAI
+from typing import Optional
+from raikuran.utils.files import atomic_write
+from raikuran.utils.openai_helpers import compact_code, echo_token, format_estimate, prepare_request, run_chat_completion
 
 app = typer.Typer(help="Optimize your ML code using OpenAI hyperparameter suggestions.")
 
-# Load and validate OpenAI API key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    typer.echo("❌ OPENAI_API_KEY not set. Please export it in your shell or .env file.")
-    raise typer.Exit(1)
+BACKUP_SUFFIX = ".backup.py"
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+PERF_PROMPT = """
+You are a Python performance engineer. A profile of the training script `{name}` shows:
 
+{profile}
+
+These are the source regions behind the hot spots:
+
+{regions}
+
+Rewrite the functions above to run faster and allocate less: vectorize Python loops with
+numpy/torch operations, avoid repeated conversions and copies, reuse buffers, and move
+invariant work out of loops. Behaviour and outputs must stay the same.
+Module-level code is shown for context only.
+
+Return one ```python block containing only the rewritten functions (complete `def` blocks
+with unchanged names and signatures; methods inside their `class` block) plus any new imports.
+"""
+
+SPACE_PROMPT = """
+You are an expert ML engineer. The training script below defines these module-level constants:
+{constants}
+
+Propose a hyperparameter search space to optimize {objective}, using only constants that are hyperparameters.
+Answer with a JSON object only. Map each constant name to either a list of candidate values,
+or {{"low": <number>, "high": <number>, "log": <true|false>, "type": "int" or "float"}}.
+
+```python
+{code}
+```
+"""
 
 @app.command("hyperparams")
 def optimize_hyperparams(
@@ -22,9 +49,23 @@ def optimize_hyperparams(
     objective: str = typer.Option("accuracy", help="Optimization goal: accuracy, loss, f1, etc."),
     save_as: str = typer.Option(None, help="Optional new filename for optimized code"),
     preview: bool = typer.Option(False, help="Preview suggestions only, don't modify any files"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the local response cache"),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached responses and store a fresh one"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Print tokens as they arrive"),
+    search: bool = typer.Option(False, "--search", help="Measure trials of the script instead of asking for a rewrite"),
+    space: str = typer.Option(None, help="Search space as JSON or a .json file (default: proposed by the LLM)"),
+    trials: int = typer.Option(20, help="Number of trials with --search"),
+    workers: int = typer.Option(2, help="Trials run in parallel with --search"),
+    trial_timeout: float = typer.Option(None, help="Seconds before a trial is killed and marked failed"),
+    direction: str = typer.Option(None, help="maximize or minimize (default: minimize for loss/error objectives)"),
+    seed: int = typer.Option(0, help="Seed for sampling trial parameters"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show estimated tokens and cost without sending anything"),
 ):
     """
     Uses GPT-4 to optimize the hyperparameters in your ML training script.
+
+    With --search, trials of the script are run and measured instead: the
+    objective is read from lines like `accuracy: 0.93` in its output.
     """
 
     file_path = Path(file)
@@ -41,6 +82,16 @@ def optimize_hyperparams(
     typer.echo(f"🔎 Optimizing hyperparameters in: {file}")
     typer.echo(f"🎯 Goal: {objective}")
 
+    if search:
+        if dry_run:
+            typer.echo("❌ --dry-run estimates the LLM rewrite; it can't be combined with --search.")
+            raise typer.Exit(1)
+        search_hyperparams(
+            file_path, original_code, objective, space, trials, workers, trial_timeout, direction, seed,
+            save_as, preview, not no_cache, refresh,
+        )
+        return
+
     prompt = f"""
 You are an expert ML engineer. Improve the following Python training script to optimize for {objective}.
 
@@ -60,41 +111,250 @@ Only return valid, runnable Python code.
 
 Here is the code:
 ```python
-{original_code}
+{compact_code(original_code, strip_comments=False)}
 ```
 """
 
+    messages = [
+        {"role": "system", "content": "You are a senior AI code optimizer."},
+        {"role": "user", "content": prompt}
+    ]
+    prepared = prepare_request(messages, tier="fast", output_ratio=1.3, max_output=4096)
+    if dry_run:
+        typer.echo(format_estimate([prepared]))
+        return
+    request = dict(
+        model=prepared.model,
+        temperature=0.2,
+        max_tokens=prepared.max_tokens,
+        use_cache=not no_cache,
+        refresh=refresh,
+    )
+
+    # Handle preview mode (print only)
+    if preview:
+        typer.echo("\n📘 Suggested Optimized Code:\n")
+        if stream:
+            run_chat_completion(messages, on_token=echo_token, **request)
+        else:
+            print(run_chat_completion(messages, **request))
+        return
+
+    target = Path(save_as) if save_as else file_path
+    backup_path = file_path.with_suffix(BACKUP_SUFFIX)
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a senior AI code optimizer."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
-            max_tokens=1800
-        )
+        if not save_as:
+            # Backup original before it gets replaced
+            shutil.copy2(file_path, backup_path)
 
-        optimized_code = response.choices[0].message.content
+        # Stream into a temp file that atomically replaces the target when complete
+        with atomic_write(target) as out:
+            if stream:
+                def on_token(text: str) -> None:
+                    out.write(text)
+                    echo_token(text)
 
-        # Handle preview mode (print only)
-        if preview:
-            typer.echo("\n📘 Suggested Optimized Code:\n")
-            print(optimized_code)
-            return
+                run_chat_completion(messages, on_token=on_token, **request)
+            else:
+                out.write(run_chat_completion(messages, **request))
 
-        # Save as new file
-        if save_as:
-            Path(save_as).write_text(optimized_code)
-            typer.echo(f"✅ Optimized code written to: {save_as}")
-        else:
-            # Backup original
-            backup_path = file_path.with_suffix(".backup.py")
-            file_path.rename(backup_path)
-            Path(file_path).write_text(optimized_code)
-            typer.echo(f"✅ Code overwritten in: {file_path.name}")
-            typer.echo(f"🛡️  Backup saved as: {backup_path.name}")
+    except typer.Exit:
+        raise
+    except Exception as e:
+        typer.echo(f"❌ Failed to write optimized code: {e}")
+        raise typer.Exit(1)
+
+    if save_as:
+        typer.echo(f"✅ Optimized code written to: {save_as}")
+    else:
+        typer.echo(f"✅ Code overwritten in: {file_path.name}")
+        typer.echo(f"🛡️  Backup saved as: {backup_path.name}")
+
+
+def search_hyperparams(
+    file_path: Path,
+    original_code: str,
+    objective: str,
+    space: Optional[str],
+    trials: int,
+    workers: int,
+    trial_timeout: Optional[float],
+    direction: Optional[str],
+    seed: int,
+    save_as: Optional[str],
+    preview: bool,
+    use_cache: bool,
+    refresh: bool,
+):
+    """
+    Run a measured hyperparameter search and write the best configuration back.
+    """
+    import json
+
+    from raikuran.utils.chunking import strip_code_fences
+    from raikuran.utils.hpsearch import apply_params, find_constants, parse_space, run_search
+
+    if direction not in (None, "maximize", "minimize"):
+        typer.echo("❌ --direction must be 'maximize' or 'minimize'.")
+        raise typer.Exit(1)
+
+    constants = find_constants(original_code)
+    if space:
+        spec_text = Path(space).read_text() if space.endswith(".json") and Path(space).exists() else space
+    else:
+        typer.echo("🧭 Asking the LLM for a search space...")
+        listing = "\n".join(f"- {name} = {value!r}" for name, value in constants.items())
+        messages = [
+            {"role": "system", "content": "You are a senior AI code optimizer."},
+            {"role": "user", "content": SPACE_PROMPT.format(
+                constants=listing, objective=objective, code=compact_code(original_code, strip_comments=True))},
+        ]
+        prepared = prepare_request(messages, tier="fast", min_output=600, max_output=600)
+        spec_text = strip_code_fences(run_chat_completion(
+            messages, model=prepared.model, temperature=0.2, max_tokens=prepared.max_tokens,
+            use_cache=use_cache, refresh=refresh,
+        ))
 
+    try:
+        search_space = parse_space(json.loads(spec_text), constants)
+    except ValueError as e:
+        typer.echo(f"❌ Invalid search space: {e}")
+        raise typer.Exit(1)
+    typer.echo(f"🗺️  Search space: {json.dumps(search_space)}")
+
+    best = run_search(file_path, search_space, objective, direction, trials, workers, trial_timeout, seed)
+    if best is None:
+        typer.echo("❌ No trial completed; check that the script prints the objective (e.g. 'accuracy: 0.93').")
+        raise typer.Exit(1)
+    typer.echo(f"🏆 Best trial {best['number']}: {objective}={best['value']:.6g} with {best['params']}")
+    if preview:
+        return
+
+    target = Path(save_as) if save_as else file_path
+    backup_path = file_path.with_suffix(BACKUP_SUFFIX)
+    if not save_as:
+        shutil.copy2(file_path, backup_path)
+    with atomic_write(target) as out:
+        out.write(apply_params(original_code, best["params"]))
+
+    if save_as:
+        typer.echo(f"✅ Optimized code written to: {save_as}")
+    else:
+        typer.echo(f"✅ Code overwritten in: {file_path.name}")
+        typer.echo(f"🛡️  Backup saved as: {backup_path.name}")
+
+
+@app.command("perf")
+def optimize_perf(
+    file: str = typer.Option(..., "--file", "-f", help="Path to the script to speed up"),
+    budget: float = typer.Option(60.0, help="Seconds each profiling run may take"),
+    repeat: int = typer.Option(3, help="Timed runs of the original and the candidate compared by median"),
+    top: int = typer.Option(5, help="Number of hot functions and allocation sites to target"),
+    save_as: str = typer.Option(None, help="Optional new filename for the optimized code"),
+    preview: bool = typer.Option(False, help="Measure the candidate but don't modify any files"),
+    force: bool = typer.Option(False, help="Save the candidate even if it isn't measurably faster"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the local response cache"),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached responses and store a fresh one"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Profile, then show estimated tokens and cost without sending"),
+):
+    """
+    Profile a script and ask GPT-4 to rewrite only its measured hot spots.
+    """
+    from raikuran.utils.chunking import strip_code_fences
+    from raikuran.utils.profiling import (
+        MIN_SPEEDUP, format_profile, hot_regions, measured_speedup, profile_script, replace_functions, time_script,
+    )
+
+    file_path = Path(file)
+    if not file_path.exists():
+        typer.echo(f"❌ File not found: {file}")
+        raise typer.Exit(1)
+    original_code = file_path.read_text()
+
+    typer.echo(f"⏱️  Profiling {file} (budget {budget:g}s)...")
+    try:
+        baseline = profile_script(file_path, budget)
     except Exception as e:
-        typer.echo(f"❌ Error during OpenAI request: {e}")
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(1)
+    report = format_profile(baseline, top)
+    typer.echo(report)
+
+    regions = hot_regions(original_code, baseline, top)
+    if not [label for label, _, _ in regions if label != "<module>"]:
+        typer.echo("❌ No hot functions found in the script itself; nothing to rewrite.")
+        raise typer.Exit(1)
+    lines = original_code.splitlines()
+    listing = "\n\n".join(
+        f"# {label} (lines {start}-{end})\n```python\n" + "\n".join(lines[start - 1:end]) + "\n```"
+        for label, start, end in regions
+    )
+
+    messages = [
+        {"role": "system", "content": "You are a senior AI code optimizer."},
+        {"role": "user", "content": PERF_PROMPT.format(name=file_path.name, profile=report, regions=listing)},
+    ]
+    prepared = prepare_request(messages, tier="smart", output_ratio=1.0, max_output=4096)
+    if dry_run:
+        typer.echo(format_estimate([prepared]))
+        return
+    typer.echo(f"🧠 Asking for rewrites of {len(regions)} region(s)...")
+    response = run_chat_completion(
+        messages, model=prepared.model, temperature=0.2, max_tokens=prepared.max_tokens,
+        use_cache=not no_cache, refresh=refresh,
+    )
+    try:
+        candidate_code, replaced = replace_functions(original_code, strip_code_fences(response))
+    except SyntaxError as e:
+        typer.echo(f"❌ The suggested code does not parse: {e}")
+        raise typer.Exit(1)
+    if not replaced:
+        typer.echo("❌ The suggestion did not rewrite any function of the script.")
         raise typer.Exit(1)
+    typer.echo(f"✏️  Rewrote: {', '.join(replaced)}")
+
+    # Profile the candidate next to the original so relative paths and imports still resolve.
+    candidate_path = file_path.with_name(f".{file_path.stem}.perf_candidate.py")
+    candidate_path.write_text(candidate_code)
+    try:
+        candidate = profile_script(candidate_path, budget)
+        faster = False
+        if baseline.completed and candidate.completed:
+            # Single profiled runs are too noisy to decide on; compare repeated plain runs.
+            typer.echo(f"⏱️  Timing {max(1, repeat)} run(s) of each version...")
+            before = time_script(file_path, max(1, repeat), budget + 60)
+            after = time_script(candidate_path, max(1, repeat), budget + 60)
+            speedup, faster = measured_speedup(before, after)
+            typer.echo(f"📊 {statistics.median(before):.3f}s → {statistics.median(after):.3f}s "
+                       f"(median of {len(before)} runs: {speedup:.2f}x), peak memory "
+                       f"{baseline.peak_bytes / 1e6:.1f} → {candidate.peak_bytes / 1e6:.1f} MB")
+        else:
+            typer.echo("⚠️  A run hit the time budget, so the speedup can't be measured; raise --budget.")
+    except Exception as e:
+        typer.echo(f"❌ The candidate failed to run: {e}")
+        raise typer.Exit(1)
+    finally:
+        candidate_path.unlink(missing_ok=True)
+    if candidate.stdout != baseline.stdout:
+        typer.echo("⚠️  The candidate's output differs from the original's; review it before use.")
+
+    if preview:
+        typer.echo("\n📘 Candidate code:\n")
+        print(candidate_code)
+        return
+    if not force and (not faster or candidate.stdout != baseline.stdout):
+        typer.echo(f"🛑 Not saved: the candidate isn't a consistent, output-preserving speedup of at least "
+                   f"{MIN_SPEEDUP - 1:.0%} (use --force to keep it).")
+        return
+
+    target = Path(save_as) if save_as else file_path
+    backup_path = file_path.with_suffix(BACKUP_SUFFIX)
+    if not save_as:
+        shutil.copy2(file_path, backup_path)
+    with atomic_write(target) as out:
+        out.write(candidate_code)
+    if save_as:
+        typer.echo(f"✅ Optimized code written to: {save_as}")
+    else:
+        typer.echo(f"✅ Code overwritten in: {file_path.name}")
+        typer.echo(f"🛡️  Backup saved as: {backup_path.name}")
@@ -8,7 +8,9 @@ app = typer.Typer(help="Build and publish your project as a package or container
 
 @app.command("create")
 def create_package(
-    tool: str = typer.Option("setuptools", help="Packaging tool: setuptools or poetry")
+    tool: str = typer.Option("setuptools", help="Packaging tool: setuptools or poetry"),
+    isolation: bool = typer.Option(True, help="Build in a cached isolated environment with the declared build requirements"),
+    cache: bool = typer.Option(True, help="Reuse artifacts when sources and build config are unchanged"),
 ):
     """
     Create Python package (sdist + wheel).
@@ -16,12 +18,16 @@ def create_package(
     typer.echo("📦 Building Python package...")
 
     if tool == "setuptools":
-        if not Path("setup.py").exists():
-            typer.echo("❌ Missing setup.py. Cannot package without it.")
+        from raikuran.utils.builds import build_project
+
+        if not Path("setup.py").exists() and not Path("pyproject.toml").exists():
+            typer.echo("❌ Missing setup.py or pyproject.toml. Cannot package without it.")
             raise typer.Exit(1)
 
         try:
-            subprocess.run(["python", "setup.py", "sdist", "bdist_wheel"], check=True)
+            artifacts = build_project(Path("."), Path("dist"), isolated=isolation, use_cache=cache)
+            for artifact in artifacts:
+                typer.echo(f"   {artifact}")
             typer.echo("✅ Package built successfully in /dist")
         except subprocess.CalledProcessError:
             typer.echo("❌ Packaging failed.")
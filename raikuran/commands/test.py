@@ -3,6 +3,7 @@
 import typer
 import subprocess
 from pathlib import Path
+from typing import List, Optional
 
 app = typer.Typer(help="Run unit tests using pytest or unittest.")
 
@@ -11,6 +12,13 @@ def run_tests(
     path: str = typer.Option("tests", help="Path to test folder or file"),
     framework: str = typer.Option("pytest", help="Testing framework: 'pytest' or 'unittest'"),
     extra: str = typer.Option("", help="Additional CLI flags to pass to the test runner"),
+    impacted: bool = typer.Option(False, help="Only run tests that import (transitively) a changed file"),
+    since: str = typer.Option("HEAD", help="Git ref to diff against with --impacted"),
+    changed: str = typer.Option(None, help="Comma-separated changed files for --impacted (instead of git diff)"),
+    shards: int = typer.Option(None, help="Split test files across N parallel pytest processes, balanced by duration"),
+    shard: str = typer.Option(None, help="Run only shard i of N (e.g. 2/4), for splitting across CI machines"),
+    junit_xml: str = typer.Option(None, help="Write a merged JUnit XML report (with --shards/--shard)"),
+    durations_file: str = typer.Option(None, help="Test duration history (default: .raikuran/test_durations.json)"),
 ):
     """
     Run tests for your project using pytest or unittest.
@@ -19,6 +27,8 @@ def run_tests(
         raikuran test run --framework pytest
         raikuran test run --path tests/test_file.py --framework unittest
         raikuran test run --extra '--cov=src -v'
+        raikuran test run --impacted --since origin/main
+        raikuran test run --shards 4 --junit-xml report.xml
     """
 
     test_path = Path(path)
@@ -30,17 +40,31 @@ def run_tests(
     typer.echo(f"🧪 Running tests using: {framework}")
     typer.echo(f"📂 Target path: {test_path}")
 
+    targets = [test_path]
+    if impacted:
+        selected = select_impacted(test_path, since, changed)
+        if selected is not None:
+            if not selected:
+                typer.echo("✅ No tests are impacted by the changes.")
+                return
+            typer.echo(f"🎯 {len(selected)} impacted test file(s) selected.")
+            targets = selected
+
+    if shards or shard:
+        run_shards(targets, framework, shards, shard, extra, junit_xml, durations_file)
+        return
+
     # Prepare the base command
     if framework.lower() == "pytest":
-        command = ["pytest", str(test_path)]
+        command = ["pytest", *map(str, targets)]
         if extra:
             command += extra.strip().split()
 
     elif framework.lower() == "unittest":
-        if test_path.is_dir():
+        if targets == [test_path] and test_path.is_dir():
             command = ["python", "-m", "unittest", "discover", "-s", str(test_path)]
         else:
-            command = ["python", "-m", "unittest", str(test_path)]
+            command = ["python", "-m", "unittest", *map(str, targets)]
         if extra:
             command += extra.strip().split()
 
@@ -59,3 +83,71 @@ def run_tests(
     except Exception as e:
         typer.echo(f"❌ Unexpected error: {e}")
         raise typer.Exit(1)
+
+
+def select_impacted(test_path: Path, since: str, changed: Optional[str]) -> Optional[List[Path]]:
+    """
+    Test files affected by the changed files, or None to run the whole suite.
+    """
+    from raikuran.utils.files import changed_files
+    from raikuran.utils.impact import impacted_tests
+
+    root = Path.cwd().resolve()
+    if changed:
+        changed_paths = {Path(name.strip()) for name in changed.split(",") if name.strip()}
+    else:
+        try:
+            changed_paths = changed_files(root, since, include_deleted=True)
+        except (OSError, subprocess.CalledProcessError):
+            typer.echo(f"⚠️  Could not diff against {since}; running the full suite.")
+            return None
+
+    selected = impacted_tests(root, test_path, changed_paths)
+    if selected is None:
+        typer.echo("🌐 Changes affect the whole suite (config, conftest or non-Python files).")
+        return None
+    return [path.relative_to(root) if root in path.parents else path for path in selected]
+
+
+def run_shards(
+    targets: List[Path],
+    framework: str,
+    shards: Optional[int],
+    shard: Optional[str],
+    extra: str,
+    junit_xml: Optional[str],
+    durations_file: Optional[str],
+):
+    """
+    Run the test files under `targets` in duration-balanced shards.
+    """
+    from raikuran.utils.files import python_files
+    from raikuran.utils.impact import is_test_file
+    from raikuran.utils.sharding import DurationHistory, parse_shard_spec, run_sharded
+
+    if framework.lower() != "pytest":
+        typer.echo("❌ Sharding runs through pytest (which also collects unittest tests); use --framework pytest.")
+        raise typer.Exit(1)
+
+    only = None
+    if shard:
+        try:
+            only, shards = parse_shard_spec(shard)
+        except ValueError:
+            typer.echo(f"❌ Invalid --shard {shard!r}; expected i/N, e.g. 2/4.")
+            raise typer.Exit(1)
+    if shards < 1:
+        typer.echo("❌ --shards must be at least 1.")
+        raise typer.Exit(1)
+
+    root = Path.cwd().resolve()
+    files = sorted({
+        path.resolve().relative_to(root) if root in path.resolve().parents else path
+        for target in targets for path in python_files(target) if is_test_file(path)
+    })
+    history = DurationHistory(Path(durations_file) if durations_file else None)
+    code = run_sharded(files, shards, only, extra.strip().split(), Path(junit_xml) if junit_xml else None, history)
+    if code:
+        typer.echo("❌ Tests failed with errors.")
+        raise typer.Exit(code)
+    typer.echo("✅ Tests completed.")
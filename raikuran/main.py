@@ -1,41 +1,63 @@
 # raikuran/main.py
 
+import os
+import sys
+
 import typer
 from rich import print
+from typer.core import TyperGroup
 from raikuran import __version__
-from raikuran.commands import (
-    init,
-    generate,
-    deploy,
-    optimize,
-    assist,
-    env,
-    format as fmt,
-    test,
-    package
-)
+from raikuran.utils.lazy_groups import LazyTyperGroup
+
+# Command groups: name -> (module path, help). Modules are imported only when
+# their group is invoked, so `raikuran --help` and light commands like
+# `format run` never pay for openai/torch imports.
+COMMAND_GROUPS = {
+    "init": ("raikuran.commands.init", "📁 Initialize project scaffolding."),
+    "env": ("raikuran.commands.env", "🐍 Manage virtual environments and dependencies."),
+    "generate": ("raikuran.commands.generate", "🤖 Generate model code using OpenAI."),
+    "optimize": ("raikuran.commands.optimize", "🎯 Optimize hyperparameters with AI."),
+    "deploy": ("raikuran.commands.deploy", "🚀 Deploy models via FastAPI or Streamlit."),
+    "assist": ("raikuran.commands.assist", "🧠 Explain, refactor, or comment code."),
+    "format": ("raikuran.commands.format", "🧹 Format code using black/isort/ruff."),
+    "test": ("raikuran.commands.test", "🧪 Run tests with pytest or unittest."),
+    "package": ("raikuran.commands.package", "📦 Package and publish your project."),
+}
+
+
+class RaikuranGroup(TyperGroup):
+    """
+    Root command group that registers every entry of COMMAND_GROUPS lazily.
+    """
+
+    def __init__(self, **attrs):
+        super().__init__(**attrs)
+        for name, (import_path, help_text) in COMMAND_GROUPS.items():
+            self.add_command(LazyTyperGroup(name, import_path, help_text))
+
 
 app = typer.Typer(
     name="Raikuran",
     help="⚡ Raikuran CLI — Dev tools for Python + AI/ML workflows.",
+    cls=RaikuranGroup,
     add_completion=True,
     no_args_is_help=True
 )
 
-# Register command groups
-app.add_typer(init.app, name="init", help="📁 Initialize project scaffolding.")
-app.add_typer(env.app, name="env", help="🐍 Manage virtual environments and dependencies.")
-app.add_typer(generate.app, name="generate", help="🤖 Generate model code using OpenAI.")
-app.add_typer(optimize.app, name="optimize", help="🎯 Optimize hyperparameters with AI.")
-app.add_typer(deploy.app, name="deploy", help="🚀 Deploy models via FastAPI or Streamlit.")
-app.add_typer(assist.app, name="assist", help="🧠 Explain, refactor, or comment code.")
-app.add_typer(fmt.app, name="format", help="🧹 Format code using black/isort/ruff.")
-app.add_typer(test.app, name="test", help="🧪 Run tests with pytest or unittest.")
-app.add_typer(package.app, name="package", help="📦 Package and publish your project.")
-
 @app.callback()
-def main_callback():
+def main_callback(
+    ctx: typer.Context,
+    profile: bool = typer.Option(
+        False, "--profile", help="Write a Chrome trace of this run and print where the time went (or set RAIKURAN_TRACE)"
+    ),
+):
     print(f"\n[bold cyan]Raikuran CLI[/bold cyan] ⚡  [dim]v{__version__}[/dim]")
+    setting = os.getenv("RAIKURAN_TRACE", "")
+    if profile or setting.strip().lower() not in ("", "0", "false", "no", "off"):
+        from raikuran.utils.tracing import start_tracing, stop_tracing, trace_path
+
+        start_tracing(trace_path(setting, ctx.invoked_subcommand), "raikuran " + " ".join(sys.argv[1:]))
+        ctx.call_on_close(stop_tracing)
 
 if __name__ == "__main__":
     app()
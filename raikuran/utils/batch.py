@@ -0,0 +1,222 @@
+# raikuran/utils/batch.py
+
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import typer
+
+
+class BatchJob(NamedTuple):
+    """
+    One unit of batch work.
+
+    `key` identifies the job in the progress journal, `fingerprint` detects
+    changed inputs on resume, and `cost` is the estimated token usage charged
+    against the tokens-per-minute budget (0 skips rate limiting, e.g. for
+    responses that are already cached). `requests` is the number of API calls
+    the job makes, charged against the requests-per-minute budget.
+    """
+    key: str
+    fingerprint: str
+    cost: int
+    payload: Any
+    requests: int = 1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` units per minute.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(float(per_minute), 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        # Requests larger than the bucket would never fit; let them drain it instead.
+        amount = min(float(amount), self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets with adaptive 429 backoff.
+
+    A rate-limit response pauses every worker (honouring Retry-After when the
+    API sends it) and doubles the backoff; each success halves it again.
+    """
+
+    def __init__(self, rpm: int, tpm: int, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.backoff = base_backoff
+        self.paused_until = 0.0
+
+    async def acquire(self, tokens: int, requests: int = 1) -> None:
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        await self.requests.acquire(requests)
+        await self.tokens.acquire(tokens)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        delay = retry_after if retry_after else self.backoff * (1 + random.random() * 0.25)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+        return delay
+
+    def on_success(self) -> None:
+        self.backoff = max(self.base_backoff, self.backoff / 2)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """
+    True for HTTP 429 errors raised by the OpenAI client.
+    """
+    return getattr(exc, "status_code", None) == 429
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Extract a Retry-After delay (in seconds) from an API error, if present.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ProgressJournal:
+    """
+    Append-only JSONL log of finished jobs, used to resume interrupted runs.
+
+    A job counts as done only if its last entry has status "done" and the
+    same fingerprint, so edited inputs are processed again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # tolerate a torn last line from an interrupted run
+                self.entries[entry["key"]] = entry
+
+    def is_done(self, key: str, fingerprint: str) -> bool:
+        entry = self.entries.get(key)
+        return bool(entry) and entry["status"] == "done" and entry["fingerprint"] == fingerprint
+
+    def record(self, key: str, fingerprint: str, status: str, **extra: Any) -> None:
+        entry = {"key": key, "fingerprint": fingerprint, "status": status, "time": time.time(), **extra}
+        self.entries[key] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry) + "\n")
+
+
+def run_batch(
+    jobs: Iterable[BatchJob],
+    process: Callable[[BatchJob], None],
+    journal: ProgressJournal,
+    concurrency: int = 4,
+    rpm: int = 60,
+    tpm: int = 90000,
+    max_retries: int = 5,
+) -> Dict[str, int]:
+    """
+    Run `process` over `jobs` with a pool of asyncio workers.
+
+    `process` is a blocking callable (typically an API request plus writing the
+    result); it runs in a thread pool so up to `concurrency` requests are in
+    flight at once. Jobs already marked done in the journal are skipped, and
+    rate-limited jobs are re-queued after a shared backoff.
+
+    Returns:
+        dict: Counts of "done", "skipped" and "failed" jobs
+    """
+    pending: List[BatchJob] = []
+    summary = {"done": 0, "skipped": 0, "failed": 0}
+    for job in jobs:
+        if journal.is_done(job.key, job.fingerprint):
+            summary["skipped"] += 1
+        else:
+            pending.append(job)
+
+    if pending:
+        asyncio.run(_run_workers(pending, process, journal, summary, concurrency, rpm, tpm, max_retries))
+    return summary
+
+
+async def _run_workers(
+    jobs: List[BatchJob],
+    process: Callable[[BatchJob], None],
+    journal: ProgressJournal,
+    summary: Dict[str, int],
+    concurrency: int,
+    rpm: int,
+    tpm: int,
+    max_retries: int,
+) -> None:
+    loop = asyncio.get_running_loop()
+    limiter = RateLimiter(rpm, tpm)
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait((job, 0))
+    total = len(jobs)
+
+    async def worker() -> None:
+        while True:
+            try:
+                job, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            if job.cost:
+                await limiter.acquire(job.cost, job.requests)
+            try:
+                await loop.run_in_executor(executor, process, job)
+            except Exception as exc:
+                if is_rate_limit_error(exc) and attempt < max_retries:
+                    delay = limiter.on_rate_limited(retry_after_seconds(exc))
+                    typer.echo(f"⏳ Rate limited on {job.key}; backing off {delay:.1f}s")
+                    queue.put_nowait((job, attempt + 1))
+                    continue
+                summary["failed"] += 1
+                journal.record(job.key, job.fingerprint, "failed", error=str(exc))
+                typer.echo(f"❌ {job.key}: {exc}")
+                continue
+
+            limiter.on_success()
+            summary["done"] += 1
+            journal.record(job.key, job.fingerprint, "done")
+            typer.echo(f"✅ [{summary['done'] + summary['failed']}/{total}] {job.key}")
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
@@ -0,0 +1,209 @@
+# raikuran/utils/builds.py
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import typer
+
+from raikuran.utils.files import SKIP_DIRS
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "raikuran" / "builds"
+# PEP 517's fallback for projects without a [build-system] table.
+LEGACY_BUILD_SYSTEM = {"requires": ["setuptools>=40.8.0", "wheel"], "build-backend": "setuptools.build_meta:__legacy__"}
+# Fixed archive timestamps (1980-01-01, the earliest zip date) unless the caller sets their own.
+DEFAULT_SOURCE_DATE_EPOCH = "315532800"
+
+# Runs inside the build environment's interpreter and calls one PEP 517 hook in-process.
+HOOK_DRIVER = """
+import importlib, json, sys
+
+hook, backend_spec, backend_path, output_dir, result_file = sys.argv[1:6]
+sys.path[:0] = json.loads(backend_path)
+module_name, _, attr = backend_spec.partition(":")
+backend = importlib.import_module(module_name)
+for part in filter(None, attr.split(".")):
+    backend = getattr(backend, part)
+
+if hook == "requires":
+    result = []
+    for name in ("get_requires_for_build_sdist", "get_requires_for_build_wheel"):
+        if hasattr(backend, name):
+            result += getattr(backend, name)()
+else:
+    result = getattr(backend, "build_" + hook)(output_dir)
+with open(result_file, "w") as handle:
+    json.dump(result, handle)
+"""
+
+
+def cache_root() -> Path:
+    return Path(os.getenv("RAIKURAN_BUILD_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
+def build_system(project: Path) -> Dict[str, Any]:
+    """
+    The project's [build-system] table, or the setuptools legacy fallback.
+    """
+    pyproject = project / "pyproject.toml"
+    if not pyproject.exists():
+        return dict(LEGACY_BUILD_SYSTEM)
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+    table = tomllib.loads(pyproject.read_text()).get("build-system", {})
+    return {
+        "requires": table.get("requires", LEGACY_BUILD_SYSTEM["requires"]),
+        "build-backend": table.get("build-backend", LEGACY_BUILD_SYSTEM["build-backend"]),
+        "backend-path": table.get("backend-path", []),
+    }
+
+
+def source_files(project: Path) -> List[Path]:
+    """
+    Files that make up the source tree: git-tracked and unignored files, or a filtered walk.
+    """
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "--cached", "--others", "--exclude-standard", "-z"],
+            cwd=project, capture_output=True, text=True, check=True,
+        ).stdout
+        files = [Path(name) for name in listed.split("\0") if name]
+        return sorted(f for f in files if (project / f).is_file())
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    skip = SKIP_DIRS | {"dist"}
+    files = []
+    for dirpath, dirnames, filenames in os.walk(project):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip and not d.endswith(".egg-info"))
+        files.extend(Path(dirpath, name).relative_to(project) for name in sorted(filenames))
+    return files
+
+
+def build_key(project: Path, files: List[Path], system: Dict[str, Any], isolated: bool) -> str:
+    """
+    Hash of the source tree plus everything else that decides the build output.
+    """
+    digest = hashlib.sha256()
+    config = {
+        "system": system,
+        "isolated": isolated,
+        "python": sys.version,
+        "source_date_epoch": os.getenv("SOURCE_DATE_EPOCH", DEFAULT_SOURCE_DATE_EPOCH),
+    }
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    for rel in files:
+        digest.update(rel.as_posix().encode() + b"\0")
+        digest.update(hashlib.sha256((project / rel).read_bytes()).digest())
+        digest.update(oct((project / rel).stat().st_mode & 0o777).encode())
+    return digest.hexdigest()
+
+
+def build_env(requires: List[str]) -> Path:
+    """
+    Python of a cached virtual environment with `requires` installed (created on first use).
+    """
+    key = hashlib.sha256(json.dumps([sys.version, sorted(requires)]).encode()).hexdigest()[:16]
+    env = cache_root() / "envs" / key
+    python = env / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+    if not (env / ".complete").exists():
+        typer.echo(f"🧰 Creating build environment: {', '.join(requires)}")
+        shutil.rmtree(env, ignore_errors=True)
+        subprocess.run([sys.executable, "-m", "venv", str(env)], check=True)
+        subprocess.run([str(python), "-m", "pip", "install", "--quiet", *requires], check=True)
+        (env / ".complete").write_text(json.dumps(sorted(requires)))
+    return python
+
+
+def call_hook(python: Path, hook: str, source: Path, system: Dict[str, Any], output: Path) -> Any:
+    """
+    Run one PEP 517 hook with `python` in `source` and return its result.
+    """
+    result_file = output / f".{hook}-result.json"
+    env = {**os.environ, "SOURCE_DATE_EPOCH": os.getenv("SOURCE_DATE_EPOCH", DEFAULT_SOURCE_DATE_EPOCH),
+           "PYTHONHASHSEED": "0"}
+    backend_path = [str(source / p) for p in system.get("backend-path", [])]
+    subprocess.run(
+        [str(python), "-c", HOOK_DRIVER, hook, system["build-backend"], json.dumps(backend_path),
+         str(output), str(result_file)],
+        cwd=source, env=env, check=True,
+    )
+    result = json.loads(result_file.read_text())
+    result_file.unlink()
+    return result
+
+
+def _copy_tree(project: Path, files: List[Path], target: Path) -> None:
+    for rel in files:
+        destination = target / rel
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(project / rel, destination)
+
+
+def build_project(
+    project: Path,
+    dist_dir: Path,
+    isolated: bool = True,
+    use_cache: bool = True,
+) -> List[Path]:
+    """
+    Build an sdist and a wheel through the project's PEP 517 backend.
+
+    Results are cached under a hash of the source tree and build config, so an
+    unchanged project is "built" by copying the cached artifacts. Otherwise the
+    backend's hooks run in a cached, isolated build environment (or the current
+    interpreter when `isolated` is False), with the sdist and wheel built
+    concurrently from private copies of the source tree. Archive timestamps
+    come from SOURCE_DATE_EPOCH (fixed by default), so wheels are byte-reproducible.
+
+    Returns:
+        list: Paths of the artifacts in `dist_dir`
+    """
+    project = Path(project).resolve()
+    system = build_system(project)
+    files = source_files(project)
+    cache_dir = cache_root() / "artifacts" / build_key(project, files, system, isolated)
+    dist_dir.mkdir(parents=True, exist_ok=True)
+
+    if use_cache and (cache_dir / ".complete").exists():
+        typer.echo("♻️  Sources unchanged since the last build; reusing cached artifacts.")
+    else:
+        python = build_env(system["requires"]) if isolated else Path(sys.executable)
+        with tempfile.TemporaryDirectory(prefix="raikuran-build-") as tmp:
+            staging = Path(tmp) / "out"
+            staging.mkdir()
+            sources = {hook: Path(tmp) / hook for hook in ("sdist", "wheel")}
+            for source in sources.values():
+                _copy_tree(project, files, source)
+
+            if isolated:
+                extra = call_hook(python, "requires", sources["wheel"], system, staging)
+                missing = sorted(set(extra) - set(system["requires"]))
+                if missing:
+                    python = build_env(system["requires"] + missing)
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(call_hook, python, hook, source, system, staging)
+                           for hook, source in sources.items()]
+                for future in futures:
+                    future.result()
+
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            shutil.copytree(staging, cache_dir)
+            (cache_dir / ".complete").touch()
+
+    artifacts = []
+    for artifact in sorted(cache_dir.iterdir()):
+        if artifact.name.startswith("."):
+            continue
+        shutil.copy2(artifact, dist_dir / artifact.name)
+        artifacts.append(dist_dir / artifact.name)
+    return artifacts
@@ -0,0 +1,114 @@
+# raikuran/utils/cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Defaults can be overridden per environment (e.g. a shared CI cache volume).
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "raikuran" / "responses"
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 7 days
+
+
+def cache_key(**payload: Any) -> str:
+    """
+    Build a content address for a request payload.
+
+    The payload is serialized with sorted keys so that logically identical
+    requests always hash to the same key.
+    """
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for LLM responses.
+
+    Each entry is a small JSON file named after its key. Reads refresh the
+    file's mtime, so eviction (oldest mtime first, once the store exceeds
+    `max_bytes`) behaves as LRU. Entries older than `ttl` seconds are ignored
+    and removed on access.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.directory = Path(directory or os.getenv("RAIKURAN_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("RAIKURAN_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        self.ttl = ttl if ttl is not None else float(os.getenv("RAIKURAN_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached content for `key`, or None on a miss or expired entry.
+        """
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return entry.get("content")
+
+    def set(self, key: str, content: str, **metadata: Any) -> None:
+        """
+        Store `content` under `key`, then evict least recently used entries.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {"created": time.time(), "content": content, **metadata}
+        path = self._path(key)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{key}.", suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, ensure_ascii=False))
+        os.replace(tmp_name, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Delete the least recently used entries until the store fits `max_bytes`.
+        """
+        entries: List[Dict[str, Any]] = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append({"path": path, "size": stat.st_size, "mtime": stat.st_mtime})
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for entry in sorted(entries, key=lambda e: e["mtime"]):
+            entry["path"].unlink(missing_ok=True)
+            total -= entry["size"]
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """
+        Remove every cached entry.
+        """
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
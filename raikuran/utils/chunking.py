@@ -0,0 +1,111 @@
+# raikuran/utils/chunking.py
+
+import ast
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Default cap on parallel chunk requests for one file.
+MAX_CHUNK_WORKERS = 4
+
+_FENCE_RE = re.compile(r"^\s*```[\w+-]*\s*\n(.*?)\n?\s*```\s*$", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budgeting (~4 characters per token for code and English).
+    """
+    return len(text) // 4 + 1
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Remove a surrounding ```python ... ``` fence from a model response, if present.
+    """
+    match = _FENCE_RE.match(text)
+    return match.group(1) if match else text
+
+
+def _segment_starts(nodes: List[ast.stmt], lines: List[str], floor: int) -> List[int]:
+    """
+    0-based start line of each node, pulled up over the decorators, comments and
+    blank lines directly above it so they stay with the code they describe.
+    """
+    starts = []
+    for node in nodes:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+        while start > floor and lines[start - 1].strip().startswith("#"):
+            start -= 1
+        starts.append(start)
+        floor = start + 1
+    return starts
+
+
+def _split_lines(lines: List[str], start: int, end: int, nodes: List[ast.stmt], max_tokens: int) -> List[str]:
+    """
+    Split lines[start:end] at the boundaries of `nodes`, descending into classes
+    that are too large on their own.
+    """
+    if not nodes:
+        return ["".join(lines[start:end])]
+
+    starts = _segment_starts(nodes, lines, start)
+    starts[0] = start
+    bounds = starts + [end]
+
+    segments = []
+    for node, seg_start, seg_end in zip(nodes, bounds, bounds[1:]):
+        text = "".join(lines[seg_start:seg_end])
+        if estimate_tokens(text) > max_tokens and isinstance(node, ast.ClassDef) and len(node.body) > 1:
+            # Keep the class header with its first member, then split at method boundaries.
+            segments.extend(_split_lines(lines, seg_start, seg_end, node.body, max_tokens))
+        else:
+            segments.append(text)
+    return segments
+
+
+def split_code(code: str, max_tokens: int) -> List[str]:
+    """
+    Split Python source into chunks of at most ~`max_tokens`, cutting only at
+    top-level statement boundaries (functions, classes, imports, ...).
+
+    Oversized classes are split between their methods. Consecutive segments are
+    packed greedily, so joining the chunks reproduces the original source
+    exactly. Files that fail to parse are split at line boundaries instead.
+    """
+    if estimate_tokens(code) <= max_tokens:
+        return [code]
+
+    lines = code.splitlines(keepends=True)
+    try:
+        tree = ast.parse(code)
+        segments = _split_lines(lines, 0, len(lines), tree.body, max_tokens)
+    except SyntaxError:
+        segments = lines
+
+    chunks: List[str] = []
+    current = ""
+    for segment in segments:
+        if current and estimate_tokens(current + segment) > max_tokens:
+            chunks.append(current)
+            current = ""
+        current += segment
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def map_ordered(func: Callable[[Any], T], items: List[Any], max_workers: Optional[int] = None) -> List[T]:
+    """
+    Apply `func` to every item in parallel threads, returning results in input order.
+
+    At most `max_workers` (default MAX_CHUNK_WORKERS) run at once; with one
+    worker the items are processed sequentially in the calling thread.
+    """
+    workers = min(len(items), max_workers or MAX_CHUNK_WORKERS)
+    if workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
@@ -0,0 +1,227 @@
+# raikuran/utils/envsync.py
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from raikuran.utils.files import atomic_write
+
+DEFAULT_STATE_FILE = Path(".raikuran") / "env_sync.json"
+# pip options that change where packages come from; passed through on install.
+PASSTHROUGH_OPTIONS = ("--index-url", "-i", "--extra-index-url", "--find-links", "-f", "--trusted-host",
+                       "--no-index", "--pre")
+# A comment: "#" at the start of a line or after whitespace (pip's rule).
+COMMENT_RE = re.compile(r"(^|\s+)#.*$")
+# Per-requirement options such as --hash=sha256:... or --config-settings after the specifier.
+REQUIREMENT_OPTION_RE = re.compile(r"\s+--?[A-Za-z].*$")
+# Run by the target interpreter: its distributions and the PEP 508 marker values, as JSON.
+INSPECT_SCRIPT = """
+import json, os, platform, sys
+from importlib import metadata
+versions = {}
+for dist in metadata.distributions():
+    if dist.metadata["Name"]:
+        versions.setdefault(dist.metadata["Name"], dist.version)
+markers = {
+    "implementation_name": sys.implementation.name,
+    "implementation_version": ".".join(map(str, sys.implementation.version[:3])),
+    "os_name": os.name,
+    "platform_machine": platform.machine(),
+    "platform_release": platform.release(),
+    "platform_system": platform.system(),
+    "platform_version": platform.version(),
+    "python_full_version": platform.python_version(),
+    "platform_python_implementation": platform.python_implementation(),
+    "python_version": ".".join(platform.python_version_tuple()[:2]),
+    "sys_platform": sys.platform,
+}
+print(json.dumps({"versions": versions, "markers": markers}))
+"""
+
+
+def logical_lines(text: str) -> List[str]:
+    """
+    Non-empty requirement lines with comments removed and backslash continuations joined.
+    """
+    lines: List[str] = []
+    pending = ""
+    for raw in text.splitlines():
+        line = COMMENT_RE.sub("", raw).rstrip()
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        line = (pending + line).strip()
+        pending = ""
+        if line:
+            lines.append(line)
+    if pending.strip():
+        lines.append(pending.strip())
+    return lines
+
+
+class Requirements(NamedTuple):
+    """
+    A parsed requirements file: checkable specs, lines only pip can resolve, and pip options.
+    """
+
+    specs: List[str]
+    opaque: List[str]
+    options: List[str]
+    digest: str
+
+
+def parse_requirements(path: Path, _seen: Optional[Set[Path]] = None) -> Requirements:
+    """
+    Read a requirements file, following `-r`/`-c` includes.
+
+    Plain requirement specifiers can be checked against installed distributions;
+    editable installs, URLs and local paths are "opaque" and left to pip.
+    Continuation lines are joined and per-requirement options (`--hash=...`)
+    dropped from the specs. The digest covers the contents of every file read.
+    """
+    path = Path(path)
+    seen = _seen if _seen is not None else set()
+    seen.add(path.resolve())
+    digest = hashlib.sha256(path.read_bytes())
+    specs: List[str] = []
+    opaque: List[str] = []
+    options: List[str] = []
+    for line in logical_lines(path.read_text()):
+        if line.startswith(("-r ", "--requirement ", "-c ", "--constraint ")):
+            included = path.parent / line.split(None, 1)[1]
+            if included.resolve() not in seen:
+                nested = parse_requirements(included, seen)
+                if not line.startswith(("-c", "--constraint")):
+                    specs += nested.specs
+                    opaque += nested.opaque
+                options += nested.options
+                digest.update(nested.digest.encode())
+        elif line.startswith(PASSTHROUGH_OPTIONS):
+            options += line.split(None, 1) if " " in line else [line]
+        elif line.startswith(("-e", "--editable")) or "://" in line or line.startswith((".", "/")) or " @ " in line:
+            opaque.append(line)
+        elif not line.startswith("-"):
+            specs.append(REQUIREMENT_OPTION_RE.sub("", line))
+    return Requirements(specs, opaque, options, digest.hexdigest())
+
+
+def target_python() -> str:
+    """
+    The interpreter whose environment is being synced: the active virtualenv,
+    else the project's `.venv`, else `python` on PATH (not raikuran's own
+    interpreter, which may live in a pipx or tool venv).
+    """
+    from raikuran.utils.store import venv_python
+
+    for venv in (os.getenv("VIRTUAL_ENV"), ".venv"):
+        if venv and venv_python(Path(venv)).exists():
+            return os.path.abspath(venv_python(Path(venv)))
+    return shutil.which("python") or shutil.which("python3") or sys.executable
+
+
+def installed_versions(python: Optional[str] = None) -> Tuple[Dict[str, str], Optional[Dict[str, str]]]:
+    """
+    Installed distributions of an interpreter, keyed by normalized name, and its marker environment.
+
+    Raikuran's own interpreter is read in-process (markers None meaning
+    "this interpreter"); any other one runs INSPECT_SCRIPT.
+    """
+    from packaging.utils import canonicalize_name
+
+    if python is None or os.path.abspath(python) == os.path.abspath(sys.executable):
+        names = ((dist.metadata["Name"], dist.version) for dist in metadata.distributions())
+        markers = None
+    else:
+        output = subprocess.run([python, "-c", INSPECT_SCRIPT], capture_output=True, text=True, check=True).stdout
+        inspected = json.loads(output)
+        names = inspected["versions"].items()
+        markers = inspected["markers"]
+    versions: Dict[str, str] = {}
+    for name, version in names:
+        if name:
+            versions.setdefault(canonicalize_name(name), version)
+    return versions, markers
+
+
+def unsatisfied(specs: List[str], installed: Dict[str, str], markers: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Requirement specifiers that aren't met by the installed distributions.
+
+    Environment markers are evaluated against `markers` (the target
+    interpreter's values) when given, else against this interpreter.
+    """
+    from packaging.requirements import InvalidRequirement, Requirement
+    from packaging.utils import canonicalize_name
+
+    missing = []
+    for spec in specs:
+        try:
+            requirement = Requirement(spec)
+        except InvalidRequirement:
+            missing.append(spec)  # let pip report it
+            continue
+        if requirement.marker is not None and not requirement.marker.evaluate(markers):
+            continue
+        version = installed.get(canonicalize_name(requirement.name))
+        if version is None or not requirement.specifier.contains(version, prereleases=True):
+            missing.append(spec)
+    return missing
+
+
+def load_state(path: Path, python: str) -> Dict[str, str]:
+    # One stamp per target interpreter, so several venvs can share a project directory.
+    try:
+        return json.loads(Path(path).read_text()).get(python, {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path: Path, python: str, state: Dict[str, str]) -> None:
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        data = {}
+    data[python] = state
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as handle:
+        json.dump(data, handle, indent=2)
+
+
+def plan_sync(
+    requirements_file: Path, python: str, state_file: Path = DEFAULT_STATE_FILE
+) -> Tuple[List[str], Requirements]:
+    """
+    The requirement lines that need installing to bring `python`'s environment in sync.
+
+    Checkable specifiers are compared against the distributions installed
+    for that interpreter via importlib.metadata, without invoking pip.
+    Opaque lines (editables, URLs) can't be checked that way, so they are
+    reinstalled only when the requirements files changed since the last
+    successful sync into that interpreter.
+    """
+    requirements = parse_requirements(requirements_file)
+    todo = unsatisfied(requirements.specs, *installed_versions(python))
+    if requirements.opaque and load_state(state_file, python).get("digest") != requirements.digest:
+        todo += requirements.opaque
+    return todo, requirements
+
+
+def pip_install(requirements_file: Path, python: str, wheelhouse: Optional[Path] = None) -> int:
+    """
+    Install a requirements file with `python -m pip`, optionally offline from a wheelhouse.
+
+    The file is passed as-is (`-r`), so pip sees its options, includes and
+    `--hash` pins; requirements that are already satisfied are left alone.
+    """
+    command = [python, "-m", "pip", "install"]
+    if wheelhouse:
+        command += ["--no-index", "--find-links", str(wheelhouse)]
+    return subprocess.run(command + ["-r", str(requirements_file)]).returncode
@@ -0,0 +1,70 @@
+# raikuran/utils/files.py
+
+import os
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, List, Set, Union
+
+# Directories never worth walking into when collecting source files.
+SKIP_DIRS = {".git", ".hg", ".venv", "venv", "env", "__pycache__", "build", "dist", ".tox", ".nox",
+             ".mypy_cache", ".ruff_cache", ".pytest_cache", "node_modules"}
+
+
+@contextmanager
+def atomic_write(path: Union[str, Path], encoding: str = "utf-8") -> Iterator[IO[str]]:
+    """
+    Open a temporary file next to `path` for writing and rename it into place on success.
+
+    Readers never see a half-written file: the target is replaced atomically once
+    the block exits cleanly, and the temporary file is removed if it raises.
+    """
+    target = Path(path)
+    directory = target.parent if str(target.parent) else Path(".")
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        # mkstemp creates 0600 files; keep the target's mode (or the umask default).
+        if target.exists():
+            mode = target.stat().st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, target)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def python_files(path: Path) -> List[Path]:
+    """
+    Python files under `path` (or `path` itself), skipping VCS, venv and build directories.
+    """
+    if path.is_file():
+        return [path]
+    files = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.endswith(".egg-info"))
+        files.extend(Path(dirpath) / name for name in sorted(filenames) if name.endswith((".py", ".pyi")))
+    return files
+
+
+def changed_files(path: Path, ref: str, include_deleted: bool = False) -> Set[Path]:
+    """
+    Files differing from git `ref` (committed, staged or unstaged) plus untracked ones.
+    """
+    cwd = path if path.is_dir() else path.parent
+    root = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=cwd,
+                          capture_output=True, text=True, check=True).stdout.strip()
+    diff_filter = [] if include_deleted else ["--diff-filter=d"]
+    diff = subprocess.run(["git", "diff", "--name-only", *diff_filter, ref], cwd=root,
+                          capture_output=True, text=True, check=True).stdout
+    untracked = subprocess.run(["git", "ls-files", "--others", "--exclude-standard"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout
+    return {(Path(root) / name).resolve() for name in (diff + untracked).splitlines() if name}
@@ -0,0 +1,150 @@
+# raikuran/utils/formatting.py
+
+import hashlib
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import typer
+
+from raikuran.utils.files import atomic_write, changed_files, python_files
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "raikuran" / "format"
+TOOLS = ("isort", "black", "ruff")
+# Config files that can change what the tools consider "clean".
+CONFIG_FILES = ("pyproject.toml", "setup.cfg", "tox.ini", ".isort.cfg", "ruff.toml", ".ruff.toml", ".editorconfig")
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def tool_versions() -> Dict[str, str]:
+    """
+    Installed version of each formatter, by asking the executables on PATH.
+    """
+    versions = {}
+    for tool in TOOLS:
+        try:
+            result = subprocess.run([tool, "--version"], capture_output=True, text=True)
+            versions[tool] = result.stdout.strip()
+        except OSError:
+            versions[tool] = "missing"
+    return versions
+
+
+def config_fingerprint(root: Path, fix: bool, versions: Dict[str, str]) -> str:
+    """
+    Hash of everything besides a file's content that decides the formatters' output.
+    """
+    digest = hashlib.sha256(json.dumps({"versions": versions, "fix": fix}, sort_keys=True).encode())
+    for directory in [root, *root.parents]:
+        for name in CONFIG_FILES:
+            config = directory / name
+            if config.is_file():
+                digest.update(str(config).encode())
+                digest.update(config.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class FormatCache:
+    """
+    Content hashes of files already known to be clean under one tool configuration.
+
+    Entries are keyed by content rather than path, so renames, branch switches
+    and identical files across checkouts all hit the cache.
+    """
+
+    def __init__(self, fingerprint: str, directory: Optional[Path] = None):
+        directory = Path(directory or os.getenv("RAIKURAN_FORMAT_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.path = directory / f"{fingerprint}.json"
+        try:
+            self.clean: Set[str] = set(json.loads(self.path.read_text()))
+        except (OSError, ValueError):
+            self.clean = set()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as handle:
+            json.dump(sorted(self.clean), handle)
+
+
+def format_files(files: List[Path], fix: bool) -> Set[Path]:
+    """
+    Run isort, black and ruff over one chunk of files; returns the files ruff still reports problems in.
+    """
+    names = [str(f) for f in files]
+    subprocess.run(["isort", "--quiet", *names])
+    subprocess.run(["black", "--quiet", *names])
+    ruff = ["ruff", "check", "--output-format", "json", *(["--fix"] if fix else []), *names]
+    result = subprocess.run(ruff, capture_output=True, text=True)
+    try:
+        diagnostics = json.loads(result.stdout or "[]") if result.returncode in (0, 1) else None
+    except ValueError:
+        diagnostics = None
+    if diagnostics is None:
+        # ruff itself failed (bad config, crash): nothing in this chunk counts as clean.
+        typer.echo(result.stdout + result.stderr, nl=False)
+        return {f.resolve() for f in files}
+    for diagnostic in diagnostics:
+        location = diagnostic.get("location") or {}
+        typer.echo(f"{diagnostic['filename']}:{location.get('row')}:{location.get('column')}: "
+                   f"{diagnostic.get('code') or 'error'} {diagnostic['message']}")
+    return {Path(diagnostic["filename"]).resolve() for diagnostic in diagnostics}
+
+
+def _chunks(files: List[Path], count: int) -> Iterable[List[Path]]:
+    size = max(1, -(-len(files) // count))
+    for start in range(0, len(files), size):
+        yield files[start:start + size]
+
+
+def format_incremental(
+    path: Path,
+    fix: bool = True,
+    changed_since: Optional[str] = None,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, int]:
+    """
+    Format the Python files under `path`, skipping files already known to be clean.
+
+    A file is skipped when its content hash was recorded as clean under the
+    same isort/black/ruff versions, config files and `fix` setting, and each
+    file ruff leaves without diagnostics is recorded on its own. The rest
+    are split into one chunk per worker, and each chunk goes through the
+    isort → black → ruff pipeline in parallel (each tool runs as its own
+    process). With `changed_since`, only files differing from that git ref
+    are considered.
+
+    Returns:
+        dict: Counts of "checked" files, "skipped" ones (cache hits), "processed"
+        ones (run through the tools) and "reformatted" ones (content changed)
+    """
+    path = Path(path).resolve()
+    files = python_files(path)
+    if changed_since:
+        changed = changed_files(path, changed_since)
+        files = [f for f in files if f.resolve() in changed]
+
+    cache = FormatCache(config_fingerprint(path if path.is_dir() else path.parent, fix, tool_versions()))
+    hashes = {f: file_hash(f) for f in files}
+    pending = [f for f in files if not use_cache or hashes[f] not in cache.clean]
+
+    reformatted = 0
+    if pending:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+        chunks = list(_chunks(pending, workers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            dirty = set().union(*executor.map(lambda chunk: format_files(chunk, fix), chunks))
+        new_hashes = {f: file_hash(f) for f in pending if f.exists()}
+        reformatted = sum(1 for f, digest in new_hashes.items() if digest != hashes[f])
+        cache.clean.update(digest for f, digest in new_hashes.items() if f.resolve() not in dirty)
+        if use_cache:
+            cache.save()
+
+    return {"checked": len(files), "skipped": len(files) - len(pending), "processed": len(pending),
+            "reformatted": reformatted}
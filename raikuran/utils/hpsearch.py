@@ -0,0 +1,316 @@
+# raikuran/utils/hpsearch.py
+
+import ast
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import typer
+
+DEFAULT_DB = Path(".raikuran") / "hpsearch.db"
+# Objectives that read like these are minimized unless a direction is given.
+MINIMIZE_HINTS = ("loss", "error", "mse", "rmse", "mae", "perplexity")
+
+Space = Dict[str, Any]
+
+
+def find_constants(source: str) -> Dict[str, Any]:
+    """
+    Module-level `NAME = <literal>` assignments of a script, with their values.
+    """
+    constants = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+    return constants
+
+
+def apply_params(source: str, params: Dict[str, Any]) -> str:
+    """
+    Rewrite the literal values of module-level constants named in `params`, leaving the rest untouched.
+    """
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line.encode("utf-8")))
+    encoded = source.encode("utf-8")
+
+    edits = []
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in params:
+                start = offsets[node.value.lineno - 1] + node.value.col_offset
+                end = offsets[node.value.end_lineno - 1] + node.value.end_col_offset
+                edits.append((start, end, repr(params[name]).encode("utf-8")))
+    for start, end, text in sorted(edits, reverse=True):
+        encoded = encoded[:start] + text + encoded[end:]
+    return encoded.decode("utf-8")
+
+
+def parse_space(spec: Dict[str, Any], constants: Dict[str, Any]) -> Space:
+    """
+    Validate a search space against the script's constants.
+
+    Each entry is either a list of choices or {"low", "high", "log"?, "type"?: "int"|"float"}.
+    """
+    space = {}
+    for name, domain in spec.items():
+        if name not in constants:
+            raise ValueError(f"{name} is not a module-level constant in the script.")
+        if isinstance(domain, list) and domain:
+            space[name] = domain
+        elif isinstance(domain, dict) and "low" in domain and "high" in domain:
+            kind = domain.get("type") or ("int" if isinstance(constants[name], int) else "float")
+            space[name] = {"low": domain["low"], "high": domain["high"], "log": bool(domain.get("log")), "type": kind}
+        else:
+            raise ValueError(f"Invalid domain for {name}: {domain!r}")
+    if not space:
+        raise ValueError("The search space is empty.")
+    return space
+
+
+def sample(space: Space, rng: random.Random) -> Dict[str, Any]:
+    params = {}
+    for name, domain in space.items():
+        if isinstance(domain, list):
+            params[name] = rng.choice(domain)
+            continue
+        low, high = domain["low"], domain["high"]
+        if domain["log"]:
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        params[name] = int(round(value)) if domain["type"] == "int" else float(f"{value:.6g}")
+    return params
+
+
+def default_direction(objective: str) -> str:
+    return "minimize" if any(hint in objective.lower() for hint in MINIMIZE_HINTS) else "maximize"
+
+
+def objective_pattern(objective: str) -> "re.Pattern[str]":
+    """
+    Matches report lines such as `accuracy: 0.91` or `val_loss=0.23` for the objective.
+    """
+    number = r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    return re.compile(rf"(?<![\w.]){re.escape(objective)}\s*[:=]\s*{number}", re.IGNORECASE)
+
+
+class StudyStore:
+    """
+    SQLite record of a study's trials and their intermediate reports, so searches can resume.
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS trials (
+                id INTEGER PRIMARY KEY, study TEXT, number INTEGER, params TEXT,
+                state TEXT, value REAL, seconds REAL
+            );
+            CREATE TABLE IF NOT EXISTS reports (trial INTEGER, step INTEGER, value REAL);
+            CREATE INDEX IF NOT EXISTS trials_study ON trials (study);
+        """)
+
+    def _execute(self, query: str, args: Tuple = ()) -> List[Tuple]:
+        with self._lock, self._db:
+            return self._db.execute(query, args).fetchall()
+
+    def resume(self, study: str) -> None:
+        """
+        Discard trials (and their reports) left running by an interrupted search.
+        """
+        self._execute(
+            "DELETE FROM reports WHERE trial IN (SELECT id FROM trials WHERE study = ? AND state = 'running')", (study,)
+        )
+        self._execute("DELETE FROM trials WHERE study = ? AND state = 'running'", (study,))
+
+    def start(self, study: str, number: int, params: Dict[str, Any]) -> int:
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO trials (study, number, params, state) VALUES (?, ?, ?, 'running')",
+                (study, number, json.dumps(params)),
+            )
+            return cursor.lastrowid
+
+    def report(self, trial: int, step: int, value: float) -> None:
+        self._execute("INSERT INTO reports VALUES (?, ?, ?)", (trial, step, value))
+
+    def finish(self, trial: int, state: str, value: Optional[float], seconds: float) -> None:
+        self._execute("UPDATE trials SET state = ?, value = ?, seconds = ? WHERE id = ?", (state, value, seconds, trial))
+
+    def step_values(self, study: str, step: int) -> List[float]:
+        """
+        Values reported at `step` by the study's completed trials.
+        """
+        rows = self._execute(
+            "SELECT r.value FROM reports r JOIN trials t ON r.trial = t.id "
+            "WHERE t.study = ? AND t.state = 'complete' AND r.step = ?", (study, step),
+        )
+        return [row[0] for row in rows]
+
+    def trials(self, study: str) -> List[Dict[str, Any]]:
+        rows = self._execute(
+            "SELECT number, params, state, value, seconds FROM trials WHERE study = ? ORDER BY number", (study,)
+        )
+        return [dict(number=r[0], params=json.loads(r[1]), state=r[2], value=r[3], seconds=r[4]) for r in rows]
+
+
+class MedianPruner:
+    """
+    Stop a trial whose intermediate value is worse than the median of completed trials at that step.
+    """
+
+    def __init__(self, store: StudyStore, study: str, direction: str, min_trials: int = 3, warmup_steps: int = 1):
+        self.store, self.study, self.direction = store, study, direction
+        self.min_trials, self.warmup_steps = min_trials, warmup_steps
+
+    def should_prune(self, step: int, value: float) -> bool:
+        if step < self.warmup_steps:
+            return False
+        previous = self.store.step_values(self.study, step)
+        if len(previous) < self.min_trials:
+            return False
+        median = statistics.median(previous)
+        return value < median if self.direction == "maximize" else value > median
+
+
+def run_trial(
+    script: Path,
+    source: str,
+    number: int,
+    pattern: "re.Pattern[str]",
+    on_report: Callable[[int, float], bool],
+    timeout: Optional[float] = None,
+) -> Tuple[str, Optional[float]]:
+    """
+    Run one trial script in a subprocess, streaming its objective reports.
+
+    The trial copy is written next to the original (`.train.trial-3.py`), so
+    `__file__`-relative paths and sibling imports behave as in the original.
+    An objective line is passed to `on_report(step, value)` once a later one
+    shows it was intermediate; returning True prunes the trial (its process
+    is killed). The final value is never offered to the pruner. Returns
+    (state, last value), state being "complete", "pruned" or "failed".
+    """
+    trial_script = script.parent / f".{script.stem}.trial-{number}{script.suffix}"
+    trial_script.write_text(source)
+    try:
+        process = subprocess.Popen(
+            [sys.executable, trial_script.name], cwd=script.parent.resolve(),
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        timer = threading.Timer(timeout, process.kill) if timeout else None
+        if timer:
+            timer.start()
+        value, step, pruned = None, 0, False
+        try:
+            for line in process.stdout:
+                for match in pattern.finditer(line):
+                    if value is not None:
+                        if on_report(step, value):
+                            pruned = True
+                            process.kill()
+                            break
+                        step += 1
+                    value = float(match.group(1))
+                if pruned:
+                    break
+            code = process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            process.stdout.close()
+    finally:
+        trial_script.unlink()
+
+    if pruned:
+        return "pruned", value
+    if code != 0 or value is None:
+        return "failed", value
+    return "complete", value
+
+
+def study_id(script: Path, source: str, space: Space, objective: str, direction: str) -> str:
+    blob = json.dumps([str(script.resolve()), source, space, objective, direction], sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def run_search(
+    script: Path,
+    space: Space,
+    objective: str,
+    direction: Optional[str] = None,
+    trials: int = 20,
+    workers: int = 2,
+    timeout: Optional[float] = None,
+    seed: int = 0,
+    store: Optional[StudyStore] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Random search over `space`, running each trial as an isolated subprocess.
+
+    Trials are script copies with the sampled constants written in, run
+    `workers` at a time. The objective is read from the script's output
+    (lines like `accuracy: 0.93`, the last one being final); earlier lines are
+    intermediate reports that a median pruner uses to stop unpromising trials.
+    Every trial is recorded in SQLite under a study id derived from the
+    script, space and objective, so rerunning the same search resumes it.
+
+    Returns:
+        dict: The best completed trial (number, params, state, value, seconds), or None
+    """
+    source = script.read_text()
+    direction = direction or default_direction(objective)
+    store = store or StudyStore()
+    study = study_id(script, source, space, objective, direction)
+    pattern = objective_pattern(objective)
+    pruner = MedianPruner(store, study, direction)
+
+    store.resume(study)
+    finished = {t["number"] for t in store.trials(study)}
+    if finished:
+        typer.echo(f"↩️  Resuming study {study}: {len(finished)} trial(s) already finished.")
+
+    def run_one(number: int) -> None:
+        params = sample(space, random.Random(f"{seed}-{number}"))
+        trial = store.start(study, number, params)
+        start = time.perf_counter()
+
+        def on_report(step: int, value: float) -> bool:
+            store.report(trial, step, value)
+            return pruner.should_prune(step, value)
+
+        state, value = run_trial(script, apply_params(source, params), number, pattern, on_report, timeout)
+        seconds = time.perf_counter() - start
+        store.finish(trial, state, value, seconds)
+        shown = f"{objective}={value:.6g}" if value is not None else "no objective reported"
+        typer.echo(f"🧪 Trial {number}: {state} ({shown}, {seconds:.1f}s) {params}")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        list(executor.map(run_one, [n for n in range(trials) if n not in finished]))
+
+    completed = [t for t in store.trials(study) if t["state"] == "complete"]
+    if not completed:
+        return None
+    pick = max if direction == "maximize" else min
+    return pick(completed, key=lambda t: t["value"])
@@ -0,0 +1,165 @@
+# raikuran/utils/impact.py
+
+import ast
+import hashlib
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from raikuran.utils.files import atomic_write, python_files
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "raikuran" / "impact"
+# Changes to these (or any non-Python file) can affect every test, so they select the full suite.
+GLOBAL_FILES = {"conftest.py", "pytest.ini", "setup.cfg", "tox.ini", "pyproject.toml", "setup.py"}
+# Documentation never affects test outcomes.
+DOC_SUFFIXES = {".md", ".rst"}
+
+
+def module_name(path: Path, root: Path) -> str:
+    """
+    Dotted module name of `path` relative to `root` (or `root/src` for src layouts).
+    """
+    rel = path.relative_to(root)
+    if rel.parts[0] == "src" and len(rel.parts) > 1:
+        rel = rel.relative_to("src")
+    parts = list(rel.with_suffix("").parts)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def parse_imports(source: str, module: str, is_package: bool) -> List[str]:
+    """
+    Absolute names imported by a module, with relative imports resolved.
+
+    `from pkg import name` yields both `pkg` and `pkg.name`, since `name` may be a submodule.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    package = module.split(".") if is_package else module.split(".")[:-1]
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[: len(package) - node.level + 1]
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module or ""
+            if prefix:
+                names.add(prefix)
+            names.update(f"{prefix}.{alias.name}" if prefix else alias.name for alias in node.names)
+    return sorted(names)
+
+
+class ImportGraph:
+    """
+    Static import graph of the Python files under a project root.
+
+    Parsed imports are cached on disk per file and reused while the file's
+    mtime (or, failing that, its content hash) is unchanged, so rebuilding
+    the graph after a small change only re-parses the files that changed.
+    """
+
+    def __init__(self, root: Path, cache_dir: Optional[Path] = None):
+        self.root = Path(root).resolve()
+        directory = Path(cache_dir or os.getenv("RAIKURAN_IMPACT_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.cache_path = directory / f"{hashlib.sha256(str(self.root).encode()).hexdigest()[:16]}.json"
+        self.modules: Dict[str, Path] = {}
+        self.imports: Dict[Path, List[str]] = {}
+        self._build()
+
+    def _build(self) -> None:
+        try:
+            cached = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            cached = {}
+        entries = {}
+        dirty = False
+        for path in python_files(self.root):
+            key = path.relative_to(self.root).as_posix()
+            mtime = path.stat().st_mtime
+            entry = cached.get(key)
+            if entry is None or entry["mtime"] != mtime:
+                source = path.read_bytes()
+                digest = hashlib.sha256(source).hexdigest()
+                if entry is None or entry["hash"] != digest:
+                    module = module_name(path, self.root)
+                    imports = parse_imports(source.decode("utf-8", "replace"), module, path.name == "__init__.py")
+                    entry = {"hash": digest, "imports": imports}
+                entry = {**entry, "mtime": mtime}
+                dirty = True
+            entries[key] = entry
+            self.modules[module_name(path, self.root)] = path
+            self.imports[path] = entry["imports"]
+
+        if dirty or len(entries) != len(cached):
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self.cache_path) as handle:
+                json.dump(entries, handle)
+
+    def dependencies(self, path: Path) -> Set[Path]:
+        """
+        Project files `path` imports directly, including the packages that import executes.
+        """
+        deps = set()
+        for name in self.imports.get(path, []):
+            parts = name.split(".")
+            for i in range(1, len(parts) + 1):
+                target = self.modules.get(".".join(parts[:i]))
+                if target is not None and target != path:
+                    deps.add(target)
+        return deps
+
+    def dependents(self, changed: Iterable[Path]) -> Set[Path]:
+        """
+        Every project file that transitively imports one of `changed` (plus `changed` itself).
+        """
+        reverse: Dict[Path, Set[Path]] = {}
+        for path in self.imports:
+            for dep in self.dependencies(path):
+                reverse.setdefault(dep, set()).add(path)
+
+        seen = set(changed)
+        queue = deque(seen)
+        while queue:
+            for importer in reverse.get(queue.popleft(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    queue.append(importer)
+        return seen
+
+
+def is_test_file(path: Path) -> bool:
+    return path.name.startswith("test_") or path.name.endswith("_test.py")
+
+
+def impacted_tests(root: Path, test_path: Path, changed: Iterable[Path]) -> Optional[List[Path]]:
+    """
+    Test files under `test_path` affected by the `changed` files.
+
+    Returns None when a change can't be traced through imports (a conftest,
+    test or build config, a deleted file, or a non-Python file other than
+    docs), meaning the whole suite should run.
+    """
+    graph = ImportGraph(root)
+    test_root = Path(test_path).resolve()
+    changed_py = set()
+    for path in (Path(p).resolve() for p in changed):
+        if path.suffix in DOC_SUFFIXES or graph.root not in path.parents:
+            continue
+        if path.name in GLOBAL_FILES or path.suffix != ".py" or not path.exists():
+            return None
+        if path in graph.imports:
+            changed_py.add(path)
+
+    selected = graph.dependents(changed_py)
+    return sorted(
+        path for path in selected
+        if is_test_file(path) and (path == test_root or test_root in path.parents)
+    )
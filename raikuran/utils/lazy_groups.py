@@ -0,0 +1,47 @@
+# raikuran/utils/lazy_groups.py
+
+import importlib
+from typing import Optional
+
+import typer
+from typer.core import TyperGroup
+
+from raikuran.utils.tracing import span
+
+
+class LazyTyperGroup(TyperGroup):
+    """
+    Placeholder for a command group whose module is imported on first use.
+
+    The placeholder carries only the group name and help text, so listing it in
+    `raikuran --help` costs nothing. The real Typer app (and everything its module
+    imports, e.g. openai or torch) is loaded only when the group is invoked.
+    """
+
+    def __init__(self, name: str, import_path: str, help: str):
+        super().__init__(name=name, help=help)
+        self.import_path = import_path
+        self._group: Optional[TyperGroup] = None
+
+    def load(self) -> TyperGroup:
+        """
+        Import the command module and build its Typer group (cached).
+        """
+        if self._group is None:
+            with span(f"import {self.import_path}", "import"):
+                module = importlib.import_module(self.import_path)
+            group = typer.main.get_group(module.app)
+            group.name = self.name
+            group.help = self.help
+            self._group = group
+        return self._group
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Hand parsing and invocation over to the real group.
+        return self.load().make_context(info_name, args, parent=parent, **extra)
+
+    def list_commands(self, ctx):
+        return self.load().list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        return self.load().get_command(ctx, cmd_name)
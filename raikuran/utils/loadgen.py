@@ -0,0 +1,118 @@
+# raikuran/utils/loadgen.py
+
+import asyncio
+import itertools
+import json
+import math
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def load_payloads(path: Path) -> List[Any]:
+    """
+    Read sample request bodies: a JSON list, a single JSON object, or JSON Lines.
+    """
+    text = Path(path).read_text()
+    if Path(path).suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data if isinstance(data, list) else [data]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (0.0 when empty).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: Counter, elapsed: float, mode: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aggregate per-request latencies (seconds) and error counts into a report.
+    """
+    ordered = sorted(latencies)
+    requests = len(latencies) + sum(errors.values())
+    return {
+        **mode,
+        "requests": requests,
+        "succeeded": len(latencies),
+        "errors": dict(errors),
+        "error_rate": sum(errors.values()) / requests if requests else 0.0,
+        "duration_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+            "p50": percentile(ordered, 50) * 1000,
+            "p95": percentile(ordered, 95) * 1000,
+            "p99": percentile(ordered, 99) * 1000,
+            "max": ordered[-1] * 1000 if ordered else 0.0,
+        },
+    }
+
+
+async def run_bench(
+    url: str,
+    payloads: List[Any],
+    duration: float = 10.0,
+    concurrency: int = 8,
+    rps: Optional[float] = None,
+    timeout: float = 30.0,
+    transport=None,
+) -> Dict[str, Any]:
+    """
+    Drive POST requests at `url` for `duration` seconds and report latency and throughput.
+
+    Closed loop (default): `concurrency` clients each send the next request as
+    soon as the previous one returns. Open loop (`rps`): requests are issued on
+    a fixed schedule regardless of response times, with latency measured from
+    the scheduled send time so a stalling server can't hide its queueing delay;
+    `concurrency` then only caps the connection pool.
+    """
+    import httpx
+
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    samples = itertools.cycle(payloads)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits, transport=transport) as client:
+
+        async def send(payload: Any, started: float) -> None:
+            try:
+                response = await client.post(url, json=payload)
+            except httpx.HTTPError as exc:
+                errors[type(exc).__name__] += 1
+                return
+            if response.is_success:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[str(response.status_code)] += 1
+
+        start = time.perf_counter()
+        deadline = start + duration
+        if rps:
+            mode = {"mode": "open", "target_rps": rps}
+            tasks = []
+            for i in itertools.count():
+                scheduled = start + i / rps
+                if scheduled >= deadline:
+                    break
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                tasks.append(asyncio.ensure_future(send(next(samples), scheduled)))
+            await asyncio.gather(*tasks)
+        else:
+            mode = {"mode": "closed", "concurrency": concurrency}
+
+            async def worker() -> None:
+                while time.perf_counter() < deadline:
+                    await send(next(samples), time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, errors, elapsed, mode)
@@ -0,0 +1,559 @@
+# raikuran/utils/model_templates.py
+
+from string import Template
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Spellings accepted on the command line, mapped to the names used in the index.
+FRAMEWORK_ALIASES = {
+    "pytorch": "pytorch", "torch": "pytorch",
+    "tensorflow": "tensorflow", "tf": "tensorflow", "keras": "tensorflow",
+    "sklearn": "sklearn", "scikit-learn": "sklearn", "scikit_learn": "sklearn",
+}
+TASK_ALIASES = {
+    "classification": "classification", "classifier": "classification", "classify": "classification",
+    "regression": "regression", "regressor": "regression", "regress": "regression",
+    "clustering": "clustering", "cluster": "clustering", "clusterer": "clustering",
+}
+DATASET_ALIASES = {
+    "breast-cancer": "breast_cancer", "cancer": "breast_cancer",
+    "california_housing": "california", "housing": "california",
+    "fashion-mnist": "fashion_mnist", "fashionmnist": "fashion_mnist",
+    "synthetic": "custom", "mock": "custom",
+}
+
+
+class Dataset(NamedTuple):
+    imports: str
+    load: str
+    tasks: Tuple[str, ...]
+
+
+# Tabular datasets are loaded into NumPy arrays `X, y` for every framework.
+TABULAR_DATASETS = {
+    "iris": Dataset("from sklearn.datasets import load_iris", "X, y = load_iris(return_X_y=True)",
+                    ("classification", "clustering")),
+    "wine": Dataset("from sklearn.datasets import load_wine", "X, y = load_wine(return_X_y=True)",
+                    ("classification", "clustering")),
+    "digits": Dataset("from sklearn.datasets import load_digits", "X, y = load_digits(return_X_y=True)",
+                      ("classification", "clustering")),
+    "breast_cancer": Dataset("from sklearn.datasets import load_breast_cancer",
+                             "X, y = load_breast_cancer(return_X_y=True)", ("classification",)),
+    "diabetes": Dataset("from sklearn.datasets import load_diabetes", "X, y = load_diabetes(return_X_y=True)",
+                        ("regression",)),
+    "california": Dataset("from sklearn.datasets import fetch_california_housing",
+                          "X, y = fetch_california_housing(return_X_y=True)", ("regression",)),
+    # Removed from scikit-learn 1.2; OpenML still serves it.
+    "boston": Dataset("from sklearn.datasets import fetch_openml",
+                      'X, y = fetch_openml(name="boston", version=1, as_frame=False, return_X_y=True)\n'
+                      "X, y = X.astype(float), y.astype(float)", ("regression",)),
+}
+
+# No real data: a synthetic problem of the right shape, to be swapped for your own loader.
+CUSTOM_DATASETS = {
+    "classification": Dataset(
+        "from sklearn.datasets import make_classification",
+        "# Synthetic placeholder data; replace with your own X (features) and y (labels).\n"
+        "X, y = make_classification(n_samples=1000, n_features=20, n_informative=10, n_classes=3, random_state=SEED)",
+        ("classification",),
+    ),
+    "regression": Dataset(
+        "from sklearn.datasets import make_regression",
+        "# Synthetic placeholder data; replace with your own X (features) and y (targets).\n"
+        "X, y = make_regression(n_samples=1000, n_features=20, noise=10.0, random_state=SEED)",
+        ("regression",),
+    ),
+    "clustering": Dataset(
+        "from sklearn.datasets import make_blobs",
+        "# Synthetic placeholder data; replace with your own X (y is only used for evaluation).\n"
+        "X, y = make_blobs(n_samples=1000, n_features=10, centers=4, random_state=SEED)",
+        ("clustering",),
+    ),
+}
+
+# Image datasets: (torchvision class, keras.datasets module, channels, image size).
+IMAGE_DATASETS = {
+    "mnist": ("MNIST", "mnist", 1, 28),
+    "fashion_mnist": ("FashionMNIST", "fashion_mnist", 1, 28),
+    "cifar10": ("CIFAR10", "cifar10", 3, 32),
+}
+
+# scikit-learn has no image pipeline; MNIST is used flattened from OpenML.
+SKLEARN_IMAGE_DATASETS = {
+    "mnist": Dataset("from sklearn.datasets import fetch_openml",
+                     'X, y = fetch_openml("mnist_784", version=1, as_frame=False, return_X_y=True)\n'
+                     "X, y = X / 255.0, y.astype(int)", ("classification", "clustering")),
+    "fashion_mnist": Dataset("from sklearn.datasets import fetch_openml",
+                             'X, y = fetch_openml("Fashion-MNIST", version=1, as_frame=False, return_X_y=True)\n'
+                             "X, y = X / 255.0, y.astype(int)", ("classification", "clustering")),
+}
+
+HEADER = '''"""
+$title
+
+Generated by raikuran from a local template ($framework / $task / $dataset).
+Sections: 1. data loading, 2. preprocessing, 3. model definition, 4. training, 5. evaluation.
+Hyperparameters are module-level constants, and metrics are printed as `name: value`,
+so the script works with `raikuran optimize hyperparams --search`.
+"""
+'''
+
+SKLEARN_SUPERVISED = Template(HEADER + '''
+import joblib
+$imports
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+SEED = 42
+TEST_SIZE = 0.2
+N_ESTIMATORS = 200
+MAX_DEPTH = None
+
+# 1. Data loading
+$load
+
+# 2. Preprocessing
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SEED$stratify)
+
+# 3. Model definition (scaling is part of the pipeline, so the saved model takes raw features)
+model = make_pipeline(
+    StandardScaler(),
+    $estimator(n_estimators=N_ESTIMATORS, max_depth=MAX_DEPTH, random_state=SEED, n_jobs=-1),
+)
+
+# 4. Training
+model.fit(X_train, y_train)
+
+# 5. Evaluation
+predictions = model.predict(X_test)
+$evaluate
+
+joblib.dump(model, "model.pkl")
+print("Model saved to model.pkl")
+''')
+
+SKLEARN_CLASSIFICATION = dict(
+    estimator="RandomForestClassifier",
+    stratify=", stratify=y",
+    imports="from sklearn.ensemble import RandomForestClassifier\n"
+            "from sklearn.metrics import accuracy_score, classification_report",
+    evaluate='print(f"accuracy: {accuracy_score(y_test, predictions):.4f}")\n'
+             "print(classification_report(y_test, predictions))",
+)
+
+SKLEARN_REGRESSION = dict(
+    estimator="RandomForestRegressor",
+    stratify="",
+    imports="import numpy as np\n"
+            "from sklearn.ensemble import RandomForestRegressor\n"
+            "from sklearn.metrics import mean_squared_error, r2_score",
+    evaluate='print(f"rmse: {np.sqrt(mean_squared_error(y_test, predictions)):.4f}")\n'
+             'print(f"r2: {r2_score(y_test, predictions):.4f}")',
+)
+
+SKLEARN_CLUSTERING = Template(HEADER + '''
+import joblib
+import numpy as np
+$imports
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score, silhouette_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+SEED = 42
+N_CLUSTERS = None  # None: one cluster per known label
+N_INIT = 10
+
+# 1. Data loading
+$load
+
+# 2. Preprocessing
+n_clusters = N_CLUSTERS or len(np.unique(y))
+
+# 3. Model definition
+model = make_pipeline(StandardScaler(), KMeans(n_clusters=n_clusters, n_init=N_INIT, random_state=SEED))
+
+# 4. Training
+labels = model.fit_predict(X)
+
+# 5. Evaluation
+scaled = model[:-1].transform(X)
+print(f"silhouette: {silhouette_score(scaled, labels, sample_size=min(len(X), 5000), random_state=SEED):.4f}")
+print(f"adjusted_rand: {adjusted_rand_score(y, labels):.4f}")
+
+joblib.dump(model, "model.pkl")
+print("Model saved to model.pkl")
+''')
+
+PYTORCH_TABULAR = Template(HEADER + '''
+import numpy as np
+import torch
+import torch.nn as nn
+$imports
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from torch.utils.data import DataLoader, TensorDataset
+
+SEED = 42
+TEST_SIZE = 0.2
+EPOCHS = 50
+BATCH_SIZE = 32
+LR = 1e-3
+HIDDEN = 64
+
+torch.manual_seed(SEED)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# 1. Data loading
+$load
+
+# 2. Preprocessing
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SEED$stratify)
+scaler = StandardScaler().fit(X_train)
+X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+$prepare_targets
+train_loader = DataLoader(
+    TensorDataset(torch.tensor(X_train, dtype=torch.float32), torch.tensor(y_train, dtype=$target_dtype)),
+    batch_size=BATCH_SIZE,
+    shuffle=True,
+)
+X_test_t = torch.tensor(X_test, dtype=torch.float32, device=device)
+
+# 3. Model definition
+model = nn.Sequential(
+    nn.Linear(X.shape[1], HIDDEN),
+    nn.ReLU(),
+    nn.Linear(HIDDEN, HIDDEN),
+    nn.ReLU(),
+    nn.Linear(HIDDEN, $outputs),
+).to(device)
+optimizer = torch.optim.Adam(model.parameters(), lr=LR)
+loss_fn = $loss
+
+
+def evaluate():
+    model.eval()
+    with torch.no_grad():
+        outputs = model(X_test_t).cpu().numpy()
+    $metric
+
+
+# 4. Training
+for epoch in range(EPOCHS):
+    model.train()
+    running = 0.0
+    for xb, yb in train_loader:
+        xb, yb = xb.to(device), yb.to(device)
+        optimizer.zero_grad()
+        loss = loss_fn(model(xb), yb)
+        loss.backward()
+        optimizer.step()
+        running += loss.item() * len(xb)
+    print(f"epoch {epoch + 1}/{EPOCHS} train_loss={running / len(train_loader.dataset):.4f} $metric_name: {evaluate():.4f}")
+
+# 5. Evaluation
+$report
+
+torch.save(model.cpu(), "model.pt")
+print("Model saved to model.pt (inputs must be standardized like the training data)")
+''')
+
+PYTORCH_CLASSIFICATION = dict(
+    stratify=", stratify=y",
+    prepare_targets="n_classes = int(np.max(y)) + 1",
+    target_dtype="torch.long",
+    outputs="n_classes",
+    loss="nn.CrossEntropyLoss()",
+    metric="return float((outputs.argmax(axis=1) == y_test).mean())",
+    metric_name="accuracy",
+    report='print(f"accuracy: {evaluate():.4f}")',
+)
+
+PYTORCH_REGRESSION = dict(
+    stratify="",
+    prepare_targets="# Targets are standardized for training; metrics are reported in the original units.\n"
+                    "y_mean, y_std = y_train.mean(), y_train.std()\n"
+                    "y_train = ((y_train - y_mean) / y_std).reshape(-1, 1)",
+    target_dtype="torch.float32",
+    outputs="1",
+    loss="nn.MSELoss()",
+    metric="predictions = outputs.ravel() * y_std + y_mean\n"
+           "    return float(np.sqrt(np.mean((predictions - y_test) ** 2)))",
+    metric_name="rmse",
+    report='print(f"rmse: {evaluate():.4f}")',
+)
+
+PYTORCH_IMAGE = Template(HEADER + '''
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+from torchvision import datasets, transforms
+
+SEED = 42
+EPOCHS = 5
+BATCH_SIZE = 64
+LR = 1e-3
+CHANNELS = $channels
+IMAGE_SIZE = $size
+N_CLASSES = 10
+
+torch.manual_seed(SEED)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# 1. Data loading (downloaded to ./data on first run)
+# 2. Preprocessing: scale pixels to [0, 1] and normalize
+transform = transforms.Compose([transforms.ToTensor(), transforms.Normalize((0.5,) * CHANNELS, (0.5,) * CHANNELS)])
+train_set = datasets.$torchvision_class("data", train=True, download=True, transform=transform)
+test_set = datasets.$torchvision_class("data", train=False, download=True, transform=transform)
+train_loader = DataLoader(train_set, batch_size=BATCH_SIZE, shuffle=True, num_workers=2)
+test_loader = DataLoader(test_set, batch_size=256, num_workers=2)
+
+
+# 3. Model definition
+class ConvNet(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.features = nn.Sequential(
+            nn.Conv2d(CHANNELS, 32, 3, padding=1),
+            nn.ReLU(),
+            nn.MaxPool2d(2),
+            nn.Conv2d(32, 64, 3, padding=1),
+            nn.ReLU(),
+            nn.MaxPool2d(2),
+        )
+        self.classifier = nn.Sequential(
+            nn.Flatten(),
+            nn.Linear(64 * (IMAGE_SIZE // 4) ** 2, 128),
+            nn.ReLU(),
+            nn.Dropout(0.25),
+            nn.Linear(128, N_CLASSES),
+        )
+
+    def forward(self, x):
+        return self.classifier(self.features(x))
+
+
+model = ConvNet().to(device)
+optimizer = torch.optim.Adam(model.parameters(), lr=LR)
+loss_fn = nn.CrossEntropyLoss()
+
+
+def evaluate():
+    model.eval()
+    correct = 0
+    with torch.no_grad():
+        for xb, yb in test_loader:
+            correct += (model(xb.to(device)).argmax(1) == yb.to(device)).sum().item()
+    return correct / len(test_set)
+
+
+# 4. Training
+for epoch in range(EPOCHS):
+    model.train()
+    running = 0.0
+    for xb, yb in train_loader:
+        xb, yb = xb.to(device), yb.to(device)
+        optimizer.zero_grad()
+        loss = loss_fn(model(xb), yb)
+        loss.backward()
+        optimizer.step()
+        running += loss.item() * len(xb)
+    print(f"epoch {epoch + 1}/{EPOCHS} train_loss={running / len(train_set):.4f} accuracy: {evaluate():.4f}")
+
+# 5. Evaluation
+print(f"accuracy: {evaluate():.4f}")
+
+torch.save(model.cpu(), "model.pt")
+print("Model saved to model.pt")
+''')
+
+TENSORFLOW_TABULAR = Template(HEADER + '''
+import numpy as np
+import tensorflow as tf
+$imports
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+SEED = 42
+TEST_SIZE = 0.2
+EPOCHS = 50
+BATCH_SIZE = 32
+LR = 1e-3
+HIDDEN = 64
+
+tf.keras.utils.set_random_seed(SEED)
+
+# 1. Data loading
+$load
+
+# 2. Preprocessing
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SEED$stratify)
+scaler = StandardScaler().fit(X_train)
+X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+$prepare_targets
+
+# 3. Model definition
+model = tf.keras.Sequential([
+    tf.keras.Input(shape=(X.shape[1],)),
+    tf.keras.layers.Dense(HIDDEN, activation="relu"),
+    tf.keras.layers.Dense(HIDDEN, activation="relu"),
+    tf.keras.layers.Dense($outputs),
+])
+model.compile(
+    optimizer=tf.keras.optimizers.Adam(LR),
+    loss=$loss,
+    metrics=[$metrics],
+)
+
+# 4. Training
+model.fit(X_train, y_train, epochs=EPOCHS, batch_size=BATCH_SIZE, validation_split=0.1, verbose=2)
+
+# 5. Evaluation
+$report
+
+model.save("model.h5")
+print("Model saved to model.h5 (inputs must be standardized like the training data)")
+''')
+
+TENSORFLOW_CLASSIFICATION = dict(
+    stratify=", stratify=y",
+    prepare_targets="n_classes = int(np.max(y)) + 1",
+    outputs="n_classes",
+    loss="tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True)",
+    metrics='"accuracy"',
+    report="_, accuracy = model.evaluate(X_test, y_test, verbose=0)\n"
+           'print(f"accuracy: {accuracy:.4f}")',
+)
+
+TENSORFLOW_REGRESSION = dict(
+    stratify="",
+    prepare_targets="# Targets are standardized for training; metrics are reported in the original units.\n"
+                    "y_mean, y_std = y_train.mean(), y_train.std()\n"
+                    "y_train = (y_train - y_mean) / y_std",
+    outputs="1",
+    loss='"mse"',
+    metrics="",
+    report="predictions = model.predict(X_test, verbose=0).ravel() * y_std + y_mean\n"
+           'print(f"rmse: {np.sqrt(np.mean((predictions - y_test) ** 2)):.4f}")',
+)
+
+TENSORFLOW_IMAGE = Template(HEADER + '''
+import tensorflow as tf
+
+SEED = 42
+EPOCHS = 5
+BATCH_SIZE = 64
+LR = 1e-3
+CHANNELS = $channels
+IMAGE_SIZE = $size
+N_CLASSES = 10
+
+tf.keras.utils.set_random_seed(SEED)
+
+# 1. Data loading (downloaded to ~/.keras/datasets on first run)
+(x_train, y_train), (x_test, y_test) = tf.keras.datasets.$keras_module.load_data()
+
+# 2. Preprocessing: add the channel axis and scale pixels to [0, 1]
+x_train = x_train.reshape(-1, IMAGE_SIZE, IMAGE_SIZE, CHANNELS).astype("float32") / 255.0
+x_test = x_test.reshape(-1, IMAGE_SIZE, IMAGE_SIZE, CHANNELS).astype("float32") / 255.0
+y_train, y_test = y_train.reshape(-1), y_test.reshape(-1)
+
+# 3. Model definition
+model = tf.keras.Sequential([
+    tf.keras.Input(shape=(IMAGE_SIZE, IMAGE_SIZE, CHANNELS)),
+    tf.keras.layers.Conv2D(32, 3, padding="same", activation="relu"),
+    tf.keras.layers.MaxPooling2D(),
+    tf.keras.layers.Conv2D(64, 3, padding="same", activation="relu"),
+    tf.keras.layers.MaxPooling2D(),
+    tf.keras.layers.Flatten(),
+    tf.keras.layers.Dense(128, activation="relu"),
+    tf.keras.layers.Dropout(0.25),
+    tf.keras.layers.Dense(N_CLASSES),
+])
+model.compile(
+    optimizer=tf.keras.optimizers.Adam(LR),
+    loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
+    metrics=["accuracy"],
+)
+
+# 4. Training
+model.fit(x_train, y_train, epochs=EPOCHS, batch_size=BATCH_SIZE, validation_split=0.1, verbose=2)
+
+# 5. Evaluation
+_, accuracy = model.evaluate(x_test, y_test, verbose=0)
+print(f"accuracy: {accuracy:.4f}")
+
+model.save("model.h5")
+print("Model saved to model.h5")
+''')
+
+# How each (framework, task) renders a tabular dataset: (template, fixed substitutions).
+TABULAR_TEMPLATES = {
+    ("sklearn", "classification"): (SKLEARN_SUPERVISED, SKLEARN_CLASSIFICATION),
+    ("sklearn", "regression"): (SKLEARN_SUPERVISED, SKLEARN_REGRESSION),
+    ("sklearn", "clustering"): (SKLEARN_CLUSTERING, {}),
+    ("pytorch", "classification"): (PYTORCH_TABULAR, PYTORCH_CLASSIFICATION),
+    ("pytorch", "regression"): (PYTORCH_TABULAR, PYTORCH_REGRESSION),
+    ("tensorflow", "classification"): (TENSORFLOW_TABULAR, TENSORFLOW_CLASSIFICATION),
+    ("tensorflow", "regression"): (TENSORFLOW_TABULAR, TENSORFLOW_REGRESSION),
+}
+
+TITLES = {
+    "classification": "Classification",
+    "regression": "Regression",
+    "clustering": "Clustering",
+}
+FRAMEWORK_TITLES = {"sklearn": "scikit-learn", "pytorch": "PyTorch", "tensorflow": "TensorFlow/Keras"}
+
+Key = Tuple[str, str, str]
+
+
+def _build_index() -> Dict[Key, Tuple[Template, Dict[str, str]]]:
+    """
+    Every covered (framework, task, dataset) combination, with its template and substitutions.
+    """
+    index = {}
+    for (framework, task), (template, fixed) in TABULAR_TEMPLATES.items():
+        datasets = dict(TABULAR_DATASETS, custom=CUSTOM_DATASETS[task])
+        if framework == "sklearn":
+            datasets.update(SKLEARN_IMAGE_DATASETS)
+        for name, dataset in datasets.items():
+            if task not in dataset.tasks:
+                continue
+            imports = "\n".join(filter(None, [fixed.get("imports", ""), dataset.imports]))
+            index[(framework, task, name)] = (template, dict(fixed, imports=imports, load=dataset.load))
+    for name, (torchvision_class, keras_module, channels, size) in IMAGE_DATASETS.items():
+        image = dict(channels=str(channels), size=str(size))
+        index[("pytorch", "classification", name)] = (PYTORCH_IMAGE, dict(image, torchvision_class=torchvision_class))
+        index[("tensorflow", "classification", name)] = (TENSORFLOW_IMAGE, dict(image, keras_module=keras_module))
+    return index
+
+
+TEMPLATE_INDEX = _build_index()
+
+
+def normalize(task: str, framework: str, dataset: str) -> Key:
+    """
+    The index key for a task/framework/dataset as typed on the command line.
+    """
+    task, framework = task.strip().lower(), framework.strip().lower()
+    dataset = dataset.strip().lower().replace(" ", "_")
+    dataset = DATASET_ALIASES.get(dataset, dataset.replace("-", "_"))
+    return FRAMEWORK_ALIASES.get(framework, framework), TASK_ALIASES.get(task, task), dataset
+
+
+def available_templates() -> List[Key]:
+    return sorted(TEMPLATE_INDEX)
+
+
+def render_template(task: str, framework: str, dataset: str) -> Optional[str]:
+    """
+    Model code for the combination from the local template library, or None if it isn't covered.
+    """
+    key = normalize(task, framework, dataset)
+    if key not in TEMPLATE_INDEX:
+        return None
+    template, substitutions = TEMPLATE_INDEX[key]
+    framework, task, dataset = key
+    title = f"{TITLES[task]} on {dataset} with {FRAMEWORK_TITLES[framework]}."
+    return template.substitute(substitutions, title=title, framework=framework, task=task, dataset=dataset)
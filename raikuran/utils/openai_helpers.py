@@ -1,49 +1,602 @@
 # raikuran/utils/openai_helpers.py
 
+import ast
+import asyncio
+import io
 import os
-from openai import OpenAI
-from openai.types.chat import ChatCompletion
-from typing import List, Dict
+import random
+import threading
+import time
+import tokenize
+from typing import Any, Awaitable, Callable, List, Dict, NamedTuple, Optional
 import typer
 
-# Load API key from environment
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from raikuran.utils.batch import is_rate_limit_error, retry_after_seconds
+from raikuran.utils.cache import ResponseCache, cache_key
+from raikuran.utils.chunking import estimate_tokens
+from raikuran.utils import tracing
 
-if not OPENAI_API_KEY:
-    typer.echo("❌ OPENAI_API_KEY not set. Please export it in your shell or .env.")
-    raise typer.Exit(1)
+_client = None
+_async_client = None
+_async_client_loop = None
+_async_client_closer: Optional["asyncio.Task[None]"] = None
+_client_lock = threading.Lock()
+_cache: Optional[ResponseCache] = None
+# When response headers last arrived on this thread, for time-to-first-byte in traces.
+_timing = threading.local()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors.
+RETRY_STATUSES = {408, 409, 429}
+# Connection-level failures raised by the openai package, matched by name to keep it a lazy import.
+RETRY_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+
+class ModelSpec(NamedTuple):
+    context: int
+    max_output: int
+    input_price: float  # USD per 1M prompt tokens
+    output_price: float  # USD per 1M completion tokens
+    tier: str
+
+
+# Models requests are routed between. "fast" covers rewrites and generation,
+# "smart" the tasks that were written for GPT-4; within a tier the cheapest
+# model whose context fits the request is used. Prices are list prices, for estimates only.
+MODELS = {
+    "gpt-4o-mini": ModelSpec(128_000, 16_384, 0.15, 0.60, "fast"),
+    "gpt-3.5-turbo": ModelSpec(16_385, 4_096, 0.50, 1.50, "fast"),
+    "gpt-4o": ModelSpec(128_000, 16_384, 2.50, 10.00, "smart"),
+    "gpt-4-turbo": ModelSpec(128_000, 4_096, 10.00, 30.00, "smart"),
+    "gpt-4": ModelSpec(8_192, 8_192, 30.00, 60.00, "smart"),
+}
+# Chat formatting overhead per message, in tokens.
+MESSAGE_OVERHEAD = 4
+
+
+class ClientSettings(NamedTuple):
+    connect_timeout: float
+    read_timeout: float
+    max_retries: int
+    pool_size: int
+
+
+def client_settings() -> ClientSettings:
+    """
+    Timeouts, retry count and connection pool size, from RAIKURAN_OPENAI_* variables.
+    """
+    return ClientSettings(
+        connect_timeout=float(os.getenv("RAIKURAN_OPENAI_CONNECT_TIMEOUT", "10")),
+        read_timeout=float(os.getenv("RAIKURAN_OPENAI_READ_TIMEOUT", "120")),
+        max_retries=int(os.getenv("RAIKURAN_OPENAI_MAX_RETRIES", "5")),
+        pool_size=int(os.getenv("RAIKURAN_OPENAI_POOL_SIZE", "20")),
+    )
+
+
+def _api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        typer.echo("❌ OPENAI_API_KEY not set. Please export it in your shell or .env.")
+        raise typer.Exit(1)
+    return api_key
+
+
+def _client_options(settings: ClientSettings) -> Dict[str, Any]:
+    import httpx
+
+    return dict(
+        timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+        limits=httpx.Limits(max_connections=settings.pool_size, max_keepalive_connections=settings.pool_size),
+    )
+
+
+def _mark_response(response) -> None:
+    _timing.headers_at = time.perf_counter()
+
+
+def _trace_llm(trace: Dict[str, Any], messages: List[Dict[str, str]], content: str, model: str, start: float) -> None:
+    """
+    Add time-to-first-byte and token counts to an LLM trace event (only when tracing).
+    """
+    if not tracing.active():
+        return
+    headers_at = getattr(_timing, "headers_at", None)
+    if headers_at is not None and headers_at >= start:
+        trace["ttfb_s"] = round(headers_at - start, 4)
+    trace["prompt_tokens"] = count_message_tokens(messages, model)
+    trace["completion_tokens"] = count_tokens(content, model)
+
+
+def get_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+
+    The API key is validated here rather than at import time, so commands that
+    never reach the network (or hit the cache) don't require it. The client
+    keeps a pool of keep-alive connections, so repeated calls skip the TLS
+    handshake. Its own retries are off: `call_with_retries` handles them.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = _api_key()
+            from openai import DefaultHttpxClient, OpenAI
+
+            options = _client_options(client_settings())
+            _client = OpenAI(api_key=api_key, max_retries=0, timeout=options["timeout"],
+                             http_client=DefaultHttpxClient(**options, event_hooks={"response": [_mark_response]}))
+    return _client
+
+
+async def _close_on_shutdown(client) -> None:
+    # Parked until the loop shuts down: asyncio.run cancels pending tasks while
+    # the loop can still run, so the client's connection pool is closed cleanly.
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await client.close()
+
+
+def get_async_client():
+    """
+    Return the shared AsyncOpenAI client for the running event loop, creating it on first use.
+
+    The client is closed when its loop shuts down (e.g. at the end of
+    `asyncio.run`), so a new loop never leaves the previous pool open.
+    """
+    global _async_client, _async_client_loop, _async_client_closer
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        # httpx async pools are bound to the loop that opened them.
+        if _async_client is None or _async_client_loop is not loop:
+            api_key = _api_key()
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            options = _client_options(client_settings())
+            _async_client = AsyncOpenAI(api_key=api_key, max_retries=0, timeout=options["timeout"],
+                                        http_client=DefaultAsyncHttpxClient(**options))
+            _async_client_loop = loop
+            _async_client_closer = loop.create_task(_close_on_shutdown(_async_client))
+    return _async_client
+
+
+def retry_delay(exc: BaseException, attempt: int, base: float = 0.5, cap: float = 30.0) -> Optional[float]:
+    """
+    Seconds to wait before retrying after `exc`, or None if it isn't transient.
+
+    Retry-After (or retry-after-ms) from the API wins; otherwise the delay is
+    exponential in `attempt` with jitter, so concurrent callers spread out.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        if type(exc).__name__ not in RETRY_ERRORS:
+            return None
+    elif status not in RETRY_STATUSES and status < 500:
+        return None
+
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        retry_after_ms = float(headers.get("retry-after-ms"))
+    except (TypeError, ValueError):
+        retry_after_ms = None
+    retry_after = retry_after_ms / 1000 if retry_after_ms is not None else retry_after_seconds(exc)
+    if retry_after is not None and 0 <= retry_after <= 60:
+        return retry_after
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def call_with_retries(func: Callable[..., Any], *args, retry_rate_limits: bool = True, **kwargs) -> Any:
+    """
+    Call `func`, retrying transient API errors with backoff (see `retry_delay`).
+
+    With `retry_rate_limits=False`, 429s are raised at once so a caller with a
+    shared limiter (`batch.run_batch`) can pause all of its workers together.
+    """
+    max_retries = client_settings().max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as exc:
+            delay = retry_delay(exc, attempt)
+            if delay is None or attempt == max_retries or (not retry_rate_limits and is_rate_limit_error(exc)):
+                raise
+            time.sleep(delay)
+
+
+async def acall_with_retries(func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    Async variant of `call_with_retries`.
+    """
+    max_retries = client_settings().max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as exc:
+            delay = retry_delay(exc, attempt)
+            if delay is None or attempt == max_retries:
+                raise
+            await asyncio.sleep(delay)
+
+
+def get_cache() -> ResponseCache:
+    """
+    Return the shared on-disk response cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    Count tokens locally with tiktoken when it is installed, else estimate them.
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return len(encoding.encode(text, disallowed_special=()))
+    except Exception:  # not installed, or its encoding files can't be fetched offline
+        return estimate_tokens(text)
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "gpt-4o-mini") -> int:
+    return sum(count_tokens(m["content"], model) + MESSAGE_OVERHEAD for m in messages) + 3
+
+
+def _strip_docstrings(tree: ast.AST) -> ast.AST:
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) and ast.get_docstring(
+            node, clean=False
+        ) is not None:
+            node.body = node.body[1:] or [ast.Pass()]
+    return tree
+
+
+def compact_code(code: str, strip_comments: bool = False) -> str:
+    """
+    Shrink Python source before it is sent: drop blank lines and trailing whitespace.
+
+    With `strip_comments`, comments and docstrings go too (a docstring that is
+    a whole body becomes `pass`). String contents are never touched, and the
+    result must parse to the same AST (docstrings aside), otherwise the code
+    is returned unchanged.
+    """
+    with tracing.span("compact code", "prompt", strip_comments=strip_comments) as trace:
+        compacted = _compact_code(code, strip_comments)
+        trace.update(chars_in=len(code), chars_out=len(compacted))
+        return compacted
+
+
+def _compact_code(code: str, strip_comments: bool) -> str:
+    try:
+        tree = ast.parse(code)
+        tokens = list(tokenize.generate_tokens(io.StringIO(code).readline))
+    except (SyntaxError, tokenize.TokenError):
+        return code
+
+    lines = code.splitlines(keepends=True)
+    protected = set()  # lines inside multi-line strings, kept verbatim
+    comments = {}  # line index -> column where its comment starts
+    for token in tokens:
+        if token.start[0] != token.end[0] and token.type not in (tokenize.NEWLINE, tokenize.NL):
+            protected.update(range(token.start[0] - 1, token.end[0]))
+        elif token.type == tokenize.COMMENT and strip_comments:
+            comments[token.start[0] - 1] = token.start[1]
+
+    replaced: Dict[int, Optional[str]] = {}
+    if strip_comments:
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if ast.get_docstring(node, clean=False) is None:
+                continue
+            doc = node.body[0]
+            first, last = doc.lineno - 1, doc.end_lineno - 1
+            prefix = lines[first][:doc.col_offset]
+            if prefix.strip() or lines[last][doc.end_col_offset:].strip().split("#")[0].strip():
+                continue  # shares a line with other code
+            for index in range(first, last + 1):
+                replaced[index] = None
+                protected.discard(index)
+            if len(node.body) == 1:
+                replaced[first] = prefix + "pass\n"
+
+    compacted = []
+    for index, line in enumerate(lines):
+        if index in replaced:
+            if replaced[index] is not None:
+                compacted.append(replaced[index])
+        elif index in protected:
+            compacted.append(line)
+        else:
+            line = line[:comments[index]] if index in comments else line
+            if line.strip():
+                compacted.append(line.rstrip() + "\n")
+    result = "".join(compacted)
+
+    try:
+        same = ast.dump(_strip_docstrings(ast.parse(result))) == ast.dump(_strip_docstrings(ast.parse(code)))
+    except SyntaxError:
+        same = False
+    return result if same else code
+
+
+class PreparedRequest(NamedTuple):
+    model: str
+    max_tokens: int
+    prompt_tokens: int
+
+    @property
+    def max_cost(self) -> Optional[float]:
+        """
+        Upper-bound cost in USD (prompt plus a full-length completion), if the model's price is known.
+        """
+        spec = MODELS.get(self.model)
+        if spec is None:
+            return None
+        return (self.prompt_tokens * spec.input_price + self.max_tokens * spec.output_price) / 1e6
+
+
+def prepare_request(
+    messages: List[Dict[str, str]],
+    tier: str = "fast",
+    output_ratio: float = 1.0,
+    min_output: int = 256,
+    max_output: int = 4096,
+    model: Optional[str] = None,
+) -> PreparedRequest:
+    """
+    Pick the model and max_tokens for a request before it is sent.
+
+    The completion budget is `output_ratio` times the prompt size, clamped to
+    [`min_output`, `max_output`]. The request goes to the cheapest model of
+    `tier` whose context holds the prompt plus that budget, unless `model` (or
+    RAIKURAN_MODEL) pins one.
+
+    Raises:
+        ValueError: If no model of the tier can fit the prompt
+    """
+    with tracing.span("prepare request", "prompt", tier=tier) as trace:
+        prepared = _prepare_request(messages, tier, output_ratio, min_output, max_output, model)
+        trace.update(model=prepared.model, prompt_tokens=prepared.prompt_tokens, max_tokens=prepared.max_tokens)
+        return prepared
+
+
+def _prepare_request(
+    messages: List[Dict[str, str]],
+    tier: str,
+    output_ratio: float,
+    min_output: int,
+    max_output: int,
+    model: Optional[str],
+) -> PreparedRequest:
+    pinned = model or os.getenv("RAIKURAN_MODEL")
+    if pinned:
+        candidates = [pinned]
+    else:
+        candidates = sorted((name for name, spec in MODELS.items() if spec.tier == tier),
+                            key=lambda name: MODELS[name].input_price + MODELS[name].output_price)
+        if not candidates:
+            raise ValueError(f"Unknown model tier: {tier}")
+
+    prompt_tokens = 0
+    for name in candidates:
+        prompt_tokens = count_message_tokens(messages, name)
+        wanted = min(max_output, max(min_output, int(prompt_tokens * output_ratio)))
+        spec = MODELS.get(name)
+        if spec is None:
+            return PreparedRequest(name, wanted, prompt_tokens)
+        max_tokens = min(wanted, spec.max_output, spec.context - prompt_tokens)
+        if max_tokens >= wanted or (pinned and max_tokens > 0):
+            return PreparedRequest(name, max_tokens, prompt_tokens)
+    raise ValueError(f"A request of ~{prompt_tokens} tokens doesn't fit the context of any {tier} model.")
+
+
+def format_estimate(requests: List[PreparedRequest]) -> str:
+    """
+    One-line token and cost estimate for a dry run.
+    """
+    models = sorted({r.model for r in requests})
+    prompt = sum(r.prompt_tokens for r in requests)
+    completion = sum(r.max_tokens for r in requests)
+    costs = [r.max_cost for r in requests]
+    cost = "unknown cost" if None in costs else f"at most ${sum(costs):.4f}"
+    return (f"🧮 Dry run: {len(requests)} request(s) to {', '.join(models)}, ~{prompt:,} prompt tokens "
+            f"+ up to {completion:,} completion tokens, {cost}. Nothing was sent.")
+
+
+def echo_token(text: str) -> None:
+    """
+    Print a streamed text delta without a trailing newline.
+    """
+    typer.echo(text, nl=False)
+
+
+def is_cached(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-3.5-turbo",
+    temperature: float = 0.3,
+    max_tokens: int = 1500,
+) -> bool:
+    """
+    Return True if a response for this exact request is already in the cache.
+    """
+    key = cache_key(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+    return get_cache().get(key) is not None
+
+
+def complete_chat(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-3.5-turbo",
+    temperature: float = 0.3,
+    max_tokens: int = 1500,
+    use_cache: bool = True,
+    refresh: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    retry_rate_limits: bool = True,
+) -> str:
+    """
+    Cache-aware chat completion that lets API errors propagate.
+
+    Use this where the caller handles failures itself (e.g. retrying rate-limited
+    requests in batch mode, with `retry_rate_limits=False`); see
+    `run_chat_completion` for the CLI-friendly variant.
+    """
+    key = cache_key(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+    if use_cache and not refresh:
+        with tracing.span("llm cache lookup", "llm", model=model) as trace:
+            cached = get_cache().get(key)
+            trace["hit"] = cached is not None
+        if cached is not None:
+            if on_token:
+                on_token(cached)
+            return cached
+
+    with tracing.span(f"llm {model}", "llm", model=model, stream=bool(on_token)) as trace:
+        start = time.perf_counter()
+        if on_token:
+            content = _stream_completion(messages, model, temperature, max_tokens, on_token, trace,
+                                         retry_rate_limits)
+        else:
+            response = call_with_retries(
+                get_client().chat.completions.create,
+                retry_rate_limits=retry_rate_limits,
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            content = (response.choices[0].message.content or "").strip()
+        _trace_llm(trace, messages, content, model, start)
+
+    if use_cache:
+        get_cache().set(key, content, model=model)
+    return content
+
+
+async def acomplete_chat(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-3.5-turbo",
+    temperature: float = 0.3,
+    max_tokens: int = 1500,
+    use_cache: bool = True,
+    refresh: bool = False,
+) -> str:
+    """
+    Async, cache-aware chat completion on the shared async client; API errors propagate.
+    """
+    key = cache_key(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+    if use_cache and not refresh:
+        cached = get_cache().get(key)
+        if cached is not None:
+            return cached
+
+    with tracing.span(f"llm {model}", "llm", model=model, stream=False) as trace:
+        start = time.perf_counter()
+        response = await acall_with_retries(
+            get_async_client().chat.completions.create,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        content = (response.choices[0].message.content or "").strip()
+        _trace_llm(trace, messages, content, model, start)
+    if use_cache:
+        get_cache().set(key, content, model=model)
+    return content
 
 
 def run_chat_completion(
     messages: List[Dict[str, str]],
     model: str = "gpt-3.5-turbo",
     temperature: float = 0.3,
-    max_tokens: int = 1500
+    max_tokens: int = 1500,
+    use_cache: bool = True,
+    refresh: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
-    Run a GPT-4 chat completion request and return the response text.
+    Run a chat completion request and return the response text.
+
+    Responses are cached on disk, keyed by a hash of model, messages,
+    temperature and max_tokens, so repeated identical requests skip the network.
+    When `on_token` is given the response is streamed and each text delta is
+    passed to it as it arrives (a cached response is replayed in one piece).
 
     Args:
         messages: List of dicts containing messages, e.g. [{"role": "user", "content": "..."}]
-        model: GPT model to use (default: gpt-4)
+        model: GPT model to use (default: gpt-3.5-turbo)
         temperature: Creativity level (default: 0.3)
         max_tokens: Max tokens in output (default: 1500)
+        use_cache: Read from and write to the response cache (default: True)
+        refresh: Ignore any cached response but store the new one (default: False)
+        on_token: Optional callback receiving streamed text deltas (default: None)
 
     Returns:
         str: Content of the response message
     """
     try:
-        response: ChatCompletion = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        return response.choices[0].message.content.strip()
-
+        return complete_chat(messages, model, temperature, max_tokens, use_cache, refresh, on_token)
+    except typer.Exit:
+        raise
     except Exception as e:
         typer.echo(f"❌ OpenAI API call failed: {e}")
         raise typer.Exit(1)
+
+
+def _stream_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    on_token: Callable[[str], None],
+    trace: Optional[Dict[str, Any]] = None,
+    retry_rate_limits: bool = True,
+) -> str:
+    """
+    Stream a completion through `on_token` and report time-to-first-token and throughput.
+    """
+    start = time.perf_counter()
+    first_token_at = None
+    token_count = 0
+    parts = []
+
+    # Only opening the stream is retried; a failure mid-stream would replay delivered tokens.
+    stream = call_with_retries(
+        get_client().chat.completions.create,
+        retry_rate_limits=retry_rate_limits,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        token_count += 1  # one content delta per token in the streaming API
+        parts.append(delta)
+        on_token(delta)
+
+    end = time.perf_counter()
+    if first_token_at is not None and trace is not None:
+        trace["first_token_s"] = round(first_token_at - start, 4)
+    if first_token_at is not None:
+        generation_time = end - first_token_at
+        rate = token_count / generation_time if generation_time > 0 else float(token_count)
+        typer.echo(
+            f"\n⏱️  First token after {first_token_at - start:.2f}s · "
+            f"{token_count} tokens in {end - start:.2f}s ({rate:.1f} tokens/s)"
+        )
+    return "".join(parts).strip()
@@ -0,0 +1,252 @@
+# raikuran/utils/profiling.py
+
+import ast
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+# Runs the target script under cProfile and tracemalloc in a fresh interpreter.
+# When the time budget runs out the main thread is interrupted, so a partial
+# profile of a long training run is still collected.
+PROFILE_DRIVER = """
+import _thread, cProfile, json, os, pstats, runpy, sys, threading, time, tracemalloc
+
+script, budget, output = sys.argv[1], float(sys.argv[2]), sys.argv[3]
+target = os.path.abspath(script)
+sys.argv = [script]
+sys.path.insert(0, os.path.dirname(target))
+
+timer = threading.Timer(budget, _thread.interrupt_main)
+timer.daemon = True
+timer.start()
+tracemalloc.start()
+profiler = cProfile.Profile()
+completed, namespace = True, None
+start = time.perf_counter()
+profiler.enable()
+try:
+    namespace = runpy.run_path(target, run_name="__main__")
+except KeyboardInterrupt:
+    completed = False
+except SystemExit:
+    pass
+finally:
+    profiler.disable()
+wall = time.perf_counter() - start
+timer.cancel()
+
+snapshot = tracemalloc.take_snapshot()
+peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+
+functions = []
+for (filename, line, name), (_, calls, self_s, total_s, _) in pstats.Stats(profiler).stats.items():
+    functions.append({
+        "file": filename, "line": line, "name": name, "calls": calls, "self_s": self_s, "total_s": total_s,
+        "own": os.path.abspath(filename) == target,
+    })
+allocations = [
+    {"line": stat.traceback[0].lineno, "size": stat.size, "count": stat.count}
+    for stat in snapshot.filter_traces([tracemalloc.Filter(True, target)]).statistics("lineno")
+]
+with open(output, "w") as handle:
+    json.dump({"wall_s": wall, "completed": completed, "peak_bytes": peak,
+               "functions": functions, "allocations": allocations}, handle)
+"""
+
+# Runs the target script once without instrumentation and records its wall time.
+TIMING_DRIVER = """
+import json, os, runpy, sys, time
+
+script, output = sys.argv[1], sys.argv[2]
+target = os.path.abspath(script)
+sys.argv = [script]
+sys.path.insert(0, os.path.dirname(target))
+start = time.perf_counter()
+try:
+    runpy.run_path(target, run_name="__main__")
+except SystemExit:
+    pass
+with open(output, "w") as handle:
+    json.dump({"wall_s": time.perf_counter() - start}, handle)
+"""
+
+# Smallest median speedup that counts as real rather than timing noise.
+MIN_SPEEDUP = 1.05
+
+
+class Profile(NamedTuple):
+    wall_s: float
+    completed: bool
+    peak_bytes: int
+    functions: List[Dict[str, Any]]
+    allocations: List[Dict[str, Any]]
+    stdout: str
+
+    def hot_functions(self, top: int, own: bool = True) -> List[Dict[str, Any]]:
+        """
+        Functions with the most self time, either in the script itself or outside it.
+        """
+        selected = [f for f in self.functions if f["own"] == own]
+        return sorted(selected, key=lambda f: f["self_s"], reverse=True)[:top]
+
+    def allocation_sites(self, top: int) -> List[Dict[str, Any]]:
+        return sorted(self.allocations, key=lambda a: a["size"], reverse=True)[:top]
+
+
+def profile_script(script: Path, budget: float = 60.0) -> Profile:
+    """
+    Profile `script` (time and memory) in a subprocess for at most `budget` seconds.
+    """
+    script = Path(script).resolve()
+    with tempfile.TemporaryDirectory(prefix="raikuran-profile-") as tmp:
+        output = Path(tmp) / "profile.json"
+        result = subprocess.run(
+            [sys.executable, "-c", PROFILE_DRIVER, str(script), str(budget), str(output)],
+            cwd=script.parent, capture_output=True, text=True, timeout=budget + 60,
+        )
+        if not output.exists():
+            raise RuntimeError(f"Profiling {script.name} failed:\n{result.stderr[-2000:]}")
+        data = json.loads(output.read_text())
+    return Profile(stdout=result.stdout, **data)
+
+
+def time_script(script: Path, repeat: int = 3, timeout: float = 60.0) -> List[float]:
+    """
+    Wall times of `repeat` uninstrumented runs of `script`, each in a fresh interpreter.
+    """
+    script = Path(script).resolve()
+    times = []
+    with tempfile.TemporaryDirectory(prefix="raikuran-timing-") as tmp:
+        output = Path(tmp) / "timing.json"
+        for _ in range(repeat):
+            output.unlink(missing_ok=True)
+            result = subprocess.run(
+                [sys.executable, "-c", TIMING_DRIVER, str(script), str(output)],
+                cwd=script.parent, capture_output=True, text=True, timeout=timeout,
+            )
+            if not output.exists():
+                raise RuntimeError(f"Timing {script.name} failed:\n{result.stderr[-2000:]}")
+            times.append(json.loads(output.read_text())["wall_s"])
+    return times
+
+
+def measured_speedup(before: List[float], after: List[float], threshold: float = MIN_SPEEDUP) -> Tuple[float, bool]:
+    """
+    Median speedup of `after` over `before`, and whether it is beyond noise.
+
+    A speedup counts only if the medians differ by at least `threshold` and
+    every run of `after` beat every run of `before` (the spreads don't overlap).
+    """
+    speedup = statistics.median(before) / max(statistics.median(after), 1e-9)
+    return speedup, speedup >= threshold and max(after) < min(before)
+
+
+def _function_nodes(tree: ast.Module) -> List[Tuple[str, ast.AST]]:
+    """
+    Top-level functions and class methods with their qualified names.
+    """
+    nodes = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            nodes.append((node.name, node))
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    nodes.append((f"{node.name}.{item.name}", item))
+    return nodes
+
+
+def _span(node: ast.AST) -> Tuple[int, int]:
+    start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    return start, node.end_lineno
+
+
+def hot_regions(source: str, profile: Profile, top: int = 5) -> List[Tuple[str, int, int]]:
+    """
+    Source regions (label, first line, last line) behind the hottest functions and allocation sites.
+
+    Hot functions map to their whole definition; allocation lines map to the
+    enclosing function, or to the enclosing top-level statement for module code.
+    """
+    tree = ast.parse(source)
+    functions = _function_nodes(tree)
+    regions: Dict[Tuple[int, int], str] = {}
+
+    hot_lines = [f["line"] for f in profile.hot_functions(top) if f["name"] != "<module>"]
+    for line in hot_lines + [site["line"] for site in profile.allocation_sites(top)]:
+        # Comprehensions and lambdas are profiled separately; attribute them to their function.
+        enclosing = [(name, node) for name, node in functions if _span(node)[0] <= line <= node.end_lineno]
+        if enclosing:
+            name, node = max(enclosing, key=lambda item: _span(item[1])[0])
+            regions.setdefault(_span(node), name)
+            continue
+        for node in tree.body:
+            if node.lineno <= line <= node.end_lineno:
+                regions.setdefault(_span(node), "<module>")
+                break
+
+    return sorted((label, start, end) for (start, end), label in regions.items())
+
+
+def replace_functions(source: str, rewritten: str) -> Tuple[str, List[str]]:
+    """
+    Splice the functions defined in `rewritten` over the same-named ones in `source`.
+
+    New imports from `rewritten` are added after the existing imports. Returns
+    the new source and the names of the replaced functions.
+    """
+    original = ast.parse(source)
+    candidate = ast.parse(rewritten)
+    lines = source.splitlines(keepends=True)
+    new_lines = rewritten.splitlines(keepends=True)
+    targets = dict(_function_nodes(original))
+
+    edits = []
+    replaced = []
+    for name, node in _function_nodes(candidate):
+        if name not in targets:
+            continue
+        old_start, old_end = _span(targets[name])
+        new_start, new_end = _span(node)
+        indent = " " * targets[name].col_offset
+        block = [line[node.col_offset:] if line.strip() else line for line in new_lines[new_start - 1:new_end]]
+        block[-1] = block[-1].rstrip("\n") + "\n"
+        edits.append((old_start, old_end, [indent + line if line.strip() else line for line in block]))
+        replaced.append(name)
+    for start, end, block in sorted(edits, reverse=True):
+        lines[start - 1:end] = block
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+
+    existing = {ast.get_source_segment(source, node) for node in original.body
+                if isinstance(node, (ast.Import, ast.ImportFrom))}
+    imports = [ast.get_source_segment(rewritten, node) + "\n" for node in candidate.body
+               if isinstance(node, (ast.Import, ast.ImportFrom))
+               and ast.get_source_segment(rewritten, node) not in existing]
+    if imports:
+        after = max((node.end_lineno for node in original.body if isinstance(node, (ast.Import, ast.ImportFrom))),
+                    default=0)
+        lines[after:after] = imports
+    return "".join(lines), replaced
+
+
+def format_profile(profile: Profile, top: int = 5) -> str:
+    """
+    A compact text report of a profile, used both on screen and in the prompt.
+    """
+    rows = [f"Wall time: {profile.wall_s:.2f}s{'' if profile.completed else ' (time budget reached)'}, "
+            f"peak traced memory: {profile.peak_bytes / 1e6:.1f} MB", "Hot functions in the script (self time):"]
+    rows += [f"  {f['name']} (line {f['line']}): {f['self_s']:.3f}s self, {f['total_s']:.3f}s total, {f['calls']} calls"
+             for f in profile.hot_functions(top)]
+    rows.append("Hottest calls outside the script:")
+    rows += [f"  {f['name'] if f['file'] == '~' else Path(f['file']).name + ':' + f['name']}: "
+             f"{f['self_s']:.3f}s self, {f['calls']} calls"
+             for f in profile.hot_functions(top, own=False)]
+    rows.append("Largest allocation sites still live at exit:")
+    rows += [f"  line {a['line']}: {a['size'] / 1e6:.2f} MB in {a['count']} blocks" for a in profile.allocation_sites(top)]
+    return "\n".join(rows)
@@ -0,0 +1,214 @@
+# raikuran/utils/scoring.py
+
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import typer
+
+from raikuran.utils.files import atomic_write
+from raikuran.utils.serving import default_threads_per_worker, limit_threads
+
+# A chunk of input: feature matrix plus the optional id column values.
+Chunk = Tuple[np.ndarray, Optional[List[str]]]
+
+_run_model: Optional[Callable[[np.ndarray], np.ndarray]] = None
+_load_error: Optional[str] = None
+
+
+def load_runner(loader_source: str) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Execute model-loader source (which defines `run_model`) and return that function.
+    """
+    namespace = {"np": np}
+    exec(loader_source, namespace)
+    return namespace["run_model"]
+
+
+def _init_worker(loader_source: str, threads: int) -> None:
+    global _run_model, _load_error
+    limit_threads(threads)
+    try:
+        _run_model = load_runner(loader_source)
+    except Exception as exc:
+        # An initializer that raises only surfaces as BrokenProcessPool; report it from _predict.
+        _load_error = f"{type(exc).__name__}: {exc}"
+
+
+def _predict(features: np.ndarray) -> np.ndarray:
+    if _run_model is None:
+        raise RuntimeError(f"Could not load the model: {_load_error}")
+    return np.asarray(_run_model(features))
+
+
+def iter_csv_chunks(path: Path, chunk_size: int, columns: Optional[List[str]], id_column: Optional[str]) -> Iterator[Chunk]:
+    """
+    Stream a CSV file with a header row as (features, ids) chunks of `chunk_size` rows.
+    """
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader)
+        feature_names = columns or [name for name in header if name != id_column]
+        feature_idx = [header.index(name) for name in feature_names]
+        id_idx = header.index(id_column) if id_column else None
+
+        rows: List[List[str]] = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield _csv_chunk(rows, feature_idx, id_idx)
+                rows = []
+        if rows:
+            yield _csv_chunk(rows, feature_idx, id_idx)
+
+
+def _csv_chunk(rows: List[List[str]], feature_idx: List[int], id_idx: Optional[int]) -> Chunk:
+    features = np.array([[row[i] for i in feature_idx] for row in rows], dtype=np.float64)
+    ids = [row[id_idx] for row in rows] if id_idx is not None else None
+    return features, ids
+
+
+def iter_parquet_chunks(path: Path, chunk_size: int, columns: Optional[List[str]], id_column: Optional[str]) -> Iterator[Chunk]:
+    """
+    Stream a Parquet file as (features, ids) chunks of up to `chunk_size` rows (requires pyarrow).
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    feature_names = columns or [name for name in parquet.schema_arrow.names if name != id_column]
+    read_columns = feature_names + ([id_column] if id_column else [])
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=read_columns):
+        features = np.column_stack([batch.column(name).to_numpy(zero_copy_only=False) for name in feature_names])
+        ids = [str(v) for v in batch.column(id_column).to_pylist()] if id_column else None
+        yield features.astype(np.float64, copy=False), ids
+
+
+def _prediction_columns(predictions: np.ndarray) -> List[str]:
+    if predictions.ndim == 1 or predictions.shape[1] == 1:
+        return ["prediction"]
+    return [f"prediction_{i}" for i in range(predictions.shape[1])]
+
+
+class CsvSink:
+    """
+    Incremental CSV writer; the file appears atomically when scoring finishes.
+    """
+
+    def __init__(self, path: Path):
+        self._context = atomic_write(path)
+        self._writer = csv.writer(self._context.__enter__())
+        self._header_written = False
+
+    def write(self, predictions: np.ndarray, ids: Optional[List[str]]) -> None:
+        predictions = predictions.reshape(len(predictions), -1)
+        if not self._header_written:
+            self._writer.writerow((["id"] if ids is not None else []) + _prediction_columns(predictions))
+            self._header_written = True
+        if ids is not None:
+            self._writer.writerows([row_id, *values] for row_id, values in zip(ids, predictions.tolist()))
+        else:
+            self._writer.writerows(predictions.tolist())
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        if error is None:
+            self._context.__exit__(None, None, None)
+        else:
+            self._context.__exit__(type(error), error, error.__traceback__)
+
+
+class ParquetSink:
+    """
+    Incremental Parquet writer (one row group per chunk), renamed into place on success.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self._writer = None
+
+    def write(self, predictions: np.ndarray, ids: Optional[List[str]]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        predictions = predictions.reshape(len(predictions), -1)
+        names = _prediction_columns(predictions)
+        arrays = [pa.array(predictions[:, i]) for i in range(predictions.shape[1])]
+        if ids is not None:
+            names, arrays = ["id"] + names, [pa.array(ids)] + arrays
+        table = pa.Table.from_arrays(arrays, names=names)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.tmp_path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if error is None and self._writer is not None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def score_file(
+    loader_source: str,
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 100_000,
+    workers: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    id_column: Optional[str] = None,
+) -> int:
+    """
+    Score a CSV/Parquet file chunk by chunk across a process pool.
+
+    Each worker loads the model once (via `loader_source`) and runs vectorized
+    predictions on whole chunks. At most two chunks per worker are in flight,
+    so memory stays bounded regardless of file size, and results are written
+    in input order as they complete.
+
+    Returns:
+        int: Number of rows scored
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    reader = iter_parquet_chunks if input_path.suffix == ".parquet" else iter_csv_chunks
+    sink = ParquetSink(output_path) if output_path.suffix == ".parquet" else CsvSink(output_path)
+    workers = workers or os.cpu_count() or 1
+    threads = default_threads_per_worker(workers)
+
+    start = time.perf_counter()
+    rows = 0
+    in_flight: deque = deque()
+    error: Optional[BaseException] = None
+
+    def drain_one() -> None:
+        nonlocal rows
+        future, ids = in_flight.popleft()
+        predictions = future.result()
+        sink.write(predictions, ids)
+        rows += len(predictions)
+        elapsed = time.perf_counter() - start
+        typer.echo(f"📈 {rows:,} rows scored ({rows / elapsed:,.0f} rows/s)")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(loader_source, threads)) as executor:
+            for features, ids in reader(input_path, chunk_size, columns, id_column):
+                in_flight.append((executor.submit(_predict, features), ids))
+                if len(in_flight) >= 2 * workers:
+                    drain_one()
+            while in_flight:
+                drain_one()
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        sink.close(error)
+
+    elapsed = time.perf_counter() - start
+    typer.echo(f"✅ Scored {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) → {output_path}")
+    return rows
@@ -0,0 +1,101 @@
+# raikuran/utils/serving.py
+
+import gc
+import os
+import signal
+import socket
+import sys
+from typing import List, Optional
+
+import typer
+
+# Thread-pool knobs read by OpenMP, the common BLAS builds and numexpr at import time.
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def limit_threads(threads: int) -> None:
+    """
+    Cap the math-library thread pools of this process at `threads`.
+
+    The environment variables only take effect for libraries imported afterwards,
+    so call this before loading the model; torch is also adjusted at runtime.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+
+def default_threads_per_worker(workers: int) -> int:
+    """
+    Split the available cores evenly between workers (at least one thread each).
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def serve_preforked(
+    app_spec: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 2,
+    threads_per_worker: Optional[int] = None,
+) -> None:
+    """
+    Serve an ASGI app from `workers` forked uvicorn processes sharing one model.
+
+    The app module (and so the model) is imported once in the parent, the GC
+    state is frozen so refcount updates don't dirty the shared pages, and the
+    workers are forked afterwards: they share the model weights copy-on-write
+    and accept connections from one listening socket.
+    """
+    import uvicorn
+    from uvicorn.importer import import_from_string
+
+    threads = threads_per_worker or default_threads_per_worker(workers)
+    limit_threads(threads)
+
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    app = import_from_string(app_spec)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    gc.collect()
+    gc.freeze()
+
+    typer.echo(f"🧵 Forking {workers} workers ({threads} threads each) on http://{host}:{port}")
+    children: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            limit_threads(threads)
+            server = uvicorn.Server(uvicorn.Config(app, host=host, port=port))
+            server.run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+
+    def stop_workers(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    for child in children:
+        try:
+            os.waitpid(child, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
@@ -0,0 +1,189 @@
+# raikuran/utils/sharding.py
+
+import heapq
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import typer
+
+from raikuran.utils.files import atomic_write
+
+DEFAULT_HISTORY_FILE = Path(".raikuran") / "test_durations.json"
+# Assumed duration of a test file with no history, when no other file has any.
+DEFAULT_DURATION = 1.0
+# pytest exits with 5 when a shard collects no tests, which isn't a failure here.
+NO_TESTS_COLLECTED = 5
+
+
+class DurationHistory:
+    """
+    Per-test-file durations from previous runs, smoothed with an exponential moving average.
+    """
+
+    def __init__(self, path: Optional[Path] = None, smoothing: float = 0.5):
+        self.path = Path(path or os.getenv("RAIKURAN_TEST_DURATIONS") or DEFAULT_HISTORY_FILE)
+        self.smoothing = smoothing
+        try:
+            self.durations: Dict[str, float] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.durations = {}
+
+    def estimate(self, files: List[Path]) -> Dict[Path, float]:
+        """
+        Expected duration of each file; files without history get the median known duration.
+        """
+        known = [self.durations[f.as_posix()] for f in files if f.as_posix() in self.durations]
+        fallback = statistics.median(known) if known else DEFAULT_DURATION
+        return {f: self.durations.get(f.as_posix(), fallback) for f in files}
+
+    def update(self, measured: Dict[Path, float]) -> None:
+        for path, seconds in measured.items():
+            key = path.as_posix()
+            previous = self.durations.get(key)
+            self.durations[key] = seconds if previous is None else (
+                self.smoothing * seconds + (1 - self.smoothing) * previous
+            )
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as handle:
+            json.dump(dict(sorted(self.durations.items())), handle, indent=2)
+
+
+def partition(durations: Dict[Path, float], shards: int) -> List[List[Path]]:
+    """
+    Split files into `shards` groups of similar total duration (longest processing time first).
+
+    Files are placed longest first, each onto the currently lightest shard; ties
+    are broken by name so every machine computes the same split.
+    """
+    heap: List[Tuple[float, int]] = [(0.0, i) for i in range(shards)]
+    groups: List[List[Path]] = [[] for _ in range(shards)]
+    for path in sorted(durations, key=lambda p: (-durations[p], p.as_posix())):
+        load, index = heapq.heappop(heap)
+        groups[index].append(path)
+        heapq.heappush(heap, (load + durations[path], index))
+    return [sorted(group) for group in groups]
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """
+    Parse "i/N" (1-based) into (i, N), raising ValueError when malformed.
+    """
+    index, _, total = spec.partition("/")
+    index, total = int(index), int(total)
+    if not 1 <= index <= total:
+        raise ValueError(f"Shard index must be between 1 and {total}.")
+    return index, total
+
+
+def file_durations(report: ET.Element, files: List[Path]) -> Dict[Path, float]:
+    """
+    Sum the JUnit testcase times of a pytest report per test file.
+
+    pytest names each testcase's classname after its module path (plus any
+    class), so cases are matched to the file with the longest dotted prefix.
+    """
+    dotted = {f.with_suffix("").as_posix().replace("/", "."): f for f in files}
+    totals: Dict[Path, float] = {}
+    for case in report.iter("testcase"):
+        classname = case.get("classname", "")
+        matches = [name for name in dotted if classname == name or classname.startswith(name + ".")]
+        if matches:
+            path = dotted[max(matches, key=len)]
+            totals[path] = totals.get(path, 0.0) + float(case.get("time", 0))
+    return totals
+
+
+def merge_junit(reports: List[ET.Element], output: Optional[Path]) -> Dict[str, float]:
+    """
+    Combine shard reports into one <testsuites> document and return the totals.
+    """
+    merged = ET.Element("testsuites")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
+    for index, report in enumerate(reports, start=1):
+        for suite in report.iter("testsuite"):
+            suite.set("name", f"{suite.get('name', 'pytest')}-shard-{index}")
+            for key in totals:
+                totals[key] += type(totals[key])(float(suite.get(key, 0)))
+            merged.append(suite)
+    for key, value in totals.items():
+        merged.set(key, f"{value:.3f}" if key == "time" else str(value))
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        ET.ElementTree(merged).write(output, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def run_sharded(
+    files: List[Path],
+    shards: int,
+    only: Optional[int] = None,
+    extra: Optional[List[str]] = None,
+    junit_xml: Optional[Path] = None,
+    history: Optional[DurationHistory] = None,
+) -> int:
+    """
+    Run pytest over `files` split into duration-balanced shards and return the exit code.
+
+    All shards run as parallel pytest processes, or with `only` (1-based) just
+    that shard runs, so CI machines sharing the same history split identically.
+    Measured durations are folded back into the history after each run.
+    """
+    history = history or DurationHistory()
+    groups = partition(history.estimate(files), shards)
+    selected = [only] if only else range(1, shards + 1)
+
+    with tempfile.TemporaryDirectory(prefix="raikuran-shards-") as tmp:
+        running = []
+        for index in selected:
+            group = groups[index - 1]
+            if not group:
+                continue
+            report = Path(tmp) / f"shard-{index}.xml"
+            command = ["pytest", *map(str, group), f"--junitxml={report}", *(extra or [])]
+            typer.echo(f"🧩 Shard {index}/{shards}: {len(group)} file(s)")
+            if only:
+                # A single CI shard streams its output like a normal run.
+                log, process = None, subprocess.Popen(command)
+            else:
+                log = open(Path(tmp) / f"shard-{index}.log", "w+")
+                process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+            running.append((index, group, report, log, process))
+
+        exit_code, reports = 0, []
+        for index, group, report, log, process in running:
+            code = process.wait()
+            failed = code not in (0, NO_TESTS_COLLECTED)
+            seconds = 0.0
+            if report.exists():
+                parsed = ET.parse(report).getroot()
+                seconds = sum(float(suite.get("time", 0)) for suite in parsed.iter("testsuite"))
+                history.update(file_durations(parsed, group))
+                reports.append(parsed)
+            typer.echo(f"{'❌' if failed else '✅'} Shard {index}/{shards} finished in {seconds:.1f}s")
+            if log is not None:
+                if failed:
+                    log.seek(0)
+                    typer.echo(log.read())
+                log.close()
+            if failed:
+                exit_code = exit_code or code
+
+        history.save()
+        totals = merge_junit(reports, junit_xml)
+
+    passed = totals["tests"] - totals["failures"] - totals["errors"] - totals["skipped"]
+    typer.echo(
+        f"📊 {passed} passed, {totals['failures']} failed, {totals['errors']} errors, "
+        f"{totals['skipped']} skipped across {len(reports)} shard(s)"
+    )
+    if junit_xml:
+        typer.echo(f"💾 JUnit report saved to {junit_xml}")
+    return exit_code
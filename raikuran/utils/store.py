@@ -0,0 +1,210 @@
+# raikuran/utils/store.py
+
+import configparser
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import typer
+
+DEFAULT_STORE_DIR = Path.home() / ".cache" / "raikuran" / "store"
+INSTALLER = "raikuran"
+
+SCRIPT_TEMPLATE = """#!{python}
+import sys
+from {module} import {name}
+
+if __name__ == "__main__":
+    sys.exit({call}())
+"""
+
+
+def store_dir() -> Path:
+    return Path(os.getenv("RAIKURAN_STORE_DIR") or DEFAULT_STORE_DIR)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fetch_wheels(requirements: Path, destination: Path, wheelhouse: Optional[Path] = None) -> List[Path]:
+    """
+    Resolve `requirements` to wheel files in `destination` (from a wheelhouse, or the index via pip's cache).
+    """
+    command = [sys.executable, "-m", "pip", "download", "--quiet", "--only-binary=:all:",
+               "-r", str(requirements), "-d", str(destination)]
+    if wheelhouse:
+        command += ["--no-index", "--find-links", str(wheelhouse)]
+    subprocess.run(command, check=True)
+    return sorted(destination.glob("*.whl"))
+
+
+def unpack(wheel: Path, root: Optional[Path] = None) -> Path:
+    """
+    Unpack a wheel into the store (once per content hash) and return its directory.
+
+    Sources are byte-compiled in the store too, so every environment linked
+    to it shares the .pyc files. Extraction happens in a temporary directory
+    that is renamed into place, so concurrent unpacks of one wheel are safe.
+    """
+    root = root or store_dir()
+    target = root / "pkgs" / f"{file_sha256(wheel)[:16]}-{wheel.stem}"
+    if target.exists():
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".unpack-", dir=target.parent))
+    try:
+        with zipfile.ZipFile(wheel) as archive:
+            archive.extractall(tmp)
+        subprocess.run([sys.executable, "-m", "compileall", "-q", str(tmp)], capture_output=True)
+        os.rename(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.exists():
+            raise
+    return target
+
+
+def link_file(source: Path, destination: Path) -> bool:
+    """
+    Hardlink `source` to `destination`, copying instead across filesystems; True if linked.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists() or destination.is_symlink():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+        return True
+    except OSError:
+        shutil.copy2(source, destination)
+        return False
+
+
+def venv_paths(venv: Path) -> Dict[str, Path]:
+    """
+    Install locations (purelib, platlib, scripts, data, include) of a virtual environment.
+    """
+    python = venv_python(venv)
+    script = "import sysconfig; print('\\n'.join(sysconfig.get_paths()[k] for k in ('purelib', 'platlib', 'scripts', 'data', 'include')))"
+    output = subprocess.run([str(python), "-c", script], capture_output=True, text=True, check=True).stdout
+    return dict(zip(("purelib", "platlib", "scripts", "data", "include"), map(Path, output.splitlines())))
+
+
+def venv_python(venv: Path) -> Path:
+    if os.name == "nt":
+        return venv / "Scripts" / "python.exe"
+    return venv / "bin" / "python"
+
+
+def _write_scripts(dist_info: Path, scripts: Path, python: Path) -> None:
+    entry_points = dist_info / "entry_points.txt"
+    if not entry_points.exists():
+        return
+    parser = configparser.ConfigParser(delimiters=("=",))
+    parser.optionxform = str
+    parser.read(entry_points)
+    for section in ("console_scripts", "gui_scripts"):
+        if not parser.has_section(section):
+            continue
+        for name, target in parser.items(section):
+            module, _, attr = target.split("[")[0].strip().partition(":")
+            script = scripts / name
+            script.write_text(SCRIPT_TEMPLATE.format(
+                python=python, module=module, name=attr.split(".")[0], call=attr,
+            ))
+            script.chmod(0o755)
+
+
+def link_package(unpacked: Path, paths: Dict[str, Path], python: Path) -> Dict[str, int]:
+    """
+    Install one unpacked wheel into an environment by hardlinking its files.
+
+    Library files (including the shared .pyc files) are linked; generated
+    scripts and the INSTALLER marker are written per environment, since those
+    must not be shared between environments.
+    """
+    counts = {"linked": 0, "copied": 0}
+    dist_info = next(unpacked.glob("*.dist-info"))
+    purelib = paths["purelib"] if "Root-Is-Purelib: true" in (dist_info / "WHEEL").read_text() else paths["platlib"]
+
+    for source in unpacked.rglob("*"):
+        if source.is_dir():
+            continue
+        rel = source.relative_to(unpacked)
+        if rel.parts[0].endswith(".data"):
+            kind, rest = rel.parts[1], Path(*rel.parts[2:])
+            if kind == "scripts":
+                destination = paths["scripts"] / rest
+                text = source.read_bytes()
+                if text.startswith(b"#!python"):
+                    text = b"#!" + str(python).encode() + text[len(b"#!python"):]
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                destination.write_bytes(text)
+                destination.chmod(0o755)
+                continue
+            base = {"purelib": paths["purelib"], "platlib": paths["platlib"], "data": paths["data"],
+                    "headers": paths["include"] / dist_info.name.split("-")[0]}.get(kind)
+            if base is None:
+                continue
+            destination = base / rest
+        else:
+            destination = purelib / rel
+        counts["linked" if link_file(source, destination) else "copied"] += 1
+
+    installed_info = purelib / dist_info.name
+    installer = installed_info / "INSTALLER"
+    if installer.exists():
+        installer.unlink()  # never write through a hardlink into the store
+    installer.write_text(f"{INSTALLER}\n")
+    _write_scripts(dist_info, paths["scripts"], python)
+    return counts
+
+
+def create_linked_venv(
+    venv: Path,
+    requirements: Optional[Path] = None,
+    wheelhouse: Optional[Path] = None,
+    with_pip: bool = True,
+) -> Dict[str, int]:
+    """
+    Create a virtual environment whose packages are hardlinked from the shared store.
+
+    Wheels are resolved with pip (offline from `wheelhouse` if given), unpacked
+    into the per-user store once per content hash, and linked into the new
+    environment, so further environments with the same dependencies cost
+    seconds and almost no extra disk. Files fall back to copies when the store
+    is on another filesystem.
+
+    Returns:
+        dict: Counts of "packages", "linked" and "copied" files
+    """
+    command = [sys.executable, "-m", "venv", str(venv)]
+    if not with_pip:
+        command.append("--without-pip")
+    subprocess.run(command, check=True)
+
+    totals = {"packages": 0, "linked": 0, "copied": 0}
+    if requirements is None:
+        return totals
+
+    paths = venv_paths(venv)
+    python = venv_python(venv).absolute()
+    with tempfile.TemporaryDirectory(prefix="raikuran-wheels-") as tmp:
+        for wheel in fetch_wheels(requirements, Path(tmp), wheelhouse):
+            counts = link_package(unpack(wheel), paths, python)
+            totals["packages"] += 1
+            totals["linked"] += counts["linked"]
+            totals["copied"] += counts["copied"]
+            typer.echo(f"🔗 {wheel.name}: {counts['linked']} linked, {counts['copied']} copied")
+    return totals
@@ -0,0 +1,155 @@
+# raikuran/utils/torch_backends.py
+
+import hashlib
+import importlib.util
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import typer
+
+BACKENDS = ("eager", "torchscript", "onnx")
+# Modules a backend needs besides torch; installed by the extra of the same name.
+BACKEND_REQUIREMENTS = {"onnx": ("onnx", "onnxruntime")}
+
+
+def file_digest(path: Path, length: int = 12) -> str:
+    """
+    Short sha256 of a file's contents, read in 1 MB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:length]
+
+
+def missing_modules(backend: str) -> List[str]:
+    """
+    Modules `backend` needs that aren't installed.
+    """
+    return [name for name in BACKEND_REQUIREMENTS.get(backend, ()) if importlib.util.find_spec(name) is None]
+
+
+def compiled_artifact_path(model_path: Path, backend: str) -> Path:
+    """
+    Where the compiled form of `model_path` is cached: next to it, keyed by its hash.
+    """
+    suffix = ".onnx" if backend == "onnx" else ".pt"
+    return model_path.with_name(f"{model_path.stem}_{file_digest(model_path)}_{backend}{suffix}")
+
+
+def _load_eager(model_path: Path):
+    import torch
+
+    try:
+        model = torch.load(model_path, weights_only=False)
+    except TypeError:  # torch < 1.13 has no weights_only
+        model = torch.load(model_path)
+    model.eval()
+    return model
+
+
+def _export(model, backend: str, example, target: Path) -> None:
+    import torch
+
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    if backend == "torchscript":
+        with torch.inference_mode():
+            traced = torch.jit.trace(model, example)
+        traced = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        torch.jit.save(traced, str(tmp_path))
+    else:
+        torch.onnx.export(
+            model, example, str(tmp_path),
+            input_names=["input"], output_names=["output"],
+            dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+        )
+    os.replace(tmp_path, target)
+
+
+def load_runner(path: Path, backend: str) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Load a model for `backend` and return a numpy-in, numpy-out predict function.
+    """
+    if backend == "onnx":
+        import onnxruntime as ort
+
+        session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+        input_name = session.get_inputs()[0].name
+        return lambda inputs: session.run(None, {input_name: inputs.astype(np.float32, copy=False)})[0]
+
+    import torch
+
+    model = torch.jit.load(str(path)) if backend == "torchscript" else _load_eager(path)
+
+    def run(inputs: np.ndarray) -> np.ndarray:
+        with torch.inference_mode():
+            return model(torch.from_numpy(inputs.astype(np.float32, copy=False))).numpy()
+
+    return run
+
+
+def _median_latency_ms(run: Callable[[np.ndarray], np.ndarray], inputs: np.ndarray, runs: int) -> float:
+    run(inputs)  # warm-up (lazy init, graph optimization passes)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(inputs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def compile_model(
+    model_path: Path,
+    backend: str,
+    input_shape: Sequence[int],
+    rtol: float = 1e-3,
+    atol: float = 1e-5,
+    benchmark_runs: int = 20,
+) -> Path:
+    """
+    Compile a pickled torch model for CPU serving and return the artifact path.
+
+    The model is traced (TorchScript, frozen and optimized for inference) or
+    exported to ONNX with a dynamic batch axis. The artifact is cached next to
+    the source model under its content hash, so unchanged models are compiled
+    only once. Compiled outputs are checked against eager mode within
+    `rtol`/`atol` (raising ValueError on mismatch), and a short benchmark
+    reports the median latency of both paths.
+    """
+    if backend not in BACKENDS or backend == "eager":
+        raise ValueError(f"Unsupported compiled backend: {backend}")
+
+    import torch
+
+    target = compiled_artifact_path(model_path, backend)
+    inputs = np.random.default_rng(0).standard_normal(tuple(input_shape)).astype(np.float32)
+
+    if target.exists():
+        typer.echo(f"♻️  Reusing cached {backend} artifact: {target.name}")
+    else:
+        typer.echo(f"⚙️  Compiling {model_path.name} with {backend}...")
+        _export(_load_eager(model_path), backend, torch.from_numpy(inputs), target)
+
+    runners: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+        "eager": load_runner(model_path, "eager"),
+        backend: load_runner(target, backend),
+    }
+    expected = runners["eager"](inputs)
+    actual = runners[backend](inputs)
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+        target.unlink(missing_ok=True)
+        max_diff = float(np.max(np.abs(actual - expected)))
+        raise ValueError(f"{backend} outputs differ from eager mode (max abs diff {max_diff:.2e})")
+
+    eager_ms = _median_latency_ms(runners["eager"], inputs, benchmark_runs)
+    compiled_ms = _median_latency_ms(runners[backend], inputs, benchmark_runs)
+    typer.echo(
+        f"⏱️  Median latency for input {tuple(input_shape)}: eager {eager_ms:.2f} ms, "
+        f"{backend} {compiled_ms:.2f} ms ({eager_ms / max(compiled_ms, 1e-9):.2f}x)"
+    )
+    return target
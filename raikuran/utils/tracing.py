@@ -0,0 +1,224 @@
+# raikuran/utils/tracing.py
+
+import contextlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+import typer
+
+DEFAULT_TRACE_DIR = Path(".raikuran") / "traces"
+# RAIKURAN_TRACE values that mean "on, default location" rather than a file path.
+TRUTHY = ("1", "true", "yes", "on")
+FALSY = ("", "0", "false", "no", "off")
+
+
+class Tracer:
+    """
+    Collects Chrome trace events ("X" complete events, microseconds since start) for one run.
+    """
+
+    def __init__(self, path: Path, name: str):
+        self.path = Path(path)
+        self.name = name
+        self.origin = time.perf_counter()
+        self.cpu_origin = time.process_time()
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def now_us(self) -> float:
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def add(self, name: str, cat: str, start_us: float, dur_us: float, args: Dict[str, Any]) -> None:
+        event = {"name": name, "cat": cat, "ph": "X", "ts": round(start_us, 1), "dur": round(dur_us, 1),
+                 "pid": self.pid, "tid": threading.get_ident(), "args": args}
+        with self._lock:
+            self.events.append(event)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def active() -> bool:
+    return _tracer is not None
+
+
+@contextlib.contextmanager
+def _span(tracer: Tracer, name: str, cat: str, args: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    start = tracer.now_us()
+    cpu = time.thread_time()
+    try:
+        yield args
+    finally:
+        args["cpu_ms"] = round((time.thread_time() - cpu) * 1000, 3)
+        tracer.add(name, cat, start, tracer.now_us() - start, args)
+
+
+def span(name: str, cat: str = "raikuran", **args) -> ContextManager[Dict[str, Any]]:
+    """
+    Time a block as a trace event; the yielded dict becomes the event's args.
+
+    Costs nothing beyond a null context when tracing is off.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return contextlib.nullcontext(args)
+    return _span(tracer, name, cat, args)
+
+
+def command_name(args: Any) -> str:
+    """
+    Short label for a subprocess: the program, or the module of `python -m <module>`.
+    """
+    argv = shlex.split(args) if isinstance(args, str) else [str(a) for a in args]
+    if not argv:
+        return "subprocess"
+    program = Path(argv[0]).name
+    if program.startswith("python") or argv[0] == sys.executable:
+        if "-m" in argv[1:-1]:
+            return argv[argv.index("-m", 1) + 1]
+        if "-c" in argv[1:]:
+            return "python -c"
+        return Path(argv[1]).name if len(argv) > 1 else program
+    return program
+
+
+class TracedPopen(subprocess.Popen):
+    """
+    Popen that records each child's wall time and (on POSIX) its own CPU time from wait4.
+    """
+
+    def __init__(self, args, *rest, **kwargs):
+        self._trace_start = _tracer.now_us() if _tracer else None
+        self._trace_usage = None
+        self._trace_done = False
+        super().__init__(args, *rest, **kwargs)
+
+    def _try_wait(self, wait_flags):
+        if not hasattr(os, "wait4"):
+            return super()._try_wait(wait_flags)
+        try:
+            pid, status, usage = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            return self.pid, 0
+        if pid == self.pid:
+            self._trace_usage = usage
+        return pid, status
+
+    def wait(self, timeout=None):
+        code = super().wait(timeout)
+        self._trace_finish()
+        return code
+
+    def _trace_finish(self) -> None:
+        tracer = _tracer
+        if self._trace_done or self._trace_start is None or tracer is None:
+            return
+        self._trace_done = True
+        argv = self.args if isinstance(self.args, str) else " ".join(str(a) for a in self.args)
+        args: Dict[str, Any] = {"argv": argv[:500], "returncode": self.returncode}
+        usage = self._trace_usage
+        if usage is not None:
+            args["cpu_ms"] = round((usage.ru_utime + usage.ru_stime) * 1000, 3)
+            args["max_rss_mb"] = round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        tracer.add(command_name(self.args), "subprocess", self._trace_start, tracer.now_us() - self._trace_start, args)
+
+
+_originals: Dict[str, Any] = {}
+
+
+def _traced_reader(method):
+    def read(self, *args, **kwargs):
+        with span(f"read {self.name}", "io", path=str(self)) as trace:
+            data = method(self, *args, **kwargs)
+            trace["bytes"] = len(data)
+            return data
+
+    return read
+
+
+def _install() -> None:
+    _originals.update(popen=subprocess.Popen, read_text=Path.read_text, read_bytes=Path.read_bytes)
+    subprocess.Popen = TracedPopen
+    Path.read_text = _traced_reader(_originals["read_text"])
+    Path.read_bytes = _traced_reader(_originals["read_bytes"])
+
+
+def _uninstall() -> None:
+    if _originals:
+        subprocess.Popen = _originals["popen"]
+        Path.read_text = _originals["read_text"]
+        Path.read_bytes = _originals["read_bytes"]
+        _originals.clear()
+
+
+def trace_path(setting: Optional[str], command: Optional[str]) -> Path:
+    """
+    Where to write the trace: RAIKURAN_TRACE if it names a file, else a timestamped file under .raikuran/traces.
+    """
+    if setting and setting.strip().lower() not in TRUTHY + FALSY:
+        return Path(setting)
+    return DEFAULT_TRACE_DIR / f"{command or 'raikuran'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+
+def start_tracing(path: Path, name: str) -> Tracer:
+    """
+    Start recording spans, subprocesses and file reads for this run.
+    """
+    global _tracer
+    _tracer = Tracer(path, name)
+    _install()
+    return _tracer
+
+
+def summarize(events: List[Dict[str, Any]], top: int = 15) -> str:
+    """
+    Table of the most expensive phases: calls, wall and CPU seconds, and LLM tokens, grouped by name.
+    """
+    rows: Dict[str, Dict[str, float]] = {}
+    for event in events:
+        name = "file reads" if event["cat"] == "io" else event["name"]
+        row = rows.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "tokens": 0})
+        row["calls"] += 1
+        row["wall"] += event["dur"] / 1e6
+        row["cpu"] += event["args"].get("cpu_ms", 0) / 1000
+        row["tokens"] += event["args"].get("prompt_tokens", 0) + event["args"].get("completion_tokens", 0)
+
+    lines = [f"  {'phase':<40} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'tokens':>8}"]
+    for name, row in sorted(rows.items(), key=lambda item: item[1]["wall"], reverse=True)[:top]:
+        tokens = f"{int(row['tokens']):,}" if row["tokens"] else ""
+        lines.append(f"  {name[:40]:<40} {int(row['calls']):>6} {row['wall']:>9.3f} {row['cpu']:>9.3f} {tokens:>8}")
+    return "\n".join(lines)
+
+
+def stop_tracing() -> Optional[Path]:
+    """
+    Stop recording, write the Chrome trace-event JSON and print the summary table (to stderr).
+    """
+    global _tracer
+    tracer = _tracer
+    if tracer is None:
+        return None
+    _tracer = None
+    _uninstall()
+
+    total_us = tracer.now_us()
+    root = {"name": tracer.name, "cat": "run", "ph": "X", "ts": 0, "dur": round(total_us, 1), "pid": tracer.pid,
+            "tid": threading.main_thread().ident,
+            "args": {"cpu_ms": round((time.process_time() - tracer.cpu_origin) * 1000, 3)}}
+    events = [root] + sorted(tracer.events, key=lambda e: e["ts"])
+    metadata = {"name": "process_name", "ph": "M", "pid": tracer.pid, "args": {"name": "raikuran"}}
+
+    tracer.path.parent.mkdir(parents=True, exist_ok=True)
+    tracer.path.write_text(json.dumps({"traceEvents": [metadata] + events, "displayTimeUnit": "ms"}))
+    typer.echo(f"\n⏱️  {tracer.name}: {total_us / 1e6:.3f}s wall, {root['args']['cpu_ms'] / 1000:.3f}s CPU", err=True)
+    typer.echo(summarize(tracer.events), err=True)
+    typer.echo(f"📈 Trace written to {tracer.path} (open in https://ui.perfetto.dev or chrome://tracing)", err=True)
+    return tracer.path
@@ -28,6 +28,8 @@ setup(
         "fastapi",
         "uvicorn",
         "joblib",
+        "packaging",
+        "tomli; python_version < '3.11'",
         "numpy",
         "torch",
         "tensorflow",
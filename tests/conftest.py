@@ -0,0 +1,42 @@
+# tests/conftest.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from raikuran.utils import openai_helpers
+from raikuran.utils.cache import ResponseCache
+
+
+class FakeClient:
+    """Minimal stand-in for openai.OpenAI that counts completion calls."""
+
+    def __init__(self, content="hello"):
+        self.calls = 0
+        self.content = content
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return iter(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=ch))])
+                for ch in self.content
+            )
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture(autouse=True)
+def isolated_format_cache(tmp_path, monkeypatch):
+    """Keep `format run` cache entries out of the real user cache."""
+    monkeypatch.setenv("RAIKURAN_FORMAT_CACHE_DIR", str(tmp_path / "format-cache"))
+
+
+@pytest.fixture
+def fake_client(tmp_path, monkeypatch):
+    """Route run_chat_completion to a FakeClient with an isolated cache."""
+    client = FakeClient()
+    monkeypatch.setattr(openai_helpers, "_client", client)
+    monkeypatch.setattr(openai_helpers, "_cache", ResponseCache(directory=tmp_path / "cache"))
+    return client
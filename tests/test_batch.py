@@ -0,0 +1,47 @@
+# tests/test_batch.py
+
+import asyncio
+
+from raikuran.utils.batch import BatchJob, ProgressJournal, RateLimiter, run_batch
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_run_batch_retries_rate_limited_jobs(tmp_path):
+    attempts = {}
+
+    def process(job):
+        attempts[job.key] = attempts.get(job.key, 0) + 1
+        if job.key == "a" and attempts["a"] == 1:
+            err = RateLimitError("slow down")
+            err.response = type("Response", (), {"headers": {"retry-after": "0.01"}})()
+            raise err
+
+    journal = ProgressJournal(tmp_path / "journal.jsonl")
+    jobs = [BatchJob(key=k, fingerprint="f", cost=10, payload=None) for k in ("a", "b")]
+    summary = run_batch(jobs, process, journal, concurrency=2)
+
+    assert summary == {"done": 2, "skipped": 0, "failed": 0}
+    assert attempts == {"a": 2, "b": 1}
+
+
+def test_progress_journal_resumes_only_unchanged_jobs(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = ProgressJournal(path)
+    journal.record("a", "v1", "done")
+    journal.record("b", "v1", "failed", error="boom")
+
+    reloaded = ProgressJournal(path)
+    assert reloaded.is_done("a", "v1")
+    assert not reloaded.is_done("a", "v2")
+    assert not reloaded.is_done("b", "v1")
+
+
+def test_rate_limiter_charges_every_request_of_a_job():
+    limiter = RateLimiter(rpm=60, tpm=1000)
+    asyncio.run(limiter.acquire(100, requests=3))
+
+    assert 56.9 < limiter.requests.tokens < 57.1
+    assert 899 < limiter.tokens.tokens < 901
@@ -0,0 +1,85 @@
+# tests/test_benchmarks.py
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import typer  # noqa: E402
+from typer.testing import CliRunner  # noqa: E402
+
+from harness import BENCHMARKS, Benchmark, compare, environment  # noqa: E402
+from stub_openai import StubOpenAI  # noqa: E402
+
+
+def test_compare_flags_slower_times_and_lower_throughput():
+    baseline = {"cli.help": {"median_s": 1.0}, "serving.sklearn": {"rps": 100.0, "error_rate": 0.0},
+                "removed": {"median_s": 1.0}}
+    results = {"cli.help": {"median_s": 1.1}, "serving.sklearn": {"rps": 70.0, "error_rate": 0.0},
+               "new": {"median_s": 5.0}}
+
+    rows = {(row["benchmark"], row["metric"]): row for row in compare(results, baseline, tolerance=0.2)}
+
+    assert set(rows) == {("cli.help", "median_s"), ("serving.sklearn", "rps"), ("serving.sklearn", "error_rate")}
+    assert not rows["cli.help", "median_s"]["regression"]
+    assert rows["serving.sklearn", "rps"]["regression"]
+    assert not rows["serving.sklearn", "error_rate"]["regression"]
+    assert compare({"x": {"error_rate": 0.1}}, {"x": {"error_rate": 0.0}}, 0.2)[0]["regression"]
+    assert not compare({"x": {"rps": 200.0}}, {"x": {"rps": 100.0}}, 0.2)[0]["regression"]
+
+
+def test_update_baseline_refuses_runs_with_failures(tmp_path, monkeypatch):
+    import run
+
+    def broken(options):
+        raise RuntimeError("server did not start")
+
+    monkeypatch.setattr(run, "BENCHMARKS", BENCHMARKS + [Benchmark("fake.ok", lambda options: {"median_s": 1.0}),
+                                                         Benchmark("fake.broken", broken)])
+    app = typer.Typer()
+    app.command()(run.main)
+    baseline = tmp_path / "baseline.json"
+    args = ["--only", "fake", "--output", str(tmp_path / "results.json"), "--baseline", str(baseline),
+            "--update-baseline"]
+
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 1
+    assert "Not updating the baseline: fake.broken failed" in result.output
+    assert not baseline.exists() and (tmp_path / "results.json").exists()
+
+
+def test_baseline_from_other_hardware_does_not_gate(tmp_path, monkeypatch):
+    import run
+
+    monkeypatch.setattr(run, "BENCHMARKS", BENCHMARKS + [Benchmark("fake.ok", lambda options: {"median_s": 10.0})])
+    app = typer.Typer()
+    app.command()(run.main)
+    here = environment()
+    baseline = tmp_path / "baseline.json"
+    args = ["--only", "fake", "--output", str(tmp_path / "results.json"), "--baseline", str(baseline)]
+
+    def record(cpu_count):
+        baseline.write_text(json.dumps({"environment": {**here, "cpu_count": cpu_count}, "options": {"quick": False},
+                                        "results": {"fake.ok": {"median_s": 1.0}}}))
+
+    record(here["cpu_count"])
+    assert CliRunner().invoke(app, args).exit_code == 1
+    record(here["cpu_count"] + 1)
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0 and "different hardware (cpu_count" in result.output
+
+
+def test_stub_server_speaks_the_openai_protocol():
+    from openai import OpenAI
+
+    with StubOpenAI(latency=0, content="hello\nworld") as stub:
+        client = OpenAI(base_url=stub.url, api_key="sk-stub", max_retries=0)
+        reply = client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}])
+        stream = client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}],
+                                                stream=True)
+        streamed = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+
+    assert reply.choices[0].message.content == "hello\nworld"
+    assert streamed == "hello\nworld"
+    assert stub.requests == 2
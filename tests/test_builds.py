@@ -0,0 +1,39 @@
+# tests/test_builds.py
+
+import pytest
+
+from raikuran.utils.builds import build_project
+
+pytest.importorskip("setuptools")
+pytest.importorskip("wheel")
+
+
+def _make_project(root):
+    (root / "demo").mkdir(parents=True)
+    (root / "demo" / "__init__.py").write_text("VERSION = '0.1'\n")
+    (root / "setup.py").write_text(
+        "from setuptools import setup\nsetup(name='demo', version='0.1', packages=['demo'])\n"
+    )
+
+
+def test_build_is_cached_and_reproducible(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAIKURAN_BUILD_CACHE_DIR", str(tmp_path / "cache"))
+    project = tmp_path / "project"
+    _make_project(project)
+
+    artifacts = build_project(project, project / "dist", isolated=False)
+    names = sorted(a.name for a in artifacts)
+    assert names == ["demo-0.1-py3-none-any.whl", "demo-0.1.tar.gz"]
+    wheel = (project / "dist" / names[0]).read_bytes()
+    assert not (project / "build").exists()  # builds ran in private copies
+
+    (project / "dist" / names[0]).unlink()
+    build_project(project, project / "dist", isolated=False)
+    assert (project / "dist" / names[0]).read_bytes() == wheel
+
+    rebuilt = build_project(project, tmp_path / "other", isolated=False, use_cache=False)
+    assert [a.read_bytes() for a in rebuilt if a.suffix == ".whl"] == [wheel]
+
+    (project / "demo" / "__init__.py").write_text("VERSION = '0.2'\n")
+    build_project(project, project / "dist", isolated=False)
+    assert (project / "dist" / names[0]).read_bytes() != wheel
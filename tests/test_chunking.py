@@ -0,0 +1,71 @@
+# tests/test_chunking.py
+
+import ast
+
+from raikuran.utils.chunking import estimate_tokens, map_ordered, split_code, strip_code_fences
+
+
+def _make_module(functions=20, body_lines=10):
+    parts = ['"""Module docstring."""\n', "import os\n\n"]
+    for i in range(functions):
+        parts.append(f"# helper {i}\n@staticmethod\ndef func_{i}(x):\n")
+        parts.extend(f"    x = x + {j}  # step {j}\n" for j in range(body_lines))
+        parts.append("    return x\n\n")
+    return "".join(parts)
+
+
+def test_split_code_keeps_small_files_whole():
+    code = "x = 1\n"
+    assert split_code(code, max_tokens=100) == [code]
+
+
+def test_split_code_cuts_at_function_boundaries():
+    code = _make_module()
+    chunks = split_code(code, max_tokens=200)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == code
+    for chunk in chunks:
+        assert estimate_tokens(chunk) <= 200
+        ast.parse(chunk)  # every chunk is a complete set of top-level statements
+    # Leading comments and decorators stay with their function.
+    assert all(not chunk.rstrip().endswith(("@staticmethod", "# helper 3")) for chunk in chunks)
+
+
+def test_split_code_descends_into_large_classes():
+    methods = "".join(f"    def m{i}(self):\n" + "        return 1\n" * 20 + "\n" for i in range(10))
+    code = "class Big:\n" + methods
+    chunks = split_code(code, max_tokens=150)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == code
+    assert chunks[0].startswith("class Big:")
+
+
+def test_strip_code_fences_and_map_ordered():
+    assert strip_code_fences("```python\nx = 1\n```") == "x = 1"
+    assert strip_code_fences("x = 1") == "x = 1"
+    assert map_ordered(lambda n: n * 2, [3, 1, 2]) == [6, 2, 4]
+
+
+def test_map_ordered_caps_parallelism():
+    import threading
+    import time
+
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work(n):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return n
+
+    assert map_ordered(work, list(range(12))) == list(range(12))
+    assert 1 < peak[0] <= 4
+
+    peak[0] = 0
+    assert map_ordered(work, [1, 2, 3], max_workers=1) == [1, 2, 3]
+    assert peak[0] == 1
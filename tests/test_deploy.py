@@ -0,0 +1,361 @@
+# tests/test_deploy.py
+
+import asyncio
+import importlib.util
+import sys
+
+import pytest
+
+from raikuran.commands.deploy import generate_fastapi_wrapper
+
+joblib = pytest.importorskip("joblib")
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+
+class SumModel:
+    """Tiny sklearn-style model: one prediction per row, counts predict calls."""
+
+    calls = 0
+
+    def predict(self, inputs):
+        SumModel.calls += 1
+        return np.asarray(inputs).sum(axis=1)
+
+
+class LinearModel:
+    """sklearn-style model holding a weight array, to check memory mapping."""
+
+    def __init__(self, weights):
+        self.weights = weights
+
+    def predict(self, inputs):
+        return np.asarray(inputs) @ self.weights
+
+
+try:
+    import torch as _torch
+
+    class NoisyModel(_torch.nn.Module):
+        """Adds fresh noise on every call, so no compiled copy can match eager outputs."""
+
+        def forward(self, x):
+            return x + _torch.rand_like(x)
+except ImportError:
+    NoisyModel = None
+
+
+def _load_wrapper(tmp_path, monkeypatch, model_path=None, **options):
+    """Generate a wrapper for `model_path` (default: a pickled SumModel) and import it."""
+    monkeypatch.chdir(tmp_path)
+    if model_path is None:
+        model_path = tmp_path / "model.pkl"
+        joblib.dump(SumModel(), model_path)
+    wrapper = generate_fastapi_wrapper(model_path, **options)
+    spec = importlib.util.spec_from_file_location(f"wrapper_{id(options)}", tmp_path / wrapper.name)
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, spec.name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _post_many(app, payloads):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.post("/predict", json=p) for p in payloads))
+    return [r.json() for r in responses]
+
+
+async def _post_raw(app, content, headers):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/predict", content=content, headers=headers)
+
+
+def test_wrapper_single_request(tmp_path, monkeypatch):
+    app = _load_wrapper(tmp_path, monkeypatch).app
+    [body] = asyncio.run(_post_many(app, [{"input": [1, 2, 3]}]))
+    assert body == {"prediction": [6]}
+
+
+def test_wrapper_micro_batches_concurrent_requests(tmp_path, monkeypatch):
+    app = _load_wrapper(tmp_path, monkeypatch, batching=True, max_batch_size=8, max_wait_ms=50).app
+    SumModel.calls = 0
+    payloads = [{"input": [i, i]} for i in range(8)]
+    bodies = asyncio.run(_post_many(app, payloads))
+
+    assert [b["prediction"] for b in bodies] == [2 * i for i in range(8)]
+    assert max(b["batch_size"] for b in bodies) > 1
+    assert SumModel.calls < 8
+
+
+def test_wrapper_binary_formats_round_trip(tmp_path, monkeypatch):
+    import io
+
+    app = _load_wrapper(tmp_path, monkeypatch, batching=True, max_wait_ms=1).app
+    sample = np.arange(4, dtype="<f4")
+
+    response = asyncio.run(_post_raw(app, sample.tobytes(), {
+        "content-type": "application/octet-stream", "x-shape": "4", "x-dtype": "float32",
+    }))
+    assert response.status_code == 200
+    assert np.frombuffer(response.content, dtype=response.headers["x-dtype"]).tolist() == [6.0]
+    assert response.headers["x-shape"] == ""  # one scalar prediction per sample
+    assert response.headers["x-batch-size"] == "1"
+
+    buffer = io.BytesIO()
+    np.save(buffer, sample)
+    response = asyncio.run(_post_raw(app, buffer.getvalue(), {"content-type": "application/x-npy"}))
+    assert np.load(io.BytesIO(response.content)).item() == 6.0
+
+    response = asyncio.run(_post_raw(app, b"not json", {"content-type": "application/json"}))
+    assert response.status_code == 400
+
+
+def test_wrapper_msgpack_round_trip(tmp_path, monkeypatch):
+    msgpack = pytest.importorskip("msgpack")
+    app = _load_wrapper(tmp_path, monkeypatch).app
+    body = msgpack.packb({"input": np.ones(3, dtype="<f4").tobytes(), "shape": [3], "dtype": "float32"})
+
+    response = asyncio.run(_post_raw(app, body, {"content-type": "application/msgpack"}))
+    data = msgpack.unpackb(response.content)
+    assert np.frombuffer(data["prediction"], dtype=data["dtype"]).tolist() == [3.0]
+    assert data["shape"] == [1]
+
+
+def test_mmap_conversion_and_loading(tmp_path, monkeypatch):
+    import pickle
+    from raikuran.commands.deploy import convert_for_mmap
+
+    source = tmp_path / "linear.pkl"
+    source.write_bytes(pickle.dumps(LinearModel(np.arange(3, dtype=np.float64))))
+    converted = convert_for_mmap(source)
+    assert converted.name == "linear_mmap.pkl"
+    assert convert_for_mmap(source) == converted  # reused while up to date
+    assert convert_for_mmap(converted) == converted
+
+    wrapper = _load_wrapper(tmp_path, monkeypatch, model_path=converted, mmap=True)
+    [body] = asyncio.run(_post_many(wrapper.app, [{"input": [1, 1, 1]}]))
+    assert body == {"prediction": [3.0]}
+    assert isinstance(wrapper.model.weights, np.memmap)
+
+
+def test_wrapper_loads_models_from_other_directories(tmp_path, monkeypatch):
+    from raikuran.commands.deploy import convert_for_mmap
+
+    (tmp_path / "models").mkdir()
+    joblib.dump(LinearModel(np.arange(3.0)), tmp_path / "models" / "linear.pkl")
+    converted = convert_for_mmap(tmp_path / "models" / "linear.pkl")
+
+    wrapper = _load_wrapper(tmp_path, monkeypatch, converted, mmap=True)
+    [body] = asyncio.run(_post_many(wrapper.app, [{"input": [1, 1, 1]}]))
+    assert body == {"prediction": [3.0]}
+    assert isinstance(wrapper.model.weights, np.memmap)
+
+
+@pytest.mark.parametrize("suffix", [".pkl", ".pt", ".h5"])
+@pytest.mark.parametrize("batching", [False, True])
+def test_generated_wrappers_compile(tmp_path, monkeypatch, suffix, batching):
+    monkeypatch.chdir(tmp_path)
+    model_path = tmp_path / f"model{suffix}"
+    model_path.touch()
+    wrapper = generate_fastapi_wrapper(model_path, batching=batching)
+    compile(wrapper.read_text(), wrapper.name, "exec")
+
+
+@pytest.mark.parametrize("batching", [False, True])
+def test_torch_wrapper_serves_pickled_module(tmp_path, monkeypatch, batching):
+    torch = pytest.importorskip("torch")
+    model = torch.nn.Linear(3, 1)
+    with torch.no_grad():
+        model.weight.fill_(1.0)
+        model.bias.zero_()
+    torch.save(model, tmp_path / "net.pt")
+
+    app = _load_wrapper(tmp_path, monkeypatch, tmp_path / "net.pt", batching=batching).app
+    [body] = asyncio.run(_post_many(app, [{"input": [1, 2, 3]}]))
+    assert body["prediction"] == [6.0]
+
+
+@pytest.mark.parametrize("backend", ["torchscript", "onnx"])
+def test_compiled_backend_wrappers(tmp_path, monkeypatch, backend):
+    from raikuran.utils.torch_backends import compiled_artifact_path
+
+    monkeypatch.chdir(tmp_path)
+    model_path = tmp_path / "net.pt"
+    model_path.write_bytes(b"weights")
+    compiled = compiled_artifact_path(model_path, backend)
+    assert compiled.parent == tmp_path and compiled.name.startswith("net_")
+    assert compiled_artifact_path(model_path, backend) == compiled
+
+    wrapper = generate_fastapi_wrapper(model_path, backend=backend, compiled_path=compiled)
+    source = wrapper.read_text()
+    assert wrapper.name == "net_api.py" and compiled.name in source
+    compile(source, wrapper.name, "exec")
+
+
+def _save_linear(path):
+    torch = pytest.importorskip("torch")
+    model = torch.nn.Linear(4, 2)
+    torch.save(model, path)
+    return path
+
+
+def test_torchscript_compile_checks_outputs_and_reuses_artifacts(tmp_path, monkeypatch):
+    from raikuran.utils.torch_backends import compile_model
+
+    model_path = _save_linear(tmp_path / "net.pt")
+    compiled = compile_model(model_path, "torchscript", [2, 4], benchmark_runs=2)
+    assert compiled.exists() and compiled.name.endswith("_torchscript.pt")
+    built_at = compiled.stat().st_mtime_ns
+
+    assert compile_model(model_path, "torchscript", [2, 4], benchmark_runs=2) == compiled
+    assert compiled.stat().st_mtime_ns == built_at  # reused, not rebuilt
+
+    wrapper = _load_wrapper(tmp_path, monkeypatch, model_path, backend="torchscript", compiled_path=compiled)
+    [body] = asyncio.run(_post_many(wrapper.app, [{"input": [[1.0, 2.0, 3.0, 4.0]]}]))
+    assert len(body["prediction"][0]) == 2
+
+
+def test_compile_rejects_outputs_outside_tolerance(tmp_path):
+    from raikuran.utils.torch_backends import compile_model
+
+    torch = pytest.importorskip("torch")
+    torch.save(NoisyModel(), tmp_path / "noisy.pt")
+    with pytest.raises(ValueError, match="differ from eager"):
+        compile_model(tmp_path / "noisy.pt", "torchscript", [2, 4], benchmark_runs=2)
+    assert not list(tmp_path.glob("noisy_*"))
+
+
+def test_onnx_backend_reports_missing_extra(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from raikuran.main import app as cli
+    from raikuran.utils import torch_backends
+
+    monkeypatch.setitem(torch_backends.BACKEND_REQUIREMENTS, "onnx", ("surely_missing_module",))
+    (tmp_path / "net.pt").touch()
+    result = CliRunner().invoke(cli, ["deploy", "fastapi", "-f", str(tmp_path / "net.pt"), "--backend", "onnx",
+                                      "--input-shape", "1,4"])
+    assert result.exit_code == 1 and "pip install 'raikuran[onnx]'" in result.output
+
+
+def test_compiled_backend_requires_torch_model_and_shape(tmp_path):
+    from typer.testing import CliRunner
+    from raikuran.main import app as cli
+
+    (tmp_path / "model.pkl").touch()
+    (tmp_path / "net.pt").touch()
+    runner = CliRunner()
+    result = runner.invoke(cli, ["deploy", "fastapi", "-f", str(tmp_path / "model.pkl"), "--backend", "onnx"])
+    assert result.exit_code == 1 and "only available for torch" in result.output
+    result = runner.invoke(cli, ["deploy", "fastapi", "-f", str(tmp_path / "net.pt"), "--backend", "torchscript"])
+    assert result.exit_code == 1 and "--input-shape" in result.output
+
+
+@pytest.mark.skipif(not hasattr(__import__("os"), "fork"), reason="requires fork()")
+def test_serve_preforked_shares_parent_loaded_app(tmp_path):
+    import os
+    import socket
+    import subprocess
+    import time
+
+    pytest.importorskip("uvicorn")
+    (tmp_path / "svc.py").write_text(
+        "import os\n"
+        "from fastapi import FastAPI\n"
+        "LOADED_IN = os.getpid()\n"
+        "app = FastAPI()\n"
+        "@app.get('/')\n"
+        "def info():\n"
+        "    return {'loaded_in': LOADED_IN, 'pid': os.getpid(), 'omp': os.environ.get('OMP_NUM_THREADS')}\n"
+    )
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    script = f"from raikuran.utils.serving import serve_preforked; serve_preforked('svc:app', '127.0.0.1', {port}, 2, 1)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd(), os.environ.get("PYTHONPATH", "")]))
+    proc = subprocess.Popen([sys.executable, "-c", script], cwd=tmp_path, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        bodies = []
+        deadline = time.time() + 20
+        while len(bodies) < 20 and time.time() < deadline:
+            try:
+                bodies.append(httpx.get(f"http://127.0.0.1:{port}/", timeout=2).json())
+            except httpx.TransportError:
+                time.sleep(0.1)
+        assert len(bodies) == 20
+        assert {b["loaded_in"] for b in bodies} == {proc.pid}
+        assert proc.pid not in {b["pid"] for b in bodies}
+        assert {b["omp"] for b in bodies} == {"1"}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def test_batch_score_streams_csv_in_chunks(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from raikuran.main import app as cli
+
+    joblib.dump(SumModel(), tmp_path / "model.pkl")
+    lines = ["id,a,b"] + [f"r{i},{i},{i}" for i in range(25)]
+    (tmp_path / "data.csv").write_text("\n".join(lines) + "\n")
+
+    result = CliRunner().invoke(cli, [
+        "deploy", "batch-score", "--model", str(tmp_path / "model.pkl"), "--input", str(tmp_path / "data.csv"),
+        "--output", str(tmp_path / "out.csv"), "--chunk-size", "10", "--workers", "2", "--id-column", "id",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "rows/s" in result.output
+
+    out = (tmp_path / "out.csv").read_text().splitlines()
+    assert out[0] == "id,prediction"
+    assert out[1:] == [f"r{i},{2.0 * i}" for i in range(25)]
+
+
+def test_batch_score_torch_model_and_load_errors(tmp_path):
+    from typer.testing import CliRunner
+    from raikuran.main import app as cli
+
+    torch = pytest.importorskip("torch")
+    model = torch.nn.Linear(2, 1)
+    with torch.no_grad():
+        model.weight.fill_(1.0)
+        model.bias.zero_()
+    torch.save(model, tmp_path / "net.pt")
+    (tmp_path / "broken.pt").write_bytes(b"not a model")
+    (tmp_path / "data.csv").write_text("a,b\n1,2\n3,4\n")
+
+    def score(model_file):
+        return CliRunner().invoke(cli, [
+            "deploy", "batch-score", "--model", str(tmp_path / model_file), "--input", str(tmp_path / "data.csv"),
+            "--output", str(tmp_path / "out.csv"), "--workers", "1",
+        ])
+
+    result = score("net.pt")
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "out.csv").read_text().splitlines() == ["prediction", "3.0", "7.0"]
+
+    result = score("broken.pt")
+    assert result.exit_code == 1
+    assert "Could not load the model: UnpicklingError" in result.output
+
+
+@pytest.mark.parametrize("rps", [None, 200.0])
+def test_bench_reports_latency_percentiles(tmp_path, monkeypatch, rps):
+    from raikuran.utils.loadgen import load_payloads, run_bench
+
+    transport = httpx.ASGITransport(app=_load_wrapper(tmp_path, monkeypatch).app)
+    (tmp_path / "samples.jsonl").write_text('{"input": [1, 2]}\n{"input": [3, 4, 5]}\n')
+    payloads = load_payloads(tmp_path / "samples.jsonl")
+
+    report = asyncio.run(run_bench("http://test/predict", payloads, 0.2, 4, rps, transport=transport))
+    assert report["mode"] == ("open" if rps else "closed")
+    assert report["requests"] == report["succeeded"] > 0 and report["error_rate"] == 0
+    latency = report["latency_ms"]
+    assert 0 < latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+    report = asyncio.run(run_bench("http://test/missing", payloads, 0.1, 2, rps, transport=transport))
+    assert report["succeeded"] == 0 and report["error_rate"] == 1 and set(report["errors"]) == {"404"}
@@ -0,0 +1,95 @@
+# tests/test_envsync.py
+
+import json
+import subprocess
+import sys
+
+import typer
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils import envsync
+from raikuran.utils.envsync import parse_requirements, unsatisfied
+
+
+def test_parse_requirements_follows_includes_and_splits_lines(tmp_path):
+    (tmp_path / "base.txt").write_text("numpy>=1.20  # arrays\n--extra-index-url https://example.org/simple\n")
+    (tmp_path / "requirements.txt").write_text(
+        "-r base.txt\n# comment\nrequests==2.31.0\n-e ./local_pkg\nmypkg @ https://example.org/mypkg.whl\n"
+    )
+    requirements = parse_requirements(tmp_path / "requirements.txt")
+    assert requirements.specs == ["numpy>=1.20", "requests==2.31.0"]
+    assert requirements.opaque == ["-e ./local_pkg", "mypkg @ https://example.org/mypkg.whl"]
+    assert requirements.options == ["--extra-index-url", "https://example.org/simple"]
+
+    (tmp_path / "base.txt").write_text("numpy>=1.21\n")
+    assert parse_requirements(tmp_path / "requirements.txt").digest != requirements.digest
+
+
+def test_parse_requirements_joins_continuations_and_drops_hashes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(envsync, "target_python", lambda: sys.executable)
+    monkeypatch.setattr(envsync.subprocess, "run", lambda cmd, **kw: subprocess.CompletedProcess(cmd, 0))
+    (tmp_path / "requirements.txt").write_text(
+        f"typer=={typer.__version__} \\\n"
+        "    --hash=sha256:aaaa \\\n"
+        "    --hash=sha256:bbbb\n"
+        "    # via raikuran\n"
+        "numpy>=1 --hash=sha256:cccc  # arrays\n"
+    )
+    requirements = parse_requirements(tmp_path / "requirements.txt")
+    assert requirements.specs == [f"typer=={typer.__version__}", "numpy>=1"]
+
+    result = CliRunner().invoke(app, ["env", "sync"])
+    assert result.exit_code == 0 and "already in sync" in result.output
+
+
+def test_unsatisfied_compares_versions_and_markers():
+    installed = {"numpy": "1.26.4", "scikit-learn": "1.4.0"}
+    specs = ["numpy>=1.20", "Scikit_Learn==1.3.0", "torch", "pywin32; sys_platform == 'nonexistent'"]
+    assert unsatisfied(specs, installed) == ["Scikit_Learn==1.3.0", "torch"]
+
+
+def test_env_sync_installs_only_missing_requirements(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(envsync, "target_python", lambda: sys.executable)
+    calls = []
+    monkeypatch.setattr(envsync.subprocess, "run", lambda cmd, **kw: calls.append(cmd) or subprocess.CompletedProcess(cmd, 0))
+    (tmp_path / "requirements.txt").write_text("typer\nnumpy>=1.0\n")
+
+    result = CliRunner().invoke(app, ["env", "sync"])
+    assert result.exit_code == 0 and "already in sync" in result.output
+    assert calls == []
+
+    (tmp_path / "wheels").mkdir()
+    (tmp_path / "requirements.txt").write_text("typer\nsurely-not-installed-pkg==1.0\n")
+    result = CliRunner().invoke(app, ["env", "sync", "--wheelhouse", "wheels"])
+    assert result.exit_code == 0, result.output
+    [command] = calls
+    assert command[-5:] == ["--no-index", "--find-links", "wheels", "-r", "requirements.txt"]
+
+
+def test_env_sync_targets_the_project_venv_not_raikurans_interpreter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("VIRTUAL_ENV", raising=False)
+    subprocess.run([sys.executable, "-m", "venv", "--without-pip", ".venv"], check=True)
+    target = envsync.target_python()
+    assert target != sys.executable and target.startswith(str(tmp_path))
+
+    real_run = subprocess.run
+    installs = []
+
+    def run(cmd, **kwargs):
+        if "-c" in cmd:  # the metadata dump, run for real by the target
+            return real_run(cmd, **kwargs)
+        installs.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0)
+
+    monkeypatch.setattr(envsync.subprocess, "run", run)
+    # typer is installed for raikuran but not in the fresh venv.
+    (tmp_path / "requirements.txt").write_text("typer\n")
+    result = CliRunner().invoke(app, ["env", "sync"])
+    assert result.exit_code == 0, result.output
+    [command] = installs
+    assert command[:4] == [target, "-m", "pip", "install"]
+    assert list(json.loads((tmp_path / ".raikuran" / "env_sync.json").read_text())) == [target]
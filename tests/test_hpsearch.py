@@ -0,0 +1,84 @@
+# tests/test_hpsearch.py
+
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils.hpsearch import (
+    MedianPruner,
+    StudyStore,
+    apply_params,
+    find_constants,
+    objective_pattern,
+    run_trial,
+)
+
+SCRIPT = '''\
+LR = 0.01  # learning rate
+EPOCHS = 3
+NAME = "run"
+
+for epoch in range(EPOCHS):
+    print(f"epoch {epoch} score: {1 - (LR - 0.3) ** 2 + epoch / 100:.4f}")
+'''
+
+
+def test_apply_params_rewrites_only_constant_values():
+    assert find_constants(SCRIPT) == {"LR": 0.01, "EPOCHS": 3, "NAME": "run"}
+    updated = apply_params(SCRIPT, {"LR": 0.3, "NAME": "best"})
+    assert "LR = 0.3  # learning rate\n" in updated and "NAME = 'best'\n" in updated
+    assert updated.replace("0.3  #", "0.01  #").replace("'best'", '"run"') == SCRIPT
+
+
+def test_objective_pattern_reads_report_lines():
+    pattern = objective_pattern("loss")
+    assert [float(m.group(1)) for m in pattern.finditer("val_loss=9 loss: 0.25, loss=1e-3")] == [0.25, 0.001]
+
+
+def test_median_pruner_uses_completed_trials(tmp_path):
+    store = StudyStore(tmp_path / "study.db")
+    for number, value in enumerate([0.5, 0.6, 0.7]):
+        trial = store.start("s", number, {})
+        store.report(trial, 1, value)
+        store.finish(trial, "complete", value, 1.0)
+    pruner = MedianPruner(store, "s", "maximize")
+    assert not pruner.should_prune(0, 0.1)  # warm-up step
+    assert pruner.should_prune(1, 0.55) and not pruner.should_prune(1, 0.65)
+    assert not MedianPruner(store, "s", "maximize").should_prune(2, 0.0)  # no history at this step
+
+
+def test_search_writes_best_params_back_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = tmp_path / "train.py"
+    script.write_text(SCRIPT)
+    args = ["optimize", "hyperparams", "--file", str(script), "--objective", "score", "--search",
+            "--space", '{"LR": [0.1, 0.3, 0.5]}', "--trials", "6", "--workers", "2"]
+
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert result.output.count("🧪 Trial") == 6
+    assert "LR = 0.3  # learning rate" in script.read_text()
+    assert (tmp_path / "train.backup.py").read_text() == SCRIPT
+
+    script.write_text(SCRIPT)
+    result = CliRunner().invoke(app, args + ["--preview"])
+    assert "6 trial(s) already finished" in result.output and "🧪 Trial" not in result.output
+    assert script.read_text() == SCRIPT
+
+
+def test_run_trial_runs_beside_the_script_and_never_prunes_the_final_report(tmp_path):
+    (tmp_path / "data.txt").write_text("0.5")
+    script = tmp_path / "train.py"
+    source = "from pathlib import Path\nprint('score:', Path(__file__).parent.joinpath('data.txt').read_text())\n"
+    reports = []
+
+    def prune_everything(step, value):
+        reports.append((step, value))
+        return True
+
+    assert run_trial(script, source, 0, objective_pattern("score"), prune_everything) == ("complete", 0.5)
+    assert reports == []
+
+    source = "print('score: 0.1')\nprint('score: 0.2')\n"
+    assert run_trial(script, source, 1, objective_pattern("score"), prune_everything) == ("pruned", 0.1)
+    assert reports == [(0, 0.1)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.txt"]
@@ -0,0 +1,60 @@
+# tests/test_impact.py
+
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils.impact import ImportGraph, impacted_tests, parse_imports
+
+
+def _make_project(root):
+    files = {
+        "pkg/__init__.py": "",
+        "pkg/core.py": "VALUE = 1\n",
+        "pkg/api.py": "from .core import VALUE\n",
+        "pkg/other.py": "import json\n",
+        "tests/__init__.py": "",
+        "tests/test_api.py": "from pkg import api\n\ndef test_api():\n    assert api.VALUE == 1\n",
+        "tests/test_other.py": "import pkg.other\n\ndef test_other():\n    pass\n",
+    }
+    for name, source in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(source)
+
+
+def test_parse_imports_resolves_relative_imports():
+    assert parse_imports("from .core import VALUE\nfrom .. import util", "pkg.sub.api", False) == [
+        "pkg", "pkg.sub.core", "pkg.sub.core.VALUE", "pkg.util",
+    ]
+
+
+def test_impacted_tests_follow_transitive_imports(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAIKURAN_IMPACT_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "proj"
+    _make_project(root)
+
+    assert impacted_tests(root, root / "tests", [root / "pkg/core.py"]) == [root / "tests/test_api.py"]
+    assert impacted_tests(root, root / "tests", [root / "pkg/other.py"]) == [root / "tests/test_other.py"]
+    assert impacted_tests(root, root / "tests", [root / "README.md"]) == []
+    assert impacted_tests(root, root / "tests", [root / "requirements.txt"]) is None
+
+    # The cached graph picks up edited imports.
+    (root / "pkg/other.py").write_text("from pkg.core import VALUE\n")
+    assert impacted_tests(root, root / "tests", [root / "pkg/core.py"]) == [
+        root / "tests/test_api.py", root / "tests/test_other.py",
+    ]
+    assert len(ImportGraph(root).imports) == 7
+
+
+def test_test_run_impacted_runs_only_selected_tests(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAIKURAN_IMPACT_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "proj"
+    _make_project(root)
+    monkeypatch.chdir(root)
+
+    result = CliRunner().invoke(app, ["test", "run", "--impacted", "--changed", "pkg/core.py"])
+    assert result.exit_code == 0, result.output
+    assert "1 impacted test file(s)" in result.output
+    assert "Running: pytest tests/test_api.py\n" in result.output
+
+    result = CliRunner().invoke(app, ["test", "run", "--impacted", "--changed", "docs/index.md"])
+    assert result.exit_code == 0 and "No tests are impacted" in result.output
@@ -0,0 +1,54 @@
+# tests/test_model_templates.py
+
+import ast
+
+import pytest
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils.model_templates import available_templates, render_template
+
+runner = CliRunner()
+
+
+@pytest.mark.parametrize("framework,task,dataset", available_templates())
+def test_every_template_renders_valid_python(framework, task, dataset):
+    code = render_template(task, framework, dataset)
+    ast.parse(code)
+    assert "$" not in code
+    for section in ("# 1.", "# 3.", "# 4.", "# 5."):
+        assert section in code
+
+
+def test_aliases_and_uncovered_combinations():
+    assert render_template("classifier", "torch", "Fashion-MNIST") == render_template(
+        "classification", "pytorch", "fashion_mnist"
+    )
+    assert render_template("clustering", "pytorch", "iris") is None
+    assert render_template("classification", "sklearn", "my_company_data") is None
+
+
+def test_generate_model_uses_local_template_without_llm(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the LLM should not be called")
+
+    monkeypatch.setattr("raikuran.commands.generate.run_chat_completion", fail)
+    output = tmp_path / "model.py"
+    result = runner.invoke(app, ["generate", "model", "--task", "classification", "--framework", "sklearn",
+                                 "--dataset", "iris", "--output", str(output)])
+    assert result.exit_code == 0, result.output
+    assert "local template" in result.output
+    assert "load_iris" in output.read_text()
+
+
+def test_generate_model_llm_flag_and_fallback(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr("raikuran.commands.generate.run_chat_completion",
+                        lambda **kwargs: calls.append(kwargs) or "print('llm')\n")
+    for extra in (["--dataset", "iris", "--llm"], ["--dataset", "uncovered"]):
+        output = tmp_path / "model.py"
+        result = runner.invoke(app, ["generate", "model", "--task", "classification", "--framework", "sklearn",
+                                     "--output", str(output), *extra])
+        assert result.exit_code == 0, result.output
+        assert output.read_text() == "print('llm')\n"
+    assert len(calls) == 2
@@ -0,0 +1,245 @@
+# tests/test_openai_helpers.py
+
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from raikuran.utils import openai_helpers
+from raikuran.utils.cache import ResponseCache, cache_key
+from raikuran.utils.files import atomic_write
+
+
+MESSAGES = [{"role": "user", "content": "explain this"}]
+
+
+def test_cache_key_is_stable_and_order_independent():
+    assert cache_key(a=1, b=[1, 2]) == cache_key(b=[1, 2], a=1)
+    assert cache_key(a=1) != cache_key(a=2)
+
+
+def test_run_chat_completion_uses_cache(fake_client):
+    assert openai_helpers.run_chat_completion(MESSAGES) == "hello"
+    assert openai_helpers.run_chat_completion(MESSAGES) == "hello"
+    assert fake_client.calls == 1
+
+    # A different temperature is a different request.
+    openai_helpers.run_chat_completion(MESSAGES, temperature=0.9)
+    assert fake_client.calls == 2
+
+
+def test_run_chat_completion_no_cache_and_refresh(fake_client):
+    openai_helpers.run_chat_completion(MESSAGES, use_cache=False)
+    openai_helpers.run_chat_completion(MESSAGES, use_cache=False)
+    assert fake_client.calls == 2
+
+    openai_helpers.run_chat_completion(MESSAGES)
+    openai_helpers.run_chat_completion(MESSAGES, refresh=True)
+    assert fake_client.calls == 4
+    openai_helpers.run_chat_completion(MESSAGES)
+    assert fake_client.calls == 4
+
+
+def test_response_cache_ttl_and_lru_eviction(tmp_path):
+    cache = ResponseCache(directory=tmp_path, max_bytes=10_000, ttl=60)
+    cache.set("old", "x" * 4000)
+    cache.set("new", "y" * 4000)
+    past = time.time() - 10
+    os.utime(tmp_path / "old.json", (past, past))
+    os.utime(tmp_path / "new.json", (past + 5, past + 5))
+    cache.get("old")  # touching "old" makes "new" the LRU entry
+
+    cache.set("newest", "z" * 4000)
+    assert cache.get("new") is None
+    assert cache.get("old") == "x" * 4000
+
+    expired = ResponseCache(directory=tmp_path, ttl=0)
+    time.sleep(0.01)
+    assert expired.get("old") is None
+    assert not (tmp_path / "old.json").exists()
+
+
+def test_streaming_delivers_tokens_and_caches(fake_client, capsys):
+    tokens = []
+    content = openai_helpers.run_chat_completion(MESSAGES, on_token=tokens.append)
+    assert content == "hello"
+    assert tokens == list("hello")
+    assert "tokens/s" in capsys.readouterr().out
+
+    # A cache hit is replayed through the callback in one piece.
+    tokens.clear()
+    openai_helpers.run_chat_completion(MESSAGES, on_token=tokens.append)
+    assert tokens == ["hello"]
+    assert fake_client.calls == 1
+
+
+def test_atomic_write_replaces_only_on_success(tmp_path):
+    target = tmp_path / "out.py"
+    target.write_text("original")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(target) as out:
+            out.write("partial")
+            raise RuntimeError("stream interrupted")
+    assert target.read_text() == "original"
+
+    with atomic_write(target) as out:
+        out.write("complete")
+    assert target.read_text() == "complete"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_compact_code_strips_only_what_is_safe():
+    code = '''"""Module docstring."""
+import os  # the os module
+
+
+def f(x):
+    """Only a docstring here."""
+
+
+def g(x):
+    # explain
+    s = """keep   
+
+    this"""
+    return x   
+'''
+    compacted = openai_helpers.compact_code(code, strip_comments=True)
+    assert compacted == 'import os\ndef f(x):\n    pass\ndef g(x):\n    s = """keep   \n\n    this"""\n    return x\n'
+    assert "# the os module" in openai_helpers.compact_code(code)
+    assert openai_helpers.compact_code("def broken(:\n") == "def broken(:\n"
+
+
+def test_prepare_request_routes_to_cheapest_fitting_model(monkeypatch):
+    monkeypatch.delenv("RAIKURAN_MODEL", raising=False)
+    small = openai_helpers.prepare_request(MESSAGES, tier="smart", output_ratio=2.0, max_output=1000)
+    assert small.model == "gpt-4o"
+    assert small.max_tokens == 256  # sized from the tiny prompt, floored at min_output
+
+    big = [{"role": "user", "content": "x = 1\n" * 60_000}]
+    fast = openai_helpers.prepare_request(big, tier="fast", max_output=4096)
+    assert fast.model == "gpt-4o-mini" and fast.max_tokens == 4096
+    with pytest.raises(ValueError):
+        openai_helpers.prepare_request(big * 10, tier="fast")
+
+    monkeypatch.setenv("RAIKURAN_MODEL", "gpt-3.5-turbo")
+    assert openai_helpers.prepare_request(MESSAGES).model == "gpt-3.5-turbo"
+
+
+def test_dry_run_sends_nothing(fake_client, tmp_path):
+    from typer.testing import CliRunner
+    from raikuran.main import app
+
+    script = tmp_path / "script.py"
+    script.write_text("def f(x):\n    # double it\n    return x * 2\n")
+    result = CliRunner().invoke(app, ["assist", "refactor", "--file", str(script), "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert "Dry run: 1 request(s)" in result.output and "$" in result.output
+    assert fake_client.calls == 0
+
+
+class FlakyError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_call_with_retries_backs_off_on_transient_errors(monkeypatch):
+    delays = []
+    monkeypatch.setattr(openai_helpers.time, "sleep", delays.append)
+    failures = [FlakyError(503), FlakyError(429, {"retry-after": "3"})]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert openai_helpers.call_with_retries(flaky) == "ok"
+    assert 0.25 <= delays[0] <= 0.5  # jittered first backoff step
+    assert delays[1] == 3.0  # Retry-After wins
+
+    with pytest.raises(FlakyError):
+        openai_helpers.call_with_retries(lambda: (_ for _ in ()).throw(FlakyError(400)))
+    assert len(delays) == 2
+
+    monkeypatch.setenv("RAIKURAN_OPENAI_MAX_RETRIES", "2")
+    calls = []
+    with pytest.raises(FlakyError):
+        openai_helpers.call_with_retries(lambda: calls.append(1) or (_ for _ in ()).throw(FlakyError(500)))
+    assert len(calls) == 3
+
+
+def test_rate_limits_reach_the_batch_scheduler(tmp_path, monkeypatch):
+    from raikuran.utils.batch import BatchJob, ProgressJournal, run_batch
+
+    sleeps = []
+    monkeypatch.setattr(openai_helpers.time, "sleep", sleeps.append)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise FlakyError(429, {"retry-after": "0.01"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(openai_helpers, "get_client", lambda: client)
+
+    def process(job):
+        openai_helpers.complete_chat(MESSAGES, use_cache=False, retry_rate_limits=False)
+
+    rate_limited = []
+    monkeypatch.setattr("raikuran.utils.batch.RateLimiter.on_rate_limited",
+                        lambda self, retry_after=None: rate_limited.append(retry_after) or 0.0)
+    job = BatchJob(key="a.py", fingerprint="f", cost=10, payload=None)
+    summary = run_batch([job], process, ProgressJournal(tmp_path / "journal.jsonl"))
+
+    assert summary == {"done": 1, "skipped": 0, "failed": 0}
+    assert rate_limited == [0.01]  # the shared limiter saw the 429 and its Retry-After
+    assert len(calls) == 2 and sleeps == []  # no private retry inside the worker thread
+
+
+def test_acomplete_chat_retries_and_caches(tmp_path, monkeypatch):
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise FlakyError(429, {"retry-after-ms": "10"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="async hello"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(openai_helpers, "get_async_client", lambda: client)
+    monkeypatch.setattr(openai_helpers, "_cache", ResponseCache(directory=tmp_path / "cache"))
+
+    assert asyncio.run(openai_helpers.acomplete_chat(MESSAGES)) == "async hello"
+    assert asyncio.run(openai_helpers.acomplete_chat(MESSAGES)) == "async hello"
+    assert len(calls) == 2
+
+
+def test_shared_client_uses_configured_timeouts(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("RAIKURAN_OPENAI_CONNECT_TIMEOUT", "3")
+    monkeypatch.setenv("RAIKURAN_OPENAI_READ_TIMEOUT", "45")
+    monkeypatch.setattr(openai_helpers, "_client", None)
+    client = openai_helpers.get_client()
+    assert openai_helpers.get_client() is client
+    assert client.max_retries == 0
+    assert (client.timeout.connect, client.timeout.read) == (3.0, 45.0)
+
+
+def test_async_client_is_closed_with_its_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(openai_helpers, "_async_client", None)
+
+    async def clients():
+        return openai_helpers.get_async_client(), openai_helpers.get_async_client()
+
+    first, again = asyncio.run(clients())
+    assert first is again and first.is_closed()
+    second, _ = asyncio.run(clients())
+    assert second is not first and second.is_closed()
@@ -0,0 +1,88 @@
+# tests/test_profiling.py
+
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils.profiling import hot_regions, measured_speedup, profile_script, replace_functions, time_script
+
+SCRIPT = '''\
+import math
+
+
+def slow_sum(n):
+    total = 0
+    for i in range(n):
+        total += math.sqrt(i)
+    return total
+
+
+def build_table(n):
+    return [[i] * 50 for i in range(n)]
+
+
+class Trainer:
+    def step(self):
+        return slow_sum(200_000)
+
+
+TABLE = build_table(2_000)
+print(round(Trainer().step(), 3))
+'''
+
+FASTER = '''\
+```python
+import numpy as np
+
+
+def slow_sum(n):
+    return float(np.sqrt(np.arange(n)).sum())
+```'''
+
+
+def test_profile_maps_hot_spots_to_source_regions(tmp_path):
+    script = tmp_path / "train.py"
+    script.write_text(SCRIPT)
+    profile = profile_script(script, budget=30)
+
+    assert profile.completed and profile.stdout.strip()
+    assert profile.hot_functions(1)[0]["name"] == "slow_sum"
+    labels = {label for label, _, _ in hot_regions(SCRIPT, profile)}
+    assert {"slow_sum", "build_table"} <= labels
+
+
+def test_replace_functions_splices_by_name():
+    rewritten = "import numpy as np\n\nclass Trainer:\n    def step(self):\n        return 1\n"
+    code, replaced = replace_functions(SCRIPT, rewritten)
+    assert replaced == ["Trainer.step"]
+    assert "import math\nimport numpy as np\n" in code
+    assert "    def step(self):\n        return 1\n\n\nTABLE" in code
+    assert "total += math.sqrt(i)" in code
+
+
+def test_measured_speedup_ignores_noise(tmp_path):
+    assert measured_speedup([1.0, 1.02, 0.98], [0.97, 0.99, 0.96]) == (1.0 / 0.97, False)  # under 5%
+    assert not measured_speedup([1.0, 1.5, 0.8], [0.7, 0.9, 0.75])[1]  # spreads overlap
+    speedup, faster = measured_speedup([1.0, 1.1, 0.95], [0.5, 0.55, 0.52])
+    assert faster and speedup > 1.9
+
+    script = tmp_path / "quick.py"
+    script.write_text("print(sum(range(1000)))\n")
+    times = time_script(script, repeat=2)
+    assert len(times) == 2 and all(0 <= t < 5 for t in times)
+
+
+def test_optimize_perf_saves_only_measured_speedups(tmp_path, fake_client):
+    script = tmp_path / "train.py"
+    script.write_text(SCRIPT)
+    fake_client.content = FASTER
+
+    result = CliRunner().invoke(app, ["optimize", "perf", "--file", str(script), "--budget", "30"])
+    assert result.exit_code == 0, result.output
+    assert "Hot functions in the script" in result.output and "Rewrote: slow_sum" in result.output
+    assert "x)" in result.output  # measured speedup
+    if "Code overwritten" in result.output:
+        assert "np.sqrt(np.arange(n))" in script.read_text()
+        assert (tmp_path / "train.backup.py").read_text() == SCRIPT
+    else:
+        assert script.read_text() == SCRIPT
+    assert not list(tmp_path.glob(".*perf_candidate*"))
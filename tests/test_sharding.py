@@ -0,0 +1,50 @@
+# tests/test_sharding.py
+
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils.sharding import parse_shard_spec, partition
+
+
+def test_partition_balances_longest_first():
+    durations = {Path(f"t{i}.py"): d for i, d in enumerate([5, 4, 3, 3, 3, 2])}
+    groups = partition(durations, 2)
+    loads = sorted(sum(durations[p] for p in group) for group in groups)
+    assert loads == [10, 10]
+    assert partition(durations, 2) == groups  # deterministic
+    assert sorted(p for g in partition(durations, 8) for p in g) == sorted(durations)
+
+
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "x/4", "3"])
+def test_parse_shard_spec_rejects_malformed(spec):
+    assert parse_shard_spec("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard_spec(spec)
+
+
+def test_sharded_run_merges_junit_and_records_durations(tmp_path, monkeypatch):
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "__init__.py").write_text("")
+    for name in ("a", "b", "c"):
+        (tmp_path / "tests" / f"test_{name}.py").write_text(f"def test_{name}():\n    pass\n")
+    (tmp_path / "tests" / "test_fail.py").write_text("def test_fail():\n    assert False\n")
+    monkeypatch.chdir(tmp_path)
+
+    result = CliRunner().invoke(app, ["test", "run", "--shards", "2", "--junit-xml", "report.xml"])
+    assert result.exit_code == 1
+    assert "3 passed, 1 failed" in result.output and "across 2 shard(s)" in result.output
+    report = ET.parse(tmp_path / "report.xml").getroot()
+    assert report.get("tests") == "4" and len(report.findall("testsuite")) == 2
+
+    history = json.loads((tmp_path / ".raikuran" / "test_durations.json").read_text())
+    assert set(history) == {f"tests/test_{name}.py" for name in ("a", "b", "c", "fail")}
+
+    (tmp_path / "tests" / "test_fail.py").unlink()
+    result = CliRunner().invoke(app, ["test", "run", "--shard", "1/2"])
+    assert result.exit_code == 0, result.output
+    assert "Shard 1/2" in result.output and "Shard 2/2" not in result.output
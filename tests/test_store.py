@@ -0,0 +1,45 @@
+# tests/test_store.py
+
+import os
+import subprocess
+import zipfile
+
+import pytest
+
+from raikuran.utils.store import create_linked_venv, venv_paths
+
+
+def _build_wheel(directory):
+    wheel = directory / "demo_pkg-1.0-py3-none-any.whl"
+    info = "demo_pkg-1.0.dist-info"
+    with zipfile.ZipFile(wheel, "w") as archive:
+        archive.writestr("demo_pkg/__init__.py", "def main():\n    print('hello from demo')\n")
+        archive.writestr(f"{info}/METADATA", "Metadata-Version: 2.1\nName: demo-pkg\nVersion: 1.0\n")
+        archive.writestr(f"{info}/WHEEL", "Wheel-Version: 1.0\nRoot-Is-Purelib: true\nTag: py3-none-any\n")
+        archive.writestr(f"{info}/entry_points.txt", "[console_scripts]\ndemo = demo_pkg:main\n")
+        archive.writestr(f"{info}/RECORD", "")
+    return wheel
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX venv layout")
+def test_linked_venvs_share_store_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAIKURAN_STORE_DIR", str(tmp_path / "store"))
+    wheelhouse = tmp_path / "wheels"
+    wheelhouse.mkdir()
+    _build_wheel(wheelhouse)
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("demo-pkg==1.0\n")
+
+    inodes = []
+    for name in ("one", "two"):
+        venv = tmp_path / name
+        totals = create_linked_venv(venv, requirements, wheelhouse, with_pip=False)
+        assert totals["packages"] == 1 and totals["linked"] + totals["copied"] >= 3
+        module = venv_paths(venv)["purelib"] / "demo_pkg" / "__init__.py"
+        inodes.append(module.stat().st_ino)
+        result = subprocess.run([str(venv / "bin" / "demo")], capture_output=True, text=True)
+        assert result.stdout == "hello from demo\n"
+
+    assert len(list((tmp_path / "store" / "pkgs").iterdir())) == 1
+    if totals["copied"] == 0:
+        assert inodes[0] == inodes[1]
@@ -0,0 +1,55 @@
+# tests/test_tracing.py
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from raikuran.main import app
+from raikuran.utils import tracing
+
+runner = CliRunner()
+
+
+def test_trace_records_spans_subprocesses_and_reads(tmp_path):
+    source = tmp_path / "data.txt"
+    source.write_text("hello")
+    trace_file = tmp_path / "trace.json"
+
+    tracing.start_tracing(trace_file, "raikuran test")
+    try:
+        with tracing.span("build prompt", "prompt") as args:
+            args["prompt_tokens"] = 12
+            source.read_text()
+        subprocess.run([sys.executable, "-c", "sum(range(10**6))"], check=True)
+    finally:
+        path = tracing.stop_tracing()
+
+    assert path == trace_file
+    assert subprocess.Popen is not tracing.TracedPopen
+    events = {e["name"]: e for e in json.loads(trace_file.read_text())["traceEvents"]}
+    assert events["raikuran test"]["cat"] == "run"
+    assert events["build prompt"]["args"]["prompt_tokens"] == 12
+    assert events["read data.txt"]["args"]["bytes"] == 5
+    child = events["python -c"]
+    assert child["cat"] == "subprocess" and child["args"]["returncode"] == 0
+    assert child["args"]["cpu_ms"] > 0 and child["dur"] > 0
+
+
+def test_command_name():
+    assert tracing.command_name([sys.executable, "-m", "pytest", "-q"]) == "pytest"
+    assert tracing.command_name(["/usr/bin/black", "src"]) == "black"
+    assert tracing.command_name("uvicorn app:app --port 8000") == "uvicorn"
+
+
+def test_profile_env_writes_trace_for_a_cli_run(tmp_path, monkeypatch):
+    trace_file = tmp_path / "run.json"
+    monkeypatch.setenv("RAIKURAN_TRACE", str(trace_file))
+    result = runner.invoke(app, ["generate", "templates"])
+    assert result.exit_code == 0, result.output
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert any(e["name"] == "import raikuran.commands.generate" for e in events)
+    assert tracing._tracer is None
+    assert Path.read_text.__name__ == "read_text"